@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+# This module will handle serving diagrams over HTTP from an in-memory model.
+import argparse
+from collections import OrderedDict
+import hashlib
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import os
+import threading
+from urllib.parse import unquote, urlsplit
+
+from modules.uml_generator import UMLGenerator
+from modules.uml_to_plantuml import UMLToPlantUMLConverter
+from modules.uml_to_mermaid import UMLToMermaidConverter
+from modules.plantuml_renderer import create_renderer, RenderError
+from modules.watcher import PollingWatcher
+
+logger = logging.getLogger("openapi2uml.app")
+
+CONTENT_TYPES = {
+    "puml": "text/plain; charset=utf-8",
+    "mmd": "text/plain; charset=utf-8",
+    "png": "image/png",
+}
+
+
+class DiagramService:
+    """
+    Holder UML modellen i memory og genererer diagrammer for enkelte klasser.
+
+    Genererede diagrammer gemmes i en LRU cache med nøglen (klasse, format, model
+    version). Når schema filerne ændres, opdateres modellen i en baggrundstråd,
+    og versionen tælles op, så gamle diagrammer ikke længere bruges.
+    """
+    def __init__(self, schema_dir: str, renderer, cache_size: int = 256):
+        """
+        Indlæser modellen.
+
+        Args:
+            schema_dir (str): Directory med schemas eller et entry dokument
+            renderer: Renderer fra create_renderer, bruges til PNG
+            cache_size (int): Maksimalt antal diagrammer i LRU cachen
+        """
+        self.schema_dir = schema_dir
+        self.renderer = renderer
+        self.cache_size = cache_size
+        self.version = 0
+        self._generator = UMLGenerator(schema_dir)
+        self._generator.generate_uml()
+        self._model_lock = threading.Lock()  # Beskytter generatoren mens den opdateres
+        self._cache: OrderedDict[tuple[str, str, int], tuple[bytes, str]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def classes(self) -> list[str]:
+        """Navnene på alle klasser i modellen."""
+        with self._model_lock:
+            return list(self._generator.uml_model)
+
+    def reload(self, changed) -> None:
+        """
+        Opdaterer modellen efter at filerne i changed er ændret.
+
+        Fejlhåndtering:
+            - Fejl logges, og den forrige model serveres videre
+        """
+        try:
+            with self._model_lock:
+                self._generator.refresh(changed)
+                self.version += 1
+        except Exception as e:
+            logger.error(f"Failed to reload model after changes to {', '.join(sorted(changed))}: {e}")
+            return
+        with self._cache_lock:
+            self._cache.clear()
+        logger.info(f"Reloaded model version {self.version} after {len(changed)} changed files")
+
+    def watch(self, interval: float = 0.2) -> threading.Thread:
+        """
+        Starter en daemon tråd der genindlæser modellen når schema filerne ændres.
+
+        Args:
+            interval (float): Sekunder mellem scans af schema directory
+
+        Returns:
+            threading.Thread: Den startede tråd
+        """
+        schema_path = self.schema_dir.partition("#")[0]
+        watch_dir = schema_path if os.path.isdir(schema_path) else os.path.dirname(os.path.abspath(schema_path))
+        watcher = PollingWatcher(watch_dir, interval=interval)
+
+        def run():
+            while True:
+                self.reload(watcher.wait_for_changes())
+
+        thread = threading.Thread(target=run, name="schema-watcher", daemon=True)
+        thread.start()
+        return thread
+
+    def diagram(self, class_name: str, fmt: str) -> tuple[bytes, str]:
+        """
+        Henter diagrammet for en klasse fra cachen, eller genererer det.
+
+        Args:
+            class_name (str): Navnet på startklassen
+            fmt (str): "puml", "mmd" eller "png"
+
+        Returns:
+            tuple: (indhold, etag)
+
+        Fejlhåndtering:
+            - KeyError hvis klassen ikke findes
+            - RenderError hvis PNG renderingen fejler
+        """
+        with self._model_lock:
+            version = self.version
+            key = (class_name, fmt, version)
+            with self._cache_lock:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    return cached
+            # Subgrafen udtrækkes under låsen. Modellens objekter ændres ikke af en
+            # senere refresh, så diagrammet kan genereres uden låsen
+            model, relations = self._generator.get_model_from_class_name(class_name)
+
+        if fmt == "mmd":
+            content = UMLToMermaidConverter().uml_model_to_mermaid(model, relations).encode("utf-8")
+        else:
+            source = UMLToPlantUMLConverter().uml_model_to_plantuml(model, relations)
+            content = source.encode("utf-8") if fmt == "puml" else self.renderer.render(source)
+        result = (content, f'"{hashlib.sha256(content).hexdigest()[:32]}"')
+
+        with self._cache_lock:
+            if version == self.version:
+                self._cache[key] = result
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+
+class DiagramRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler for diagram endpoints.
+
+    GET /classes                 JSON liste over klasserne i modellen
+    GET /diagram/{klasse}.puml   PlantUML kilde for klassen og det den refererer til
+    GET /diagram/{klasse}.mmd    Mermaid kilde
+    GET /diagram/{klasse}.png    Renderet PlantUML diagram
+    """
+    service: DiagramService  # Sættes på den subklasse make_server opretter
+
+    def do_GET(self):
+        path = unquote(urlsplit(self.path).path)
+        if path == "/classes":
+            self._send(HTTPStatus.OK, json.dumps(self.service.classes()).encode("utf-8"), "application/json")
+            return
+        if not path.startswith("/diagram/"):
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path: {path}")
+            return
+
+        class_name, _, fmt = path[len("/diagram/"):].rpartition(".")
+        if fmt not in CONTENT_TYPES or not class_name:
+            self._send_error(HTTPStatus.BAD_REQUEST, f"Expected /diagram/<class>.{{{','.join(CONTENT_TYPES)}}}")
+            return
+        try:
+            content, etag = self.service.diagram(class_name, fmt)
+        except KeyError:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Class '{class_name}' not found")
+            return
+        except RenderError as e:
+            logger.error(f"Failed to render {class_name}: {e}")
+            self._send_error(HTTPStatus.BAD_GATEWAY, f"Failed to render diagram: {e}")
+            return
+
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self._send(HTTPStatus.OK, content, CONTENT_TYPES[fmt], etag)
+
+    def _send(self, status: HTTPStatus, content: bytes, content_type: str, etag: str | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _send_error(self, status: HTTPStatus, message: str) -> None:
+        self._send(status, f"{message}\n".encode("utf-8"), "text/plain; charset=utf-8")
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_server(service: DiagramService, host: str = "127.0.0.1", port: int = 8000) -> ThreadingHTTPServer:
+    """
+    Opretter en HTTP server der besvarer hver forespørgsel i sin egen tråd.
+
+    Args:
+        service (DiagramService): Servicen der leverer diagrammerne
+        host (str): Adressen serveren lytter på
+        port (int): Porten serveren lytter på. 0 = vælg en ledig port
+
+    Returns:
+        ThreadingHTTPServer: Serveren, klar til serve_forever()
+    """
+    handler = type("BoundDiagramRequestHandler", (DiagramRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve UML diagrams for OpenAPI schemas over HTTP.")
+    parser.add_argument("schema_dir", type=str, help="Path to the directory containing OpenAPI schemas, or an entry YAML file")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on. Default: 127.0.0.1")
+    parser.add_argument("--port", "-p", type=int, default=8000, help="Port to listen on. Default: 8000")
+    parser.add_argument("--cache-entries", type=int, default=256, help="Maximum number of generated diagrams kept in memory. Default: 256")
+    parser.add_argument("--watch-interval", type=float, default=0.2, help="Seconds between scans for changed schema files. Default: 0.2")
+    parser.add_argument("--no-watch", action="store_true", help="Do not reload the model when schema files change")
+    parser.add_argument("--renderer", choices=["local", "remote"], default="remote", help="PNG renderer: local plantuml.jar or the remote PlantUML server. Default: remote")
+    parser.add_argument("--plantuml-jar", type=str, default=None, help="Path to plantuml.jar for --renderer local. Default: $PLANTUML_JAR or plantuml.jar")
+    parser.add_argument("--java", type=str, default="java", help="Java executable for --renderer local. Default: java")
+    parser.add_argument("--render-workers", type=int, default=2, help="Number of local PlantUML processes rendering concurrently. Default: 2")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Log every request")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(message)s")
+
+    with create_renderer(args.renderer, args.plantuml_jar, pool_size=args.render_workers, java=args.java) as renderer:
+        service = DiagramService(args.schema_dir, renderer, cache_size=args.cache_entries)
+        if not args.no_watch:
+            service.watch(args.watch_interval)
+        server = make_server(service, args.host, args.port)
+        logger.info(f"Serving {len(service.classes())} classes on http://{args.host}:{server.server_address[1]}/diagram/<class>.puml|.mmd|.png")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Stopping server")
+        finally:
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
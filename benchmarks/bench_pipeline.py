@@ -0,0 +1,144 @@
+# This module will benchmark each phase of the UML generation pipeline.
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import synthetic_spec
+from benchmarks.synthetic_spec import generate_spec_tree
+from modules.instrumentation import Instrumentation
+from modules.uml_generator import UMLGenerator
+from modules.uml_to_plantuml import UMLToPlantUMLConverter
+from modules.uml_to_mermaid import UMLToMermaidConverter
+
+PHASES = ["load", "visit", "link", "subgraph", "plantuml", "mermaid"]
+
+
+def _spec_dir(work_dir: str, size: int, seed: int) -> str:
+    """
+    Genererer (eller genbruger) et syntetisk schema træ med size schemas.
+
+    Markøren gemmer parametrene og et hash af synthetic_spec.py, så et træ fra
+    andre parametre eller en ændret generator bygges forfra i stedet for at
+    blive genbrugt.
+    """
+    spec_dir = os.path.join(work_dir, f"spec_{size}_{seed}")
+    marker = os.path.join(spec_dir, ".complete")
+    with open(synthetic_spec.__file__, "rb") as f:
+        generator_digest = hashlib.sha256(f.read()).hexdigest()
+    key = {"schemas": size, "seed": seed, "generator": generator_digest}
+    try:
+        with open(marker) as f:
+            if json.load(f) == key:
+                return spec_dir
+    except (OSError, ValueError):
+        pass
+    shutil.rmtree(spec_dir, ignore_errors=True)
+    generate_spec_tree(spec_dir, schemas=size, seed=seed)
+    with open(marker, "w") as f:
+        json.dump(key, f)
+    return spec_dir
+
+
+def run_phases(spec_dir: str, subgraph_samples: int = 100) -> dict[str, float]:
+    """
+    Kører pipelinen på spec_dir og måler hver fase for sig.
+
+    load, visit og link er fasetiderne som generate_uml() selv registrerer i sin
+    Instrumentation, så benchmarken måler den offentlige pipeline.
+
+    Faser:
+        load:     rekursiv indlæsning af directory'et
+        visit:    klasse konstruktion og relationship discovery
+        link:     linking og fjernelse af duplikerede generalizations
+        subgraph: get_model_from_class_name for de første subgraph_samples klasser
+        plantuml: PlantUML emission af hele modellen
+        mermaid:  Mermaid emission af hele modellen
+
+    Args:
+        spec_dir (str): Directory med schema filer
+        subgraph_samples (int): Antal klasser der udtrækkes subgrafer for
+
+    Returns:
+        dict[str, float]: Sekunder pr. fase
+    """
+    stats = Instrumentation()
+    generator = UMLGenerator(spec_dir, instrumentation=stats)
+    generator.generate_uml()
+    timings = {phase: stats.phases[phase] for phase in ("load", "visit", "link")}
+    with open(os.devnull, "w") as devnull:
+        start = time.perf_counter()
+        for class_name in list(generator.uml_model)[:subgraph_samples]:
+            generator.get_model_from_class_name(class_name)
+        timings["subgraph"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        UMLToPlantUMLConverter().write_to(devnull, generator.uml_model, generator.uml_relationships)
+        timings["plantuml"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        UMLToMermaidConverter().write_to(devnull, generator.uml_model, generator.uml_relationships)
+        timings["mermaid"] = time.perf_counter() - start
+    return timings
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta: float = 0.01) -> list[str]:
+    """
+    Sammenligner resultater med en baseline.
+
+    Args:
+        results (dict): {size: {phase: seconds}}
+        baseline (dict): Samme struktur, indlæst fra en tidligere kørsel
+        tolerance (float): Tilladt relativ forværring, f.eks. 0.2 for 20%
+        min_delta (float): Forværringer under dette antal sekunder ignoreres som støj
+
+    Returns:
+        list[str]: Beskrivelser af faser der er blevet langsommere end tilladt
+    """
+    regressions = []
+    for size, timings in results.items():
+        for phase, seconds in timings.items():
+            base = baseline.get(size, {}).get(phase)
+            if base and seconds > base * (1 + tolerance) and seconds - base > min_delta:
+                regressions.append(f"{size} schemas, {phase}: {seconds:.3f}s vs baseline {base:.3f}s")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the UML generation pipeline on synthetic schema trees.")
+    parser.add_argument("--sizes", type=str, default="1000,10000,100000", help="Comma separated schema counts. Default: 1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per size; the fastest run per phase is reported. Default: 1")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic spec generator. Default: 0")
+    parser.add_argument("--work-dir", type=str, default=os.path.join(tempfile.gettempdir(), "openapi2uml_bench"), help="Directory for generated spec trees. A tree is reused only while its size, seed and generator code are unchanged.")
+    parser.add_argument("--save-baseline", type=str, default=None, help="Write the results as a JSON baseline to this file.")
+    parser.add_argument("--compare", type=str, default=None, help="Compare the results with a JSON baseline and exit 1 on regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown relative to the baseline. Default: 0.2")
+    args = parser.parse_args()
+
+    results = {}
+    for size in (int(size) for size in args.sizes.split(",")):
+        spec_dir = _spec_dir(args.work_dir, size, args.seed)
+        runs = [run_phases(spec_dir) for _ in range(args.repeat)]
+        timings = {phase: min(run[phase] for run in runs) for phase in PHASES}
+        results[str(size)] = timings
+        print(f"{size:>7} schemas: " + "  ".join(f"{phase}={timings[phase]:.3f}s" for phase in PHASES))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline")
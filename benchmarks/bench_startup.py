@@ -0,0 +1,106 @@
+# This module will benchmark CLI startup and check which modules a run imports.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Moduler der kun må importeres når det valgte format eller den valgte renderer kræver dem
+HEAVY_MODULES = ["pydantic", "plantuml", "httplib2", "subprocess", "multiprocessing", "modules.plantuml_renderer"]
+
+
+def scenarios(work_dir: str) -> dict[str, tuple[list[str], list[str]]]:
+    """
+    Kørslerne der måles, som navn -> (argumenter til main.py, moduler der ikke må importeres).
+
+    Args:
+        work_dir (str): Directory til output filer og den gemte model
+
+    Returns:
+        dict: Scenarier i den rækkefølge de køres
+    """
+    data_dir = os.path.join(ROOT, "data")
+    model_path = os.path.join(work_dir, "model.json")
+    output = os.path.join(work_dir, "diagram")
+    return {
+        "help": (["--help"], HEAVY_MODULES),
+        "mermaid": ([data_dir, "--format", "mermaid", "--no-cache", "--force", "-q", "-f", output, "--save-model", model_path], HEAVY_MODULES),
+        "from-model": (["--from-model", model_path, "--format", "mermaid", "--force", "-q", "-f", output], HEAVY_MODULES),
+    }
+
+
+def measure(arguments: list[str]) -> tuple[float, float, set[str]]:
+    """
+    Kører main.py med -X importtime i en ny interpreter.
+
+    Args:
+        arguments (list[str]): Argumenter til main.py
+
+    Returns:
+        tuple: (wall time i sekunder, samlet import tid i sekunder, importerede moduler)
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.join(ROOT, "main.py"), *arguments],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"main.py {' '.join(arguments)} failed:\n{result.stderr}")
+
+    # Linjerne har formen 'import time: <self us> | <cumulative us> | <indrykning><modul>'
+    import_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or line.startswith("import time: self"):
+            continue
+        self_us, _, name = line[len("import time:"):].split("|", 2)
+        import_us += int(self_us)
+        modules.add(name.strip())
+    return wall, import_us / 1e6, modules
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup with -X importtime and check for heavy imports.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per scenario; the fastest run is reported. Default: 5")
+    parser.add_argument("--save-baseline", type=str, default=None, help="Write the results as a JSON baseline to this file.")
+    parser.add_argument("--compare", type=str, default=None, help="Compare the results with a JSON baseline and exit 1 on regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown relative to the baseline. Default: 0.2")
+    args = parser.parse_args()
+
+    results = {}
+    failures = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name, (arguments, forbidden) in scenarios(work_dir).items():
+            runs = [measure(arguments) for _ in range(args.repeat)]
+            wall = min(run[0] for run in runs)
+            imports = min(run[1] for run in runs)
+            results[name] = {"wall": wall, "imports": imports}
+            print(f"{name:>10}: wall={wall:.3f}s  imports={imports:.3f}s  modules={len(runs[0][2])}")
+            for module in forbidden:
+                if module in runs[0][2]:
+                    failures.append(f"{name}: imports {module}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        for name, timings in results.items():
+            for metric, seconds in timings.items():
+                base = baseline.get(name, {}).get(metric)
+                if base and seconds > base * (1 + args.tolerance) and seconds - base > 0.005:
+                    failures.append(f"REGRESSION: {name}, {metric}: {seconds:.3f}s vs baseline {base:.3f}s")
+
+    for failure in failures:
+        print(failure)
+    if failures:
+        sys.exit(1)
+    print("Startup OK")
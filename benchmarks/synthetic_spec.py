@@ -0,0 +1,139 @@
+# This module will generate synthetic OpenAPI schema trees for benchmarking.
+import argparse
+import os
+import random
+
+import yaml
+
+
+def _schema_file(schema_dir: str, name: str, index: int, depth: int, fanout: int = 10) -> str:
+    """
+    Placerer et schema i et directory træ med den ønskede dybde.
+
+    Args:
+        schema_dir (str): Rod directory
+        name (str): Schema navn (bliver filnavnet)
+        index (int): Løbenummer, bruges til at fordele filerne i directories
+        depth (int): Antal directory niveauer under schema_dir
+        fanout (int): Antal subdirectories pr. niveau
+
+    Returns:
+        str: Sti til filen
+    """
+    parts = []
+    for level in range(depth):
+        parts.append(f"d{(index // fanout ** level) % fanout}")
+    return os.path.join(schema_dir, *parts, f"{name}.yaml")
+
+
+def _ref(from_file: str, to_file: str, name: str) -> str:
+    rel_path = os.path.relpath(to_file, os.path.dirname(from_file)).replace(os.sep, "/")
+    if not rel_path.startswith("."):
+        rel_path = f"./{rel_path}"
+    return f"{rel_path}#/components/schemas/{name}"
+
+
+def generate_spec_tree(out_dir: str, schemas: int = 1000, properties: int = 8, ref_fanout: int = 2,
+                       poly_density: float = 0.1, enum_ratio: float = 0.05, depth: int = 2, seed: int = 0) -> list[str]:
+    """
+    Genererer et syntetisk træ af OpenAPI schema filer med ét schema pr. fil.
+
+    Almindelige schemas ligger under out_dir/schemas og enums under out_dir/enums,
+    så enum referencer genkendes på samme måde som i data/.
+
+    Args:
+        out_dir (str): Directory hvor træet skrives
+        schemas (int): Samlet antal schemas (inklusive enums)
+        properties (int): Antal almindelige properties pr. schema
+        ref_fanout (int): Antal $ref properties pr. schema (halvdelen som arrays)
+        poly_density (float): Sandsynlighed for oneOf, anyOf og allOf pr. schema
+        enum_ratio (float): Andel af schemas der er enums
+        depth (int): Antal directory niveauer under schemas/ og enums/
+        seed (int): Seed til tilfældighedsgeneratoren, så træet er reproducerbart
+
+    Returns:
+        list[str]: Navnene på alle genererede klasser (uden enums)
+    """
+    rng = random.Random(seed)
+    enum_count = int(schemas * enum_ratio)
+    class_count = max(1, schemas - enum_count)
+
+    class_names = [f"Schema{i:06d}" for i in range(class_count)]
+    enum_names = [f"Enum{i:06d}" for i in range(enum_count)]
+    class_files = {name: _schema_file(os.path.join(out_dir, "schemas"), name, i, depth) for i, name in enumerate(class_names)}
+    enum_files = {name: _schema_file(os.path.join(out_dir, "enums"), name, i, depth) for i, name in enumerate(enum_names)}
+
+    for name, path in enum_files.items():
+        schema = {
+            "type": "string",
+            "description": f"Synthetic enum {name}",
+            "enum": [f"option{i}" for i in range(4)],
+        }
+        _write_schema(path, name, schema)
+
+    for name, path in class_files.items():
+        props = {}
+        for i in range(properties):
+            if i % 3 == 2:
+                props[f"att{i}"] = {"type": "array", "items": {"type": "string"}}
+            else:
+                props[f"att{i}"] = {"type": "string", "description": f"Attribute {i}"}
+                if i % 2:
+                    props[f"att{i}"]["format"] = "uuid"
+
+        for i in range(ref_fanout):
+            target = rng.choice(class_names)
+            ref = _ref(path, class_files[target], target)
+            if i % 2:
+                props[f"multi_relation{i}"] = {"type": "array", "items": {"$ref": ref}}
+            else:
+                props[f"single_relation{i}"] = {"$ref": ref}
+
+        if enum_names and rng.random() < enum_ratio * 4:
+            target = rng.choice(enum_names)
+            props["enumeration"] = {"$ref": _ref(path, enum_files[target], target)}
+
+        for keyword in ("oneOf", "anyOf"):
+            if rng.random() < poly_density:
+                targets = rng.sample(class_names, min(len(class_names), rng.randint(2, 3)))
+                props[f"{keyword.lower()}_relation"] = {
+                    "type": "object",
+                    keyword: [{"$ref": _ref(path, class_files[target], target)} for target in targets],
+                }
+
+        schema = {
+            "description": f"Synthetic schema {name}",
+            "type": "object",
+            "required": ["att0"],
+            "properties": props,
+        }
+        if rng.random() < poly_density:
+            parent = rng.choice(class_names)
+            if parent != name:
+                schema["allOf"] = [{"$ref": _ref(path, class_files[parent], parent)}]
+        _write_schema(path, name, schema)
+
+    return class_names
+
+
+def _write_schema(path: str, name: str, schema: dict) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump({"components": {"schemas": {name: schema}}}, f, sort_keys=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic OpenAPI schema tree.")
+    parser.add_argument("out_dir", type=str, help="Directory to write the schema tree to.")
+    parser.add_argument("--schemas", type=int, default=1000, help="Total number of schemas, including enums. Default: 1000")
+    parser.add_argument("--properties", type=int, default=8, help="Plain properties per schema. Default: 8")
+    parser.add_argument("--ref-fanout", type=int, default=2, help="$ref properties per schema. Default: 2")
+    parser.add_argument("--poly-density", type=float, default=0.1, help="Probability of oneOf, anyOf and allOf per schema. Default: 0.1")
+    parser.add_argument("--enum-ratio", type=float, default=0.05, help="Fraction of schemas that are enums. Default: 0.05")
+    parser.add_argument("--depth", type=int, default=2, help="Directory depth below schemas/ and enums/. Default: 2")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed. Default: 0")
+    args = parser.parse_args()
+
+    names = generate_spec_tree(args.out_dir, args.schemas, args.properties, args.ref_fanout,
+                               args.poly_density, args.enum_ratio, args.depth, args.seed)
+    print(f"Generated {args.schemas} schemas ({len(names)} classes) in {args.out_dir}")
@@ -1,67 +1,394 @@
 # -*- coding: utf-8 -*-
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from modules.uml_generator import UMLGenerator
 from modules.uml_to_plantuml import UMLToPlantUMLConverter
 from modules.uml_to_mermaid import UMLToMermaidConverter
-import plantuml
-import subprocess
+from modules.parse_cache import ParseCache
+from modules.instrumentation import Instrumentation
+from modules.build_manifest import BuildManifest, output_files
+from modules.output_writer import write_if_changed, read_stamp, write_stamp
+from modules.watcher import PollingWatcher
+from modules.operations import iter_operations, OperationRoots
+from modules.yaml_io import load_yaml_file
+import logging
 import os
-import sys
+import time
 
-if __name__ == "__main__":
+logger = logging.getLogger("openapi2uml")
+
+
+def _int_at_least(value: str, minimum: int) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < minimum:
+        raise argparse.ArgumentTypeError(f"must be {minimum} or greater, got {number}")
+    return number
+
+
+def non_negative_int(value: str) -> int:
+    """argparse type for heltal >= 0, f.eks. --depth hvor en negativ værdi ellers stille giver et diagram med kun startklassen."""
+    return _int_at_least(value, 0)
+
+
+def positive_int(value: str) -> int:
+    """argparse type for heltal >= 1, f.eks. --workers hvor 0 ellers fejler i ThreadPoolExecutor."""
+    return _int_at_least(value, 1)
+
+
+def parse_args():
     parser = argparse.ArgumentParser(description="Generate UML diagrams from OpenAPI schemas.")
-    parser.add_argument("schema_dir", type=str, help="Path to the directory containing OpenAPI schemas.")
+    parser.add_argument("schema_dir", type=str, nargs="?", default=None, help="Path to the directory containing OpenAPI schemas, or an entry YAML file (API file or schema file, optionally with #/components/schemas/Name) whose $refs are followed lazily.")
+    parser.add_argument("--save-model", type=str, default=None, help="Save the built model to this file (.json or .json.gz) for later use with --from-model")
+    parser.add_argument("--from-model", type=str, default=None, help="Load a model saved with --save-model instead of reading schema_dir")
     parser.add_argument("--filename", "-f", type=str, default="diagram", help="Base filename for output files (without extension). Default: diagram")
     parser.add_argument("--format", choices=["plantuml", "mermaid", "both"], default="both", help="Output format: plantuml, mermaid, or both. Default: both")
-    parser.add_argument("--startclass", "-s", type=str, default=None, help="Generate UML for a specific class")
+    parser.add_argument("--startclass", "-s", type=str, default=None, help="Generate UML for a specific class. A comma separated list generates one diagram per class")
+    parser.add_argument("--all-roots", action="store_true", help="Generate one diagram per root class (classes no other class refers to)")
+    parser.add_argument("--manifest", type=str, default=None, help="File with one start class per line; generates one diagram per class")
+    parser.add_argument("--operations", type=str, default=None, help="API document whose operations each get a diagram of their request and response schemas, written to <filename>/<tag>/<operationId>")
+    parser.add_argument("--partition", choices=["components", "directories", "communities"], default=None, help="Split the model into clusters by connected component, schema directory or community detection, and write one diagram per cluster plus an index diagram")
+    parser.add_argument("--max-classes", type=positive_int, default=200, help="Maximum number of classes per cluster with --partition. Default: 200")
+    parser.add_argument("--dependents-of", type=str, default=None, help="Generate the upstream diagram of the classes that depend on this class, directly or indirectly")
+    parser.add_argument("--depth", type=non_negative_int, default=None, help="Maximum number of relationships followed from --startclass or --dependents-of. Default: no limit")
+    parser.add_argument("--workers", type=positive_int, default=os.cpu_count() or 1, help="Number of threads writing and rendering diagrams in batch mode. Default: number of cores")
+    parser.add_argument("--renderer", choices=["local", "remote"], default="remote", help="PNG renderer: local plantuml.jar or the remote PlantUML server. Default: remote")
+    parser.add_argument("--plantuml-jar", type=str, default=None, help="Path to plantuml.jar for --renderer local. Default: $PLANTUML_JAR or plantuml.jar")
+    parser.add_argument("--java", type=str, default="java", help="Java executable for --renderer local. Default: java")
+    parser.add_argument("--force", action="store_true", help="Regenerate and render all diagrams, also those the manifest or the source hashes report as up to date")
+    parser.add_argument("--watch", "-w", action="store_true", help="Keep the model in memory and regenerate the changed diagrams whenever schema files change")
+    parser.add_argument("--watch-interval", type=float, default=0.2, help="Seconds between scans of the schema directory in --watch mode. Default: 0.2")
+    parser.add_argument("--jobs", "-j", type=non_negative_int, default=1, help="Number of processes used to parse YAML files (0 = all cores). Default: 1")
+    parser.add_argument("--sharded", action="store_true", help="Also build the classes and relationships in the --jobs processes, one shard of files each, and merge the shards (directory input only)")
+    parser.add_argument("--stream-threshold", type=float, default=1.0, help="Size in MB from which a YAML file is read as a stream of schemas instead of as one document (0 = never stream). Default: 1")
+    parser.add_argument("--cache-dir", type=str, default=".uml_cache", help="Directory for the parse cache. Default: .uml_cache")
+    parser.add_argument("--cache-size", type=int, default=256, help="Maximum size of the parse cache in MB. Default: 256")
+    parser.add_argument("--no-cache", action="store_true", help="Parse all YAML files without using the parse cache")
+    parser.add_argument("--clear-cache", action="store_true", help="Clear the parse cache before generating")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("--quiet", "-q", action="store_true", help="Only log warnings and errors")
+    verbosity.add_argument("--verbose", "-v", action="store_true", help="Log details about every file, property and relationship")
+    parser.add_argument("--stats", action="store_true", help="Log per-phase timings, counters and peak memory at the end")
+    parser.add_argument("--stats-json", type=str, default=None, help="Write per-phase timings, counters and peak memory as JSON to this file")
     args = parser.parse_args()
+    if (args.schema_dir is None) == (args.from_model is None):
+        parser.error("give either schema_dir or --from-model")
+    if args.from_model is not None and args.watch:
+        parser.error("--watch needs schema_dir, it cannot be combined with --from-model")
+    modes = [option for option, value in (("--dependents-of", args.dependents_of), ("--operations", args.operations), ("--partition", args.partition)) if value is not None]
+    if modes and (args.startclass is not None or args.all_roots or args.manifest is not None):
+        parser.error(f"{modes[0]} cannot be combined with --startclass, --all-roots or --manifest")
+    if len(modes) > 1:
+        parser.error(f"{modes[0]} cannot be combined with {modes[1]}")
+    return args
+
 
-    uml_generator = UMLGenerator(args.schema_dir)
-    
+def read_manifest(path: str) -> list[str]:
+    """Læser start klasser fra en manifest fil med én klasse pr. linje. Tomme linjer og # kommentarer ignoreres."""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = (line.split("#", 1)[0].strip() for line in f)
+        return [line for line in lines if line]
+
+
+def get_start_classes(args, uml_generator: UMLGenerator) -> list[str]:
+    """Samler de ønskede start klasser fra --startclass, --all-roots og --manifest i rækkefølge uden dubletter."""
+    start_classes = []
     if args.startclass is not None:
-        print(f"Generating UML for specific class: {args.startclass}")
-        model, relations = uml_generator.get_model_from_class_name(args.startclass)
-    else:
-        model, relations = uml_generator.generate_uml()
+        start_classes.extend(name.strip() for name in args.startclass.split(",") if name.strip())
+    if args.all_roots:
+        start_classes.extend(uml_generator.get_root_classes())
+    if args.manifest is not None:
+        start_classes.extend(read_manifest(args.manifest))
+    return list(dict.fromkeys(start_classes))
 
-    
 
+def write_diagrams(model, relations, filename: str, args, renderer, stats: Instrumentation) -> list[str]:
+    """
+    Skriver diagrammerne for en model i de valgte formater og renderer PlantUML til PNG.
+
+    Filer skrives kun hvis indholdet er ændret. PNG filen renderes kun hvis hashen
+    af .puml kilden afviger fra den hash der blev gemt ved sidste rendering.
+
+    Args:
+        model (dict): Klasser indexeret efter navn
+        relations (list): Relationships mellem klasserne
+        filename (str): Filnavn uden extension
+        args: Kommandolinje argumenter
+        renderer: Renderer fra open_renderer
+        stats (Instrumentation): Opsamling af tider
+
+    Returns:
+        list[str]: De filer diagrammet består af. PNG filen mangler hvis renderingen fejlede
+    """
+    written = []
     # Generate PlantUML if requested
     if args.format in ["plantuml", "both"]:
+        from modules.plantuml_renderer import RenderError  # Allerede indlæst af open_renderer
+
         pluml_converter = UMLToPlantUMLConverter()
-        pumlstr = pluml_converter.uml_model_to_plantuml(model, relations)
-        
-        FILENAME_PUML = f"{args.filename}.puml"
-        with open(FILENAME_PUML, "w") as f:
-            f.write(pumlstr)
-        print(f"PlantUML string generated to {FILENAME_PUML}")
-
-        python_executable = sys.executable
-        
-        # Use subprocess to call python -m plantuml directly
-        try:
-            result = subprocess.run(
-                [python_executable, "-m", "plantuml", FILENAME_PUML], 
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            print(f"PlantUML diagram generated successfully: {args.filename}.png")
-            if os.path.exists(f"{args.filename}.png"):
-                print(f"File size: {os.path.getsize(f'{args.filename}.png')} bytes")
-            else:
-                print(f"Warning: {args.filename}.png was not found")
-        except subprocess.CalledProcessError as e:
-            print(f"Failed to generate PlantUML diagram: {e}")
-            print(f"Error output: {e.stderr}")
+
+        FILENAME_PUML = f"{filename}.puml"
+        with stats.phase("plantuml"):
+            digest, changed = write_if_changed(FILENAME_PUML, pluml_converter.iter_plantuml(model, relations))
+        if changed:
+            logger.info(f"PlantUML string generated to {FILENAME_PUML}")
+        else:
+            logger.info(f"PlantUML string unchanged in {FILENAME_PUML}")
+        written.append(FILENAME_PUML)
+
+        # Render PNG through the selected renderer, unless it was rendered from identical source
+        png_path = f"{os.path.splitext(FILENAME_PUML)[0]}.png"
+        if not args.force and read_stamp(png_path) == digest:
+            logger.info(f"PlantUML diagram up to date, skipping render: {png_path}")
+            stats.count("renders_skipped")
+            written.append(png_path)
+        else:
+            try:
+                with stats.phase("render"):
+                    png_path = renderer.render_file(FILENAME_PUML)
+                logger.info(f"PlantUML diagram generated successfully: {png_path}")
+                if os.path.exists(png_path):
+                    logger.info(f"File size: {os.path.getsize(png_path)} bytes")
+                    write_stamp(png_path, digest)
+                    written.append(png_path)
+                else:
+                    logger.warning(f"Warning: {png_path} was not found")
+            except RenderError as e:
+                logger.error(f"Failed to generate PlantUML diagram: {e}")
 
     # Generate Mermaid if requested
     if args.format in ["mermaid", "both"]:
         mermaid_converter = UMLToMermaidConverter()
-        mermaidstr = mermaid_converter.uml_model_to_mermaid(model, relations)
-        
-        FILENAME_MERMAID = f"{args.filename}.mmd"
-        with open(FILENAME_MERMAID, "w") as f:
-            f.write(mermaidstr)
-        print(f"Mermaid diagram generated to {FILENAME_MERMAID}")
-        print("You can view the Mermaid diagram at: https://mermaid.live/ or use mermaid-cli to generate images")
\ No newline at end of file
+
+        FILENAME_MERMAID = f"{filename}.mmd"
+        with stats.phase("mermaid"):
+            _, changed = write_if_changed(FILENAME_MERMAID, mermaid_converter.iter_mermaid(model, relations))
+        if changed:
+            logger.info(f"Mermaid diagram generated to {FILENAME_MERMAID}")
+        else:
+            logger.info(f"Mermaid diagram unchanged in {FILENAME_MERMAID}")
+        logger.info("You can view the Mermaid diagram at: https://mermaid.live/ or use mermaid-cli to generate images")
+        written.append(FILENAME_MERMAID)
+    return written
+
+
+def get_operation_jobs(args, uml_generator: UMLGenerator) -> list:
+    """
+    Opretter ét diagram job pr. operation i API dokumentet fra --operations.
+
+    Hvert diagram indeholder det der kan nås fra operationens request og response
+    schemas. Diagrammerne placeres i et directory pr. tag under --filename.
+
+    Args:
+        args: Kommandolinje argumenter
+        uml_generator (UMLGenerator): Generator med en genereret eller indlæst model
+
+    Returns:
+        list: ((uml_model, uml_relationships), filnavn) pr. operation med schemas
+    """
+    api_document = load_yaml_file(args.operations)
+    roots = OperationRoots(args.operations, api_document, uml_generator.resolver, uml_generator.uml_model)
+    jobs = []
+    seen = set()
+    for operation in iter_operations(api_document):
+        class_names = roots.roots(operation)
+        if not class_names:
+            logger.info(f"Skipping operation {operation.operation_id}: no schemas")
+            continue
+        filename = os.path.join(args.filename, operation.output_name)
+        if filename in seen:
+            logger.warning(f"Skipping operation {operation.method.upper()} {operation.path}: {filename} is already used by another operation")
+            continue
+        seen.add(filename)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        jobs.append((uml_generator.get_model_from_class_names(class_names), filename))
+    return jobs
+
+
+def generate_outputs(args, uml_generator: UMLGenerator, batch: bool, renderer, stats: Instrumentation) -> None:
+    """
+    Skriver og renderer de ønskede diagrammer fra den genererede model.
+
+    Diagrammer hvis klasser er uændrede siden sidste kørsel springes over (se BuildManifest).
+
+    Args:
+        args: Kommandolinje argumenter
+        uml_generator (UMLGenerator): Generator hvor generate_uml() er kaldt
+        batch (bool): Skriv ét diagram pr. start klasse
+        renderer: Renderer fra open_renderer
+        stats (Instrumentation): Opsamling af tider og tællere
+    """
+    model, relations = uml_generator.uml_model, uml_generator.uml_relationships
+    start_classes = get_start_classes(args, uml_generator)
+    unknown = [class_name for class_name in start_classes if class_name not in uml_generator.uml_model]
+    if unknown:
+        # One unknown name in -s or --manifest must not abort the other diagrams in the batch
+        logger.warning(f"Skipping unknown start classes: {', '.join(unknown)}")
+        start_classes = [class_name for class_name in start_classes if class_name in uml_generator.uml_model]
+    if args.operations is not None:
+        jobs = get_operation_jobs(args, uml_generator)
+    elif args.partition is not None:
+        jobs = [
+            (partition, f"{args.filename}_{name}")
+            for name, partition in uml_generator.get_partitions(args.partition, max_size=args.max_classes)
+        ]
+    elif not batch:
+        if args.dependents_of is not None:
+            logger.info(f"Generating UML for classes depending on: {args.dependents_of}")
+            model, relations = uml_generator.get_dependents_of(args.dependents_of, depth=args.depth)
+        elif start_classes:
+            logger.info(f"Generating UML for specific class: {start_classes[0]}")
+            model, relations = uml_generator.get_model_from_class_name(start_classes[0], depth=args.depth)
+        jobs = [((model, relations), args.filename)]
+    else:
+        # Subgraphs are extracted up front from the shared model; writing and rendering run concurrently
+        jobs = [
+            (uml_generator.get_model_from_class_name(class_name, depth=args.depth), f"{args.filename}_{class_name}")
+            for class_name in start_classes
+        ]
+
+    # Only diagrams containing a class whose fingerprint changed since the last run are regenerated
+    manifest = BuildManifest.for_output(args.filename)
+    fingerprints = uml_generator.class_fingerprints()
+    if manifest.fingerprints:
+        changed = manifest.changed_classes(fingerprints)
+        logger.info(f"{len(changed)} classes changed since the last run, affecting {len(manifest.dependent_diagrams(changed))} known diagrams")
+    pending = []
+    skipped = []
+    for (sub_model, sub_relations), filename in jobs:
+        files = output_files(filename, args.format)
+        digest = BuildManifest.digest(sub_model, sub_relations, fingerprints)
+        if not args.force and manifest.is_up_to_date(filename, digest, files):
+            skipped.append(filename)
+        else:
+            pending.append((sub_model, sub_relations, filename, files, digest))
+    stats.count("diagrams_skipped", len(skipped))
+    stats.count("diagrams_generated", len(pending))
+    if skipped:
+        logger.info(f"Skipped {len(skipped)} up to date diagrams: {', '.join(skipped)}")
+
+    if batch and pending:
+        logger.info(f"Generating {len(pending)} diagrams with {args.workers} workers")
+    with ThreadPoolExecutor(max_workers=args.workers if batch else 1) as executor:
+        futures = [
+            executor.submit(write_diagrams, sub_model, sub_relations, filename, args, renderer, stats)
+            for sub_model, sub_relations, filename, _, _ in pending
+        ]
+        for future, (sub_model, _, filename, files, digest) in zip(futures, pending):
+            # Diagrams with a failed rendering are not recorded, so the next run retries them
+            if future.result() == files:
+                manifest.record(filename, sub_model, digest, files)
+    manifest.save(fingerprints)
+
+
+def watch(args, uml_generator: UMLGenerator, batch: bool, renderer, stats: Instrumentation) -> None:
+    """
+    Overvåger schema directory og opdaterer modellen og diagrammerne når filer ændres.
+
+    Modellen og rendereren (og dermed en lokal PlantUML proces) holdes i live mellem
+    ændringerne. Kun de ændrede filer parses igen, og kun diagrammer der er berørt af
+    ændringen skrives og renderes. Stoppes med Ctrl+C.
+
+    Args:
+        args: Kommandolinje argumenter
+        uml_generator (UMLGenerator): Generator hvor generate_uml() er kaldt
+        batch (bool): Skriv ét diagram pr. start klasse
+        renderer: Renderer fra open_renderer
+        stats (Instrumentation): Opsamling af tider og tællere
+    """
+    schema_path = args.schema_dir.partition("#")[0]
+    watch_dir = schema_path if os.path.isdir(schema_path) else os.path.dirname(os.path.abspath(schema_path))
+    watcher = PollingWatcher(watch_dir, interval=args.watch_interval)
+    logger.info(f"Watching {watch_dir} for changes. Press Ctrl+C to stop")
+    try:
+        while True:
+            changed = watcher.wait_for_changes()
+            start = time.perf_counter()
+            try:
+                uml_generator.refresh(changed)
+                generate_outputs(args, uml_generator, batch, renderer, stats)
+            except Exception as e:
+                # A half-saved file must not end the watch; the next save is tried again
+                logger.error(f"Failed to update diagrams after changes to {', '.join(sorted(changed))}: {e}")
+                continue
+            logger.info(f"Updated {len(changed)} changed files in {(time.perf_counter() - start) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        logger.info("Stopped watching")
+
+
+def open_renderer(args, batch: bool):
+    """
+    Opretter PNG rendereren, hvis det valgte format har PlantUML output.
+
+    Renderer modulet (subprocess, tråde og evt. en JVM) importeres kun her, så
+    en kørsel med --format mermaid ikke betaler for det ved opstart.
+
+    Returns:
+        Renderer fra create_renderer, eller en tom context for --format mermaid
+    """
+    if args.format == "mermaid":
+        return nullcontext()
+    from modules.plantuml_renderer import create_renderer
+    return create_renderer(args.renderer, args.plantuml_jar, pool_size=args.workers if batch else 1, java=args.java)
+
+
+def main():
+    args = parse_args()
+
+    logging.basicConfig(
+        level=logging.WARNING if args.quiet else logging.DEBUG if args.verbose else logging.INFO,
+        format="%(message)s"
+    )
+    stats = Instrumentation(track_memory=args.stats or args.stats_json is not None)
+
+    cache = None
+    if not args.no_cache and args.from_model is None:
+        cache = ParseCache(args.cache_dir, max_size=args.cache_size * 1024 * 1024)
+        if args.clear_cache:
+            cache.clear()
+
+    uml_generator = UMLGenerator(args.schema_dir, jobs=args.jobs, cache=cache, instrumentation=stats, sharded=args.sharded,
+                                stream_threshold=int(args.stream_threshold * 1024 * 1024) if args.stream_threshold > 0 else None)
+    if args.from_model is not None:
+        uml_generator.load_model(args.from_model)
+        logger.info(f"Loaded model with {len(uml_generator.uml_model)} classes from {args.from_model}")
+        if args.partition == "directories" and uml_generator.uml_model and not uml_generator.class_sources:
+            # Model files saved before the schema files were recorded would put every class in one "root" cluster
+            logger.error(f"{args.from_model} does not record the schema file of each class; save it again with --save-model to use --partition directories")
+            raise SystemExit(1)
+    else:
+        uml_generator.generate_uml()
+    if args.save_model is not None:
+        uml_generator.save_model(args.save_model)
+        logger.info(f"Model saved to {args.save_model}")
+
+    start_classes = get_start_classes(args, uml_generator)
+    if start_classes and not any(class_name in uml_generator.uml_model for class_name in start_classes):
+        logger.error(f"Unknown start class: {', '.join(start_classes)}")
+        raise SystemExit(1)
+    if args.dependents_of is not None and args.dependents_of not in uml_generator.uml_model:
+        logger.error(f"Unknown class for --dependents-of: {args.dependents_of}")
+        raise SystemExit(1)
+    batch = len(start_classes) > 1 or args.all_roots or args.manifest is not None or args.operations is not None or args.partition is not None
+    with open_renderer(args, batch) as renderer:
+        generate_outputs(args, uml_generator, batch, renderer, stats)
+        if args.watch:
+            watch(args, uml_generator, batch, renderer, stats)
+
+    if cache is not None:
+        stats.count("cache_hits", cache.hits)
+        stats.count("cache_misses", cache.misses)
+        logger.info(f"Parse cache: {cache.hits} hits, {cache.misses} misses")
+
+    if args.stats:
+        stats.log_summary(logger)
+    if args.stats_json is not None:
+        stats.write_json(args.stats_json)
+        logger.info(f"Statistics written to {args.stats_json}")
+
+
+if __name__ == "__main__":
+    main()
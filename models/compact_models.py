@@ -0,0 +1,90 @@
+# This module will define lightweight data models for UML classes, attributes and relationships.
+from dataclasses import dataclass, field
+import sys
+
+
+@dataclass(slots=True)
+class CompactUmlClassAttribute:
+    name: str
+    type: str
+    format: str | None = None
+    description: str | None = None
+    example: str | None = None
+    required: bool = False
+    ref: str | None = None
+
+
+@dataclass(slots=True)
+class CompactUmlClass:
+    name: str
+    type: str = "class"
+    attributes: list[CompactUmlClassAttribute] = field(default_factory=list)
+    description: str | None = None
+
+
+@dataclass(slots=True)
+class CompactUmlRelationship:
+    source_name: str  # Navnet på source klassen
+    target_name: str  # Navnet på target klassen
+    name: str | None = None
+    type: str = "association"  # or "composition", "aggregation", etc.
+    description: str | None = None
+    multiplicitySource: str | None = None  # e.g., "1..*", "0..1", etc.
+    multiplicityTarget: str | None = None  # e.g., "1..*", "0..1", etc.
+
+    def __post_init__(self):
+        # Klassenavne deles mellem mange relationships, så de internes
+        self.source_name = sys.intern(self.source_name)
+        self.target_name = sys.intern(self.target_name)
+
+
+def to_pydantic(uml_model: dict[str, CompactUmlClass], uml_relationships: list[CompactUmlRelationship]) -> tuple[dict, list]:
+    """
+    Konverterer en kompakt model til validerede pydantic modeller.
+
+    Relationships får source og target sat til det samme UmlClass objekt som
+    findes i den returnerede model, så klasserne ikke kopieres pr. relationship.
+
+    Args:
+        uml_model (dict[str, CompactUmlClass]): Kompakte klasser indexeret efter navn
+        uml_relationships (list[CompactUmlRelationship]): Kompakte relationships
+
+    Returns:
+        tuple: (dict[str, UmlClass], list[UmlRelationship])
+    """
+    # Pydantic importeres først når der faktisk skal valideres
+    from models.uml_models import UmlClass, UmlClassAttribute, UmlRelationship
+
+    classes = {}
+    for class_name, uml_class in uml_model.items():
+        classes[class_name] = UmlClass(
+            name=uml_class.name,
+            type=uml_class.type,
+            attributes=[
+                UmlClassAttribute(
+                    name=attr.name,
+                    type=attr.type,
+                    format=attr.format,
+                    description=attr.description,
+                    example=attr.example,
+                    required=attr.required,
+                    ref=attr.ref
+                )
+                for attr in uml_class.attributes
+            ],
+            description=uml_class.description
+        )
+
+    relationships = [
+        UmlRelationship(
+            source=classes[rel.source_name],
+            target=classes[rel.target_name],
+            name=rel.name,
+            type=rel.type,
+            description=rel.description,
+            multiplicitySource=rel.multiplicitySource,
+            multiplicityTarget=rel.multiplicityTarget
+        )
+        for rel in uml_relationships
+    ]
+    return classes, relationships
@@ -23,4 +23,12 @@ class UmlRelationship(BaseModel):
     type: str = "association"  # or "composition", "aggregation", etc.
     description: str | None = None
     multiplicitySource: str | None = None  # e.g., "1..*", "0..1", etc.
-    multiplicityTarget: str | None = None  # e.g., "1..*", "0..1", etc.
\ No newline at end of file
+    multiplicityTarget: str | None = None  # e.g., "1..*", "0..1", etc.
+
+    @property
+    def source_name(self) -> str:
+        return self.source.name
+
+    @property
+    def target_name(self) -> str:
+        return self.target.name
@@ -0,0 +1,152 @@
+# This module will handle incremental regeneration of diagrams via a manifest of fingerprints.
+import hashlib
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = ".openapi2uml-manifest.json"
+MANIFEST_VERSION = 1
+
+
+def class_fingerprints(uml_model: dict, adjacency: dict) -> dict[str, str]:
+    """
+    Beregner et fingerprint for hver klasse i modellen.
+
+    Fingerprintet dækker klassens attributter og dens udgående relationships,
+    dvs. alt hvad et diagram viser om klassen. En ændring i et schema ændrer
+    dermed fingerprintet for klassen, og en ny eller fjernet $ref ændrer
+    fingerprintet for den klasse der refererer.
+
+    Args:
+        uml_model (dict): Klasser indexeret efter navn
+        adjacency (dict): Klassenavn -> klassens udgående relationships
+
+    Returns:
+        dict[str, str]: Klassenavn -> SHA-256 hex digest
+    """
+    return {
+        class_name: hashlib.sha256(repr((uml_class, adjacency.get(class_name, []))).encode("utf-8")).hexdigest()
+        for class_name, uml_class in uml_model.items()
+    }
+
+
+def output_files(filename: str, output_format: str) -> list[str]:
+    """Filerne et diagram med basisnavnet filename består af i det valgte format."""
+    files = []
+    if output_format in ["plantuml", "both"]:
+        files.extend([f"{filename}.puml", f"{filename}.png"])
+    if output_format in ["mermaid", "both"]:
+        files.append(f"{filename}.mmd")
+    return files
+
+
+class BuildManifest:
+    """
+    Manifest over genererede diagrammer, gemt som JSON ved siden af output filerne.
+
+    For hvert diagram gemmes klasserne i diagrammet, et digest over klassernes
+    fingerprints og de filer der blev skrevet. Et diagram er up to date når
+    digestet er uændret og alle filerne findes, så kun diagrammer der indeholder
+    en ændret klasse skal skrives og renderes igen.
+    """
+    def __init__(self, path: str):
+        """
+        Indlæser manifestet. Et manglende eller ulæseligt manifest giver et tomt manifest.
+
+        Args:
+            path (str): Sti til manifest filen
+        """
+        self.path = path
+        self.fingerprints: dict[str, str] = {}  # Klassenavn -> fingerprint fra sidste kørsel
+        self.diagrams: dict[str, dict] = {}  # Basisnavn -> {"classes", "digest", "files"}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable manifest {path}: {e}")
+            return
+        if data.get("version") != MANIFEST_VERSION:
+            logger.info(f"Ignoring manifest {path} from another version")
+            return
+        self.fingerprints = data.get("fingerprints", {})
+        self.diagrams = data.get("diagrams", {})
+
+    @classmethod
+    def for_output(cls, filename: str) -> "BuildManifest":
+        """Manifestet i samme directory som output filen med basisnavnet filename."""
+        return cls(os.path.join(os.path.dirname(filename), MANIFEST_FILENAME))
+
+    def changed_classes(self, fingerprints: dict[str, str]) -> list[str]:
+        """
+        Finder klasserne der er nye eller ændrede siden sidste kørsel.
+
+        Args:
+            fingerprints (dict[str, str]): Fingerprints for den aktuelle model
+
+        Returns:
+            list[str]: Navnene på klasserne i modellens rækkefølge
+        """
+        return [name for name, fingerprint in fingerprints.items() if self.fingerprints.get(name) != fingerprint]
+
+    @staticmethod
+    def digest(uml_model: dict, uml_relationships: list, fingerprints: dict[str, str]) -> str:
+        """
+        Digest over klasserne i et diagram og deres fingerprints samt diagrammets relationships.
+
+        Klasser der ikke er med i fingerprints (f.eks. klasserne i et oversigtsdiagram)
+        indgår med deres eget indhold.
+        """
+        h = hashlib.sha256()
+        for class_name in sorted(uml_model):
+            fingerprint = fingerprints.get(class_name) or hashlib.sha256(repr(uml_model[class_name]).encode("utf-8")).hexdigest()
+            h.update(f"{class_name}\0{fingerprint}\n".encode("utf-8"))
+        for rel in uml_relationships:
+            h.update(repr(rel).encode("utf-8"))
+        return h.hexdigest()
+
+    def is_up_to_date(self, filename: str, digest: str, files: list[str]) -> bool:
+        """
+        Afgør om et diagram kan springes over.
+
+        Args:
+            filename (str): Diagrammets basisnavn
+            digest (str): Digest for diagrammets klasser i den aktuelle model
+            files (list[str]): De filer diagrammet skal bestå af
+
+        Returns:
+            bool: True hvis digest og filer er uændrede siden diagrammet sidst blev skrevet
+        """
+        entry = self.diagrams.get(filename)
+        return (
+            entry is not None
+            and entry.get("digest") == digest
+            and entry.get("files") == files
+            and all(os.path.exists(path) for path in files)
+        )
+
+    def record(self, filename: str, class_names, digest: str, files: list[str]) -> None:
+        """Registrerer at diagrammet filename er skrevet med de givne klasser og filer."""
+        self.diagrams[filename] = {"classes": sorted(class_names), "digest": digest, "files": files}
+
+    def dependent_diagrams(self, class_names) -> list[str]:
+        """Diagrammerne fra sidste kørsel der indeholder mindst én af klasserne."""
+        class_names = set(class_names)
+        return [filename for filename, entry in self.diagrams.items() if class_names.intersection(entry.get("classes", []))]
+
+    def save(self, fingerprints: dict[str, str]) -> None:
+        """
+        Skriver manifestet med de aktuelle fingerprints.
+
+        Filen skrives til en midlertidig fil og omdøbes, så et afbrudt run ikke
+        efterlader et halvt manifest.
+        """
+        self.fingerprints = fingerprints
+        data = {"version": MANIFEST_VERSION, "fingerprints": fingerprints, "diagrams": self.diagrams}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,87 @@
+# This module will handle timing and counting instrumentation for the generation pipeline.
+from contextlib import contextmanager
+import json
+import logging
+import threading
+import time
+import tracemalloc
+
+
+class Instrumentation:
+    """
+    Samler statistik om en kørsel af pipelinen.
+
+    Registrerer wall time pr. fase, tællere (filer, schemas, relationships pr. type)
+    og, hvis det er slået til, peak memory målt med tracemalloc. Statistikken kan
+    logges eller skrives som JSON.
+    """
+    def __init__(self, track_memory: bool = False):
+        """
+        Initialiserer instrumenteringen.
+
+        Args:
+            track_memory (bool): Start tracemalloc for at måle peak memory. Koster
+                                 mærkbart på køretiden, så det er kun slået til efter behov
+        """
+        self.phases: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+        self.track_memory = track_memory
+        self._lock = threading.Lock()  # Faser og tællere kan opdateres fra worker tråde
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Måler wall time for en fase. Tiden lægges til hvis fasen køres flere gange,
+        også når den køres samtidig fra flere tråde.
+
+        Args:
+            name (str): Navnet på fasen
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """
+        Lægger amount til tælleren name.
+
+        Args:
+            name (str): Navnet på tælleren
+            amount (int): Værdien der lægges til
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    @property
+    def peak_memory(self) -> int | None:
+        """Peak memory i bytes siden tracemalloc blev startet, eller None hvis det ikke måles."""
+        if not self.track_memory or not tracemalloc.is_tracing():
+            return None
+        return tracemalloc.get_traced_memory()[1]
+
+    def to_dict(self) -> dict:
+        return {
+            "phases": {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            "counters": dict(self.counters),
+            "peak_memory_bytes": self.peak_memory,
+        }
+
+    def write_json(self, path: str) -> None:
+        """Skriver statistikken som JSON til path."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def log_summary(self, logger: logging.Logger, level: int = logging.INFO) -> None:
+        """Logger en kort opsummering af statistikken."""
+        for name, seconds in self.phases.items():
+            logger.log(level, f"Phase {name}: {seconds:.3f}s")
+        for name, value in self.counters.items():
+            logger.log(level, f"{name}: {value}")
+        if self.peak_memory is not None:
+            logger.log(level, f"Peak memory: {self.peak_memory / (1024 * 1024):.1f} MB")
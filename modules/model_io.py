@@ -0,0 +1,93 @@
+# This module will handle saving and loading a built UML model to and from a file.
+from dataclasses import fields
+import gzip
+import json
+
+from models.compact_models import CompactUmlClass, CompactUmlClassAttribute, CompactUmlRelationship
+
+MODEL_FORMAT = "openapi2uml-model"
+MODEL_VERSION = 1
+
+# Felterne gemmes positionelt i dataclassernes rækkefølge, så filen ikke gentager nøglerne
+ATTRIBUTE_FIELDS = [f.name for f in fields(CompactUmlClassAttribute)]
+RELATIONSHIP_FIELDS = [f.name for f in fields(CompactUmlRelationship)]
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def save_model(path: str, uml_model: dict[str, CompactUmlClass], uml_relationships: list[CompactUmlRelationship],
+               class_sources: dict[str, str] | None = None) -> None:
+    """
+    Gemmer en bygget model som kompakt JSON, gzip komprimeret hvis path ender på .gz.
+
+    Klasser gemmes som [navn, type, description, attributter] og attributter og
+    relationships som lister i feltrækkefølgen fra de kompakte dataclasses.
+    Klassetypen bevarer om en klasse er enum eller abstrakt (oneOf/anyOf).
+
+    Args:
+        path (str): Sti til model filen
+        uml_model (dict[str, CompactUmlClass]): Klasser indexeret efter navn
+        uml_relationships (list[CompactUmlRelationship]): Relationships mellem klasserne
+        class_sources (dict[str, str] | None): Klassenavn -> schema fil (relativ), bruges til partitionering efter directory
+    """
+    data = {
+        "format": MODEL_FORMAT,
+        "version": MODEL_VERSION,
+        "attribute_fields": ATTRIBUTE_FIELDS,
+        "relationship_fields": RELATIONSHIP_FIELDS,
+        "classes": [
+            [
+                uml_class.name,
+                uml_class.type,
+                uml_class.description,
+                [[getattr(attr, name) for name in ATTRIBUTE_FIELDS] for attr in uml_class.attributes],
+            ]
+            for uml_class in uml_model.values()
+        ],
+        "relationships": [[getattr(rel, name) for name in RELATIONSHIP_FIELDS] for rel in uml_relationships],
+        "class_sources": class_sources or {},
+    }
+    with _open(path, "w") as f:
+        json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+
+
+def load_model(path: str) -> tuple[dict[str, CompactUmlClass], list[CompactUmlRelationship], dict[str, str]]:
+    """
+    Indlæser en model gemt med save_model.
+
+    Objekterne oprettes direkte som kompakte dataclasses uden validering, da
+    filen er skrevet fra en model der allerede er valideret under linking.
+
+    Args:
+        path (str): Sti til model filen
+
+    Returns:
+        tuple: (uml_model, uml_relationships, class_sources). class_sources er tom for
+        filer gemt før schema filerne kom med i model filen
+
+    Fejlhåndtering:
+        - ValueError hvis filen ikke er en model fil i en understøttet version
+    """
+    with _open(path, "r") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or data.get("format") != MODEL_FORMAT:
+        raise ValueError(f"Not an openapi2uml model file: {path}")
+    if data.get("version") != MODEL_VERSION:
+        raise ValueError(f"Unsupported model file version {data.get('version')}: {path}")
+
+    attribute_fields = data["attribute_fields"]
+    relationship_fields = data["relationship_fields"]
+    uml_model = {}
+    for name, class_type, description, attributes in data["classes"]:
+        uml_model[name] = CompactUmlClass(
+            name=name,
+            type=class_type,
+            attributes=[CompactUmlClassAttribute(**dict(zip(attribute_fields, values))) for values in attributes],
+            description=description
+        )
+    uml_relationships = [CompactUmlRelationship(**dict(zip(relationship_fields, values))) for values in data["relationships"]]
+    return uml_model, uml_relationships, data.get("class_sources") or {}
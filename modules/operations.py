@@ -0,0 +1,126 @@
+# This module will handle discovery of API operations and their schema roots.
+from dataclasses import dataclass, field
+import logging
+import os
+import re
+
+from modules.ref_loader import iter_refs, resolve_pointer
+from modules.ref_resolver import RefResolver, split_ref, SCHEMA_POINTER_PREFIX
+
+logger = logging.getLogger(__name__)
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+UNTAGGED = "untagged"
+
+
+@dataclass(slots=True)
+class Operation:
+    operation_id: str
+    method: str
+    path: str
+    tags: list[str] = field(default_factory=list)
+    refs: list[str] = field(default_factory=list)  # $refs i parametre, request body og responses
+
+    @property
+    def output_name(self) -> str:
+        """Filnavnet for operationens diagram, relativt til output directory: '<tag>/<operationId>'."""
+        tag = self.tags[0] if self.tags else UNTAGGED
+        return os.path.join(_safe_name(tag), _safe_name(self.operation_id))
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^\w.-]", "_", name).strip(".") or "_"
+
+
+def iter_operations(api_document: dict):
+    """
+    Finder alle operationer under paths i et API dokument.
+
+    Operationer uden operationId får et id ud fra metode og sti, f.eks. 'get_/path1'.
+
+    Args:
+        api_document (dict): Parsed API dokument
+
+    Yields:
+        Operation: Hver operation i dokumentrækkefølge
+    """
+    for path, path_item in (api_document.get("paths") or {}).items():
+        if not isinstance(path_item, dict):
+            continue
+        shared_parameters = path_item.get("parameters")
+        for method in HTTP_METHODS:
+            operation = path_item.get(method)
+            if not isinstance(operation, dict):
+                continue
+            yield Operation(
+                operation_id=operation.get("operationId") or f"{method}_{path}",
+                method=method,
+                path=path,
+                tags=list(operation.get("tags") or []),
+                refs=list(iter_refs([shared_parameters, operation.get("parameters"), operation.get("requestBody"), operation.get("responses")]))
+            )
+
+
+class OperationRoots:
+    """
+    Oversætter en operations $refs til de klasser i modellen der er diagrammets rødder.
+
+    En $ref til '/components/schemas/<navn>' er en rod. En $ref til en anden del af
+    API dokumentet (f.eks. '#/components/responses/NotFound') følges, og de $refs
+    den indeholder bruges. Opslagene memoiseres, da mange operationer deler dem.
+    """
+    def __init__(self, api_path: str, api_document: dict, resolver, uml_model: dict):
+        """
+        Args:
+            api_path (str): Sti til API dokumentet
+            api_document (dict): Parsed API dokument
+            resolver (RefResolver | None): Resolveren fra den genererede model. None for en
+                model indlæst med load_model, hvor schema navnet bruges som id
+            uml_model (dict): Modellens klasser indexeret efter id
+        """
+        self.api_path = os.path.abspath(api_path)
+        self.api_document = api_document
+        self.resolver = resolver
+        self.uml_model = uml_model
+        self._roots_by_ref: dict[str, list[str]] = {}
+
+    def roots(self, operation: Operation) -> list[str]:
+        """
+        Finder operationens rod-klasser.
+
+        Args:
+            operation (Operation): Operationen
+
+        Returns:
+            list[str]: Klasse id'er i rækkefølgen de refereres, uden dubletter
+        """
+        roots = []
+        for ref in operation.refs:
+            roots.extend(self._roots_of(ref, set()))
+        return list(dict.fromkeys(roots))
+
+    def _roots_of(self, ref: str, seen: set) -> list[str]:
+        cached = self._roots_by_ref.get(ref)
+        if cached is not None:
+            return cached
+        path, pointer = split_ref(self.api_path, ref)
+        roots = []
+        if pointer.startswith(SCHEMA_POINTER_PREFIX) and pointer.count("/") == 3:
+            key = f"{path}#{pointer}"
+            class_id = self.resolver.class_id(key) if self.resolver is not None else RefResolver.name_of(key)
+            if class_id in self.uml_model:
+                roots.append(class_id)
+            else:
+                logger.warning(f"Operation schema {ref} is not in the model")
+        elif path == self.api_path and ref not in seen:
+            # Delte komponenter i API dokumentet, f.eks. responses og parameters
+            seen.add(ref)
+            try:
+                node = resolve_pointer(self.api_document, pointer)
+            except (KeyError, IndexError, ValueError):
+                logger.warning(f"Unresolvable reference in API document: {ref}")
+                node = None
+            for inner_ref in iter_refs(node):
+                roots.extend(self._roots_of(inner_ref, seen))
+        self._roots_by_ref[ref] = roots
+        return roots
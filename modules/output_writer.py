@@ -0,0 +1,97 @@
+# This module will handle content-addressed writing of diagram files.
+import hashlib
+import os
+import tempfile
+
+STAMP_SUFFIX = ".sha256"
+
+
+def _read_umask() -> int:
+    # os.umask kan kun læses ved at sætte den. Det sker én gang ved import, før der
+    # skrives fra flere tråde
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+_UMASK = _read_umask()
+
+
+def _file_mode(path: str) -> int:
+    """Rettighederne en ny version af filen skal have: den eksisterende fils, ellers 0o666 minus umask."""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def file_sha256(path: str) -> str | None:
+    """SHA-256 hex digest af en fils indhold, eller None hvis filen ikke findes."""
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    except FileNotFoundError:
+        return None
+    return h.hexdigest()
+
+
+def write_if_changed(path: str, chunks) -> tuple[str, bool]:
+    """
+    Skriver tekst til en fil, men kun hvis indholdet er ændret.
+
+    Teksten streames til en midlertidig fil i samme directory mens den hashes.
+    Er hashen den samme som for den eksisterende fil, slettes den midlertidige
+    fil, og den eksisterende fil (og dens mtime) bevares. Ellers erstatter den
+    midlertidige fil den eksisterende. mkstemp opretter filen med mode 0600, så
+    den får den eksisterende fils rettigheder (eller umask for en ny fil) først.
+
+    Args:
+        path (str): Sti til filen
+        chunks: Iterable af tekst stykker, f.eks. fra iter_plantuml
+
+    Returns:
+        tuple: (sha256 hex digest af indholdet, True hvis filen blev skrevet)
+    """
+    h = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                data = chunk.encode("utf-8")
+                h.update(data)
+                f.write(data)
+        digest = h.hexdigest()
+        if file_sha256(path) == digest:
+            os.remove(tmp_path)
+            return digest, False
+        os.chmod(tmp_path, _file_mode(path))
+        os.replace(tmp_path, path)
+        return digest, True
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_stamp(artifact_path: str) -> str | None:
+    """
+    Læser hashen af den kilde et artefakt (f.eks. en PNG) sidst blev genereret fra.
+
+    Returns:
+        str | None: Hashen, eller None hvis artefaktet eller stamp filen mangler
+    """
+    if not os.path.exists(artifact_path):
+        return None
+    try:
+        with open(f"{artifact_path}{STAMP_SUFFIX}", "r", encoding="ascii") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def write_stamp(artifact_path: str, digest: str) -> None:
+    """Gemmer hashen af den kilde artefaktet blev genereret fra, i '<artefakt>.sha256'."""
+    with open(f"{artifact_path}{STAMP_SUFFIX}", "w", encoding="ascii") as f:
+        f.write(f"{digest}\n")
@@ -0,0 +1,149 @@
+# This module will handle the on-disk cache of parsed schema files.
+import hashlib
+import json
+import os
+
+ENTRY_SUFFIX = ".json"
+
+
+class ParseCache:
+    """
+    Persistent cache af parsed YAML schema filer.
+
+    Hver indlæst fil gemmes som en JSON fil i cache directory. JSON (og ikke pickle)
+    betyder at en cache fil der er lagt ind udefra, f.eks. committet til et repository,
+    kun kan give forkert indhold og ikke afvikle kode. En entry er
+    gyldig så længe filens sti, mtime og størrelse er uændret. Hvis mtime eller
+    størrelse er ændret sammenlignes en SHA-256 hash af indholdet, så en fil der
+    blot er blevet "touched" stadig giver et cache hit.
+
+    Kun components/schemas delen af dokumentet gemmes, da resten ikke bruges
+    af UMLGenerator. Indhold som JSON ikke kan gengive præcist (f.eks. datoer eller
+    heltals nøgler fra YAML) caches ikke, så filen parses hver gang.
+    """
+    DEFAULT_MAX_SIZE = 256 * 1024 * 1024  # 256 MB
+
+    def __init__(self, cache_dir: str, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        Initialiserer cachen.
+
+        Args:
+            cache_dir (str): Directory hvor cache entries gemmes (oprettes hvis det mangler)
+            max_size (int): Maksimal samlet størrelse af cachen i bytes før eviction
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_path(self, path: str) -> str:
+        key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}{ENTRY_SUFFIX}")
+
+    @staticmethod
+    def _content_hash(path: str) -> str:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def get(self, path: str) -> tuple[bool, dict | None]:
+        """
+        Slår en fil op i cachen.
+
+        Args:
+            path (str): Sti til YAML filen
+
+        Returns:
+            tuple: (hit, content) hvor content er det cachede indhold (None for filer
+                   uden components/schemas). Ved et miss er content altid None.
+        """
+        entry_path = self._entry_path(path)
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            stat = os.stat(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return False, None
+        if not isinstance(entry, dict) or entry.get("path") != os.path.abspath(path) or not {"mtime_ns", "size", "sha256", "content"} <= entry.keys():
+            self.misses += 1
+            return False, None
+
+        if entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            # Metadata er ændret - tjek om indholdet også er
+            if entry["size"] != stat.st_size or entry["sha256"] != self._content_hash(path):
+                self.misses += 1
+                return False, None
+            entry["mtime_ns"] = stat.st_mtime_ns
+            self._write_entry(entry_path, entry)
+        else:
+            # Markér entry som nyligt brugt til eviction
+            os.utime(entry_path)
+
+        self.hits += 1
+        return True, entry["content"]
+
+    def put(self, path: str, loaded: dict | None) -> None:
+        """
+        Gemmer det parsede indhold af en fil i cachen.
+
+        Args:
+            path (str): Sti til YAML filen
+            loaded (dict | None): Parsed YAML dokument, eller None hvis filen ikke er et schema
+        """
+        content = None
+        if loaded is not None:
+            content = {"components": {"schemas": loaded["components"]["schemas"]}}
+            try:
+                exact = json.loads(json.dumps(content)) == content
+            except (TypeError, ValueError):
+                exact = False
+            if not exact:
+                return
+        stat = os.stat(path)
+        entry = {
+            "path": os.path.abspath(path),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": self._content_hash(path),
+            "content": content,
+        }
+        self._write_entry(self._entry_path(path), entry)
+
+    @staticmethod
+    def _write_entry(entry_path: str, entry: dict) -> None:
+        tmp_path = f"{entry_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, separators=(",", ":"), ensure_ascii=False)
+        os.replace(tmp_path, entry_path)
+
+    def evict(self) -> int:
+        """
+        Fjerner de ældst brugte entries indtil cachen er under max_size.
+
+        Returns:
+            int: Antal fjernede entries
+        """
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(ENTRY_SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Sletter alle entries i cachen."""
+        for entry in os.scandir(self.cache_dir):
+            # .pickle er entries fra tidligere versioner af cachen
+            if entry.name.endswith((ENTRY_SUFFIX, ".pickle", ".tmp")):
+                os.remove(entry.path)
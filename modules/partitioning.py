@@ -0,0 +1,232 @@
+# This module will handle partitioning of large UML models into clustered sub-diagrams.
+from collections import Counter, deque
+from dataclasses import dataclass, field
+import logging
+import os
+import re
+
+from models.compact_models import CompactUmlClass, CompactUmlClassAttribute, CompactUmlRelationship
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("components", "directories", "communities")
+INDEX_NAME = "index"  # Navnet på oversigtsdiagrammet, som et cluster derfor ikke må have
+
+
+@dataclass(slots=True)
+class Cluster:
+    name: str
+    classes: list[str] = field(default_factory=list)
+
+
+def _undirected_neighbours(uml_model: dict, uml_relationships: list) -> dict[str, list[str]]:
+    neighbours: dict[str, list[str]] = {class_name: [] for class_name in uml_model}
+    for rel in uml_relationships:
+        if rel.source_name != rel.target_name:
+            neighbours[rel.source_name].append(rel.target_name)
+            neighbours[rel.target_name].append(rel.source_name)
+    return neighbours
+
+
+def _connected_components(uml_model: dict, neighbours: dict) -> list[list[str]]:
+    seen = set()
+    components = []
+    for start in uml_model:
+        if start in seen:
+            continue
+        seen.add(start)
+        component = [start]
+        queue = deque([start])
+        while queue:
+            for neighbour in neighbours[queue.popleft()]:
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    component.append(neighbour)
+                    queue.append(neighbour)
+        components.append(component)
+    return components
+
+
+def _communities(uml_model: dict, neighbours: dict, max_iterations: int = 20) -> list[list[str]]:
+    # Label propagation: hver klasse får den label flest af dens naboer har. Klasserne
+    # besøges i modellens rækkefølge og uafgjort afgøres af labelens position, så
+    # resultatet er deterministisk
+    order = {class_name: position for position, class_name in enumerate(uml_model)}
+    labels = {class_name: class_name for class_name in uml_model}
+    for _ in range(max_iterations):
+        changed = False
+        for class_name in uml_model:
+            if not neighbours[class_name]:
+                continue
+            counts = Counter(labels[neighbour] for neighbour in neighbours[class_name])
+            best = max(counts.items(), key=lambda item: (item[1], -order[item[0]]))[0]
+            if best != labels[class_name]:
+                labels[class_name] = best
+                changed = True
+        if not changed:
+            break
+    groups: dict[str, list[str]] = {}
+    for class_name in uml_model:
+        groups.setdefault(labels[class_name], []).append(class_name)
+    return list(groups.values())
+
+
+def _split(classes: list[str], neighbours: dict, max_size: int) -> list[list[str]]:
+    # Deler en for stor gruppe i bidder af højst max_size ved bredde-først gennemløb
+    # inden for gruppen, så klasser der hænger sammen havner i samme bid
+    if max_size < 1:
+        raise ValueError(f"max_size must be at least 1, got {max_size}")
+    if len(classes) <= max_size:
+        return [classes]
+    members = set(classes)
+    seen = set()
+    ordered = []
+    for start in classes:
+        if start in seen:
+            continue
+        seen.add(start)
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            ordered.append(current)
+            for neighbour in neighbours[current]:
+                if neighbour in members and neighbour not in seen:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+    return [ordered[index:index + max_size] for index in range(0, len(ordered), max_size)]
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"\W", "_", name).strip("_") or "root"
+
+
+def _unique_names(names: list[str]) -> list[str]:
+    # Forskellige directories kan give samme sikre navn (a-b og a_b, et directory
+    # der hedder root) eller ramme et andet clusters _N suffix. Senere forekomster
+    # får det første ledige _N suffix, så hvert cluster skrives til sin egen fil
+    taken = {INDEX_NAME}
+    unique = []
+    for name in names:
+        candidate, index = name, 1
+        while candidate in taken:
+            index += 1
+            candidate = f"{name}_{index}"
+        taken.add(candidate)
+        unique.append(candidate)
+    return unique
+
+
+def partition_model(uml_model: dict, uml_relationships: list, strategy: str = "components", max_size: int = 200, class_sources: dict[str, str] | None = None) -> list[Cluster]:
+    """
+    Deler modellen i clusters, der hver kan vises som et selvstændigt diagram.
+
+    Strategier:
+        components:  Sammenhængende komponenter (relationships uden retning)
+        directories: Det directory klassens schema fil ligger i
+        communities: Community detection med label propagation
+
+    Clusters større end max_size deles i bidder ved bredde-først gennemløb.
+    Navnene er unikke og aldrig INDEX_NAME, så de kan bruges direkte i filnavne.
+
+    Args:
+        uml_model (dict): Klasser indexeret efter navn
+        uml_relationships (list): Relationships mellem klasserne
+        strategy (str): En af STRATEGIES
+        max_size (int): Maksimalt antal klasser pr. cluster
+        class_sources (dict[str, str] | None): Klassenavn -> schema fil, bruges af "directories"
+
+    Returns:
+        list[Cluster]: Clusters i modellens rækkefølge
+
+    Fejlhåndtering:
+        - ValueError ved en ukendt strategi eller max_size under 1
+    """
+    neighbours = _undirected_neighbours(uml_model, uml_relationships)
+    if strategy == "components":
+        groups = [(f"cluster_{index + 1:03d}", classes) for index, classes in enumerate(_connected_components(uml_model, neighbours))]
+    elif strategy == "communities":
+        groups = [(f"community_{index + 1:03d}", classes) for index, classes in enumerate(_communities(uml_model, neighbours))]
+    elif strategy == "directories":
+        class_sources = class_sources or {}
+        by_directory: dict[str, list[str]] = {}
+        for class_name in uml_model:
+            directory = os.path.dirname(class_sources.get(class_name, ""))
+            by_directory.setdefault(directory, []).append(class_name)
+        groups = [(_safe_name(directory), classes) for directory, classes in by_directory.items()]
+    else:
+        raise ValueError(f"Unknown partitioning strategy: {strategy}")
+
+    clusters = []
+    for name, classes in groups:
+        parts = _split(classes, neighbours, max_size)
+        if len(parts) == 1:
+            clusters.append(Cluster(name, parts[0]))
+        else:
+            clusters.extend(Cluster(f"{name}_{index + 1}", part) for index, part in enumerate(parts))
+    for cluster, name in zip(clusters, _unique_names([cluster.name for cluster in clusters])):
+        cluster.name = name
+    logger.debug("Partitioned %d classes into %d clusters (%s)", len(uml_model), len(clusters), strategy)
+    return clusters
+
+
+def cluster_model(cluster: Cluster, uml_model: dict, adjacency: dict) -> tuple[dict[str, CompactUmlClass], list[CompactUmlRelationship]]:
+    """
+    Bygger diagrammet for et cluster.
+
+    Relationships tegnes i det cluster deres source ligger i. Peger de ud af
+    clusteret, tilføjes target som en stub uden attributter.
+
+    Args:
+        cluster (Cluster): Clusteret
+        uml_model (dict): Hele modellens klasser
+        adjacency (dict): Klassenavn -> klassens udgående relationships
+
+    Returns:
+        tuple: (uml_model, uml_relationships) for clusteret inklusive stubs
+    """
+    members = set(cluster.classes)
+    model = {class_name: uml_model[class_name] for class_name in cluster.classes}
+    relationships = []
+    for class_name in cluster.classes:
+        for rel in adjacency.get(class_name, ()):
+            relationships.append(rel)
+            if rel.target_name not in members and rel.target_name not in model:
+                target = uml_model[rel.target_name]
+                model[rel.target_name] = CompactUmlClass(
+                    name=target.name,
+                    type=target.type,
+                    description=f"Stub for a class in another cluster. {target.description or ''}".strip()
+                )
+    return model, relationships
+
+
+def index_model(clusters: list[Cluster], uml_relationships: list) -> tuple[dict[str, CompactUmlClass], list[CompactUmlRelationship]]:
+    """
+    Bygger oversigtsdiagrammet med én klasse pr. cluster og en association for hver
+    retning der er relationships mellem to clusters.
+
+    Args:
+        clusters (list[Cluster]): Clusters fra partition_model
+        uml_relationships (list): Hele modellens relationships
+
+    Returns:
+        tuple: (uml_model, uml_relationships) for oversigten
+    """
+    cluster_of = {class_name: cluster.name for cluster in clusters for class_name in cluster.classes}
+    model = {
+        cluster.name: CompactUmlClass(
+            name=cluster.name,
+            attributes=[CompactUmlClassAttribute(name="classes", type=str(len(cluster.classes)), required=True)]
+        )
+        for cluster in clusters
+    }
+    edges = Counter(
+        (cluster_of[rel.source_name], cluster_of[rel.target_name])
+        for rel in uml_relationships
+        if cluster_of[rel.source_name] != cluster_of[rel.target_name]
+    )
+    relationships = [
+        CompactUmlRelationship(source_name=source, target_name=target, name=f"{count} relationships", type="association")
+        for (source, target), count in edges.items()
+    ]
+    return model, relationships
@@ -0,0 +1,255 @@
+# This module will handle rendering of PlantUML files to PNG images.
+import logging
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class RenderError(Exception):
+    """Fejl under rendering af et PlantUML diagram."""
+
+
+class RemoteRenderer:
+    """
+    Renderer der kalder `python -m plantuml` for hver fil.
+
+    plantuml pakken sender diagrammet til en PlantUML server og skriver
+    `<navn>.png` ved siden af .puml filen.
+    """
+    def render_file(self, puml_path: str) -> str:
+        """
+        Renderer en .puml fil til PNG.
+
+        Args:
+            puml_path (str): Sti til .puml filen
+
+        Returns:
+            str: Sti til den genererede PNG fil
+
+        Fejlhåndtering:
+            - RenderError hvis plantuml kaldet fejler
+        """
+        try:
+            subprocess.run(
+                [sys.executable, "-m", "plantuml", puml_path],
+                check=True,
+                capture_output=True,
+                text=True
+            )
+        except subprocess.CalledProcessError as e:
+            raise RenderError(f"{e}\n{e.stderr}") from e
+        return f"{os.path.splitext(puml_path)[0]}.png"
+
+    def render(self, source: str) -> bytes:
+        """
+        Renderer PlantUML kildetekst til et PNG billede via en midlertidig fil.
+
+        Args:
+            source (str): PlantUML diagram (@startuml ... @enduml)
+
+        Returns:
+            bytes: PNG billedet
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            puml_path = os.path.join(tmp_dir, "diagram.puml")
+            with open(puml_path, "w", encoding="utf-8") as f:
+                f.write(source)
+            with open(self.render_file(puml_path), "rb") as f:
+                return f.read()
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LocalRenderer:
+    """
+    Renderer der driver en lokal plantuml.jar i en langlivet proces.
+
+    Processen startes med `-pipe`, så mange diagrammer kan sendes gennem den
+    samme JVM. Efter hvert billede skriver PlantUML en unik delimiter, som
+    bruges til at skille billederne ad i output.
+    """
+    def __init__(self, jar_path: str, java: str = "java"):
+        """
+        Initialiserer rendereren. Processen startes først ved første rendering.
+
+        Args:
+            jar_path (str): Sti til plantuml.jar
+            java (str): Java executable
+        """
+        self.jar_path = jar_path
+        self.java = java
+        self.delimiter = f"--plantuml-{uuid.uuid4().hex}--".encode("ascii")
+        self._process: subprocess.Popen | None = None
+        self._pending = bytearray()  # Output læst efter seneste delimiter
+        self._lock = threading.Lock()
+
+    def _start(self) -> subprocess.Popen:
+        if not os.path.exists(self.jar_path):
+            raise RenderError(f"PlantUML jar not found: {self.jar_path}")
+        logger.debug("Starting local PlantUML renderer: %s", self.jar_path)
+        return subprocess.Popen(
+            [self.java, "-Djava.awt.headless=true", "-jar", self.jar_path,
+             "-pipe", "-tpng", "-charset", "UTF-8", "-pipedelimitor", self.delimiter.decode("ascii")],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+
+    def render(self, source: str) -> bytes:
+        """
+        Renderer PlantUML kildetekst til et PNG billede.
+
+        Args:
+            source (str): PlantUML diagram (@startuml ... @enduml)
+
+        Returns:
+            bytes: PNG billedet
+
+        Fejlhåndtering:
+            - RenderError hvis processen ikke kan startes eller dør undervejs
+        """
+        with self._lock:
+            try:
+                if self._process is None or self._process.poll() is not None:
+                    self._process = self._start()
+                    self._pending = bytearray()
+                process = self._process
+                process.stdin.write(source.encode("utf-8"))
+                if not source.endswith("\n"):
+                    process.stdin.write(b"\n")
+                process.stdin.flush()
+                return self._read_image(process)
+            except (OSError, RenderError) as e:
+                self._stop()
+                raise RenderError(f"Local PlantUML renderer failed: {e}") from e
+
+    def _read_image(self, process: subprocess.Popen) -> bytes:
+        # Linjeskiftet efter forrige delimiter kan ankomme sammen med næste billede.
+        # PNG data starter med b"\x89PNG", så ledende linjeskift kan fjernes sikkert
+        buffer = self._pending
+        while True:
+            index = buffer.find(self.delimiter)
+            if index >= 0:
+                image = bytes(buffer[:index]).lstrip(b"\r\n")
+                self._pending = bytearray(buffer[index + len(self.delimiter):])
+                return image
+            chunk = process.stdout.read1(65536)
+            if not chunk:
+                raise RenderError("PlantUML process exited while rendering")
+            buffer += chunk
+
+    def render_file(self, puml_path: str) -> str:
+        """
+        Renderer en .puml fil til `<navn>.png` ved siden af filen.
+
+        Args:
+            puml_path (str): Sti til .puml filen
+
+        Returns:
+            str: Sti til den genererede PNG fil
+        """
+        with open(puml_path, "r", encoding="utf-8") as f:
+            image = self.render(f.read())
+        png_path = f"{os.path.splitext(puml_path)[0]}.png"
+        with open(png_path, "wb") as f:
+            f.write(image)
+        return png_path
+
+    def _stop(self) -> None:
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._process.stdin.close()
+                try:
+                    self._process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self._process.kill()
+            self._process = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LocalRendererPool:
+    """
+    Lille pulje af LocalRenderer processer, så flere tråde kan rendere samtidig.
+
+    Processerne startes først når de bruges første gang.
+    """
+    def __init__(self, jar_path: str, size: int = 1, java: str = "java"):
+        """
+        Initialiserer puljen.
+
+        Args:
+            jar_path (str): Sti til plantuml.jar
+            size (int): Antal renderer processer
+            java (str): Java executable
+        """
+        self._renderers = [LocalRenderer(jar_path, java) for _ in range(max(1, size))]
+        self._available: queue.Queue[LocalRenderer] = queue.Queue()
+        for renderer in self._renderers:
+            self._available.put(renderer)
+
+    def render(self, source: str) -> bytes:
+        renderer = self._available.get()
+        try:
+            return renderer.render(source)
+        finally:
+            self._available.put(renderer)
+
+    def render_file(self, puml_path: str) -> str:
+        renderer = self._available.get()
+        try:
+            return renderer.render_file(puml_path)
+        finally:
+            self._available.put(renderer)
+
+    def close(self) -> None:
+        for renderer in self._renderers:
+            renderer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def create_renderer(kind: str = "remote", jar_path: str | None = None, pool_size: int = 1, java: str = "java"):
+    """
+    Opretter en renderer ud fra navnet.
+
+    Args:
+        kind (str): "local" for plantuml.jar, "remote" for python -m plantuml
+        jar_path (str | None): Sti til plantuml.jar. None = PLANTUML_JAR miljøvariabel eller "plantuml.jar"
+        pool_size (int): Antal lokale renderer processer
+        java (str): Java executable
+
+    Returns:
+        RemoteRenderer | LocalRendererPool: Renderer med render(), render_file() og close()
+    """
+    if kind == "local":
+        jar_path = jar_path or os.environ.get("PLANTUML_JAR", "plantuml.jar")
+        return LocalRendererPool(jar_path, pool_size, java)
+    if kind == "remote":
+        return RemoteRenderer()
+    raise ValueError(f"Unknown renderer: {kind}")
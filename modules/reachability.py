@@ -0,0 +1,143 @@
+# This module will handle precomputed reachability between classes in the UML model.
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ReachabilityIndex:
+    """
+    Index over hvilke klasser der kan nås fra hver klasse i modellen.
+
+    Grafen kondenseres til strongly connected components (Tarjan), så klasser
+    der refererer til hinanden i en cyklus deler én komponent. En forespørgsel
+    gennemløber kondensationen (en DAG) fra klassens komponent, og resultatet
+    memoiseres kun for den komponent der blev spurgt om. Møder gennemløbet en
+    komponent der allerede er spurgt om, bruges dens mængde i stedet for at gå
+    videre, så delte dele af modellen genbruges uden at der bygges en mængde for
+    hver komponent undervejs (det ville koste O(n²) på lange kæder).
+    """
+    def __init__(self, nodes: list[str], successors: dict[str, list[str]]):
+        """
+        Bygger kondensationen af grafen.
+
+        Args:
+            nodes (list[str]): Alle klasser i modellens rækkefølge
+            successors (dict[str, list[str]]): Klasse -> klasser den har en relationship til
+        """
+        self._order = {node: position for position, node in enumerate(nodes)}
+        self.component_of: dict[str, int] = {}  # Klasse -> komponent nummer
+        self.components: list[list[str]] = []  # Klasserne i hver komponent
+        self._condense(nodes, successors)
+        self._component_successors: list[set[int]] = [set() for _ in self.components]
+        for node, targets in successors.items():
+            component = self.component_of[node]
+            for target in targets:
+                target_component = self.component_of[target]
+                if target_component != component:
+                    self._component_successors[component].add(target_component)
+        self._closures: dict[int, frozenset[str]] = {}
+        logger.debug("Condensed %d classes into %d components", len(nodes), len(self.components))
+
+    def _condense(self, nodes: list[str], successors: dict[str, list[str]]) -> None:
+        # Iterativ Tarjan, så dybe modeller ikke rammer rekursionsgrænsen.
+        # Komponenterne nummereres i omvendt topologisk rækkefølge (efterfølgere først)
+        index: dict[str, int] = {}
+        low: dict[str, int] = {}
+        stack: list[str] = []
+        on_stack: set[str] = set()
+        for root in nodes:
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(successors.get(root, ())))]
+            while work:
+                node, targets = work[-1]
+                for target in targets:
+                    if target not in index:
+                        index[target] = low[target] = len(index)
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, iter(successors.get(target, ()))))
+                        break
+                    if target in on_stack:
+                        low[node] = min(low[node], index[target])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        component = len(self.components)
+                        members = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            self.component_of[member] = component
+                            members.append(member)
+                            if member == node:
+                                break
+                        self.components.append(members)
+
+    def reachable(self, node: str) -> frozenset[str]:
+        """
+        Finder alle klasser der kan nås fra node, inklusive node selv.
+
+        Args:
+            node (str): Navnet på startklassen
+
+        Returns:
+            frozenset[str]: De klasser der kan nås
+
+        Fejlhåndtering:
+            - KeyError hvis klassen ikke er med i indexet
+        """
+        component = self.component_of[node]
+        closure = self._closures.get(component)
+        if closure is not None:
+            return closure
+
+        reachable = set(self.components[component])
+        seen = {component}
+        pending = list(self._component_successors[component])
+        seen.update(pending)
+        while pending:
+            current = pending.pop()
+            known = self._closures.get(current)
+            if known is not None:
+                reachable.update(known)
+                continue
+            reachable.update(self.components[current])
+            for successor in self._component_successors[current]:
+                if successor not in seen:
+                    seen.add(successor)
+                    pending.append(successor)
+        closure = self._closures[component] = frozenset(reachable)
+        return closure
+
+    def ordered_reachable(self, node: str) -> list[str]:
+        """
+        Klasserne der kan nås fra node, med node først og resten i modellens rækkefølge.
+
+        Args:
+            node (str): Navnet på startklassen
+
+        Returns:
+            list[str]: De klasser der kan nås
+        """
+        return self.ordered_union([node])
+
+    def ordered_union(self, nodes: list[str]) -> list[str]:
+        """
+        Klasserne der kan nås fra mindst én af nodes, med nodes først og resten i modellens rækkefølge.
+
+        Args:
+            nodes (list[str]): Navnene på startklasserne
+
+        Returns:
+            list[str]: De klasser der kan nås
+        """
+        roots = list(dict.fromkeys(nodes))
+        reachable = set().union(*(self.reachable(node) for node in roots)).difference(roots)
+        return [*roots, *sorted(reachable, key=self._order.__getitem__)]
@@ -0,0 +1,152 @@
+# This module will handle lazy loading of schemas by following $ref references.
+from collections import deque
+import logging
+import os
+
+from modules.yaml_io import load_yaml_file
+from modules.ref_resolver import split_ref, pointer_name, SCHEMA_POINTER_PREFIX
+
+logger = logging.getLogger(__name__)
+
+
+def iter_refs(node):
+    """
+    Finder alle $ref værdier i en YAML struktur.
+
+    Args:
+        node: dict, list eller skalar fra et parsed YAML dokument
+
+    Yields:
+        str: Hver $ref værdi i dokumentrækkefølge
+    """
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            ref = current.get("$ref")
+            if isinstance(ref, str):
+                yield ref
+            stack.extend(reversed([value for key, value in current.items() if key != "$ref"]))
+        elif isinstance(current, list):
+            stack.extend(reversed(current))
+
+
+def resolve_pointer(document, pointer: str):
+    """
+    Slår en JSON pointer (RFC 6901) op i et dokument.
+
+    Args:
+        document: Parsed YAML dokument
+        pointer (str): JSON pointer, f.eks. "/components/schemas/A". "" = hele dokumentet
+
+    Returns:
+        Noden pointeren peger på
+
+    Fejlhåndtering:
+        - KeyError hvis pointeren ikke findes i dokumentet
+    """
+    node = document
+    if not pointer:
+        return node
+    for token in pointer.lstrip("/").split("/"):
+        token = token.replace("~1", "/").replace("~0", "~")
+        if isinstance(node, list):
+            node = node[int(token)]
+        elif isinstance(node, dict) and token in node:
+            node = node[token]
+        else:
+            raise KeyError(pointer)
+    return node
+
+
+class RefLoader:
+    """
+    Indlæser kun de schemas der kan nås fra et entry dokument.
+
+    Relative $refs (f.eks. './B.yaml#/components/schemas/B') løses i forhold til det
+    dokument de står i. Hvert dokument parses først når det nås første gang og
+    memoiseres på dets absolutte sti.
+    """
+    def __init__(self):
+        self.documents: dict[str, object] = {}  # Parsed dokumenter indexeret efter absolut sti
+
+    def load_document(self, path: str):
+        """
+        Henter et dokument, og parser det kun hvis det ikke allerede er indlæst.
+
+        Args:
+            path (str): Sti til YAML filen
+
+        Returns:
+            Parsed dokument, eller None hvis filen ikke findes
+        """
+        path = os.path.abspath(path)
+        if path not in self.documents:
+            logger.debug("Loading YAML file: %s", path)
+            try:
+                self.documents[path] = load_yaml_file(path)
+            except FileNotFoundError:
+                logger.warning(f"Referenced file not found: {path}")
+                self.documents[path] = None
+        return self.documents[path]
+
+    def load_reachable(self, entry: str) -> dict[str, dict]:
+        """
+        Indlæser de schemas der kan nås fra et entry dokument.
+
+        Entry kan være:
+        - Et API dokument med paths: alle $refs under paths er startpunkter
+        - En schema fil: alle schemas i filen er startpunkter
+        - En schema fil med pointer, f.eks. 'schemas/A.yaml#/components/schemas/Aext'
+
+        Args:
+            entry (str): Sti til entry dokumentet, evt. med #pointer
+
+        Returns:
+            dict: Samme struktur som _load_yaml_recursive - filnavn (relativt til entry
+                  dokumentets directory) som nøgle og et dokument med components/schemas
+                  som værdi. Kun de schemas der kan nås er med.
+        """
+        entry_file, _, entry_pointer = entry.partition("#")
+        entry_path = os.path.abspath(entry_file)
+        entry_dir = os.path.dirname(entry_path)
+        document = self.load_document(entry_path)
+        if not isinstance(document, dict):
+            raise ValueError(f"Entry document is not a YAML mapping: {entry_file}")
+
+        queue = deque()
+        if entry_pointer:
+            queue.append((entry_path, entry_pointer))
+        elif "paths" in document:
+            queue.extend(split_ref(entry_path, ref) for ref in iter_refs(document["paths"]))
+        else:
+            schemas = (document.get("components") or {}).get("schemas") or {}
+            queue.extend((entry_path, f"{SCHEMA_POINTER_PREFIX}{name}") for name in schemas)
+
+        reachable: dict[str, dict] = {}
+        seen = set()
+        while queue:
+            path, pointer = queue.popleft()
+            if (path, pointer) in seen:
+                continue
+            seen.add((path, pointer))
+
+            document = self.load_document(path)
+            if document is None:
+                continue
+            try:
+                node = resolve_pointer(document, pointer)
+            except (KeyError, IndexError, ValueError):
+                logger.warning(f"Unresolvable reference: {path}#{pointer}")
+                continue
+
+            if pointer.startswith(SCHEMA_POINTER_PREFIX) and pointer.count("/") == 3:
+                name = pointer_name(pointer)
+                key = os.path.relpath(path, entry_dir)
+                schemas = reachable.setdefault(key, {"components": {"schemas": {}}})["components"]["schemas"]
+                schemas[name] = node
+
+            queue.extend(split_ref(path, ref) for ref in iter_refs(node))
+
+        logger.debug("Loaded %d of the referenced documents lazily", len(self.documents))
+        return reachable
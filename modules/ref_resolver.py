@@ -0,0 +1,159 @@
+# This module will handle resolution of $ref references to canonical keys and class ids.
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_POINTER_PREFIX = "/components/schemas/"
+
+
+def split_ref(base_path: str, ref: str) -> tuple[str, str]:
+    """
+    Opdeler en $ref i absolut filsti og JSON pointer.
+
+    Args:
+        base_path (str): Absolut sti til dokumentet hvor referencen står
+        ref (str): $ref værdien, f.eks. '../enums/MyEnum.yaml#/components/schemas/MyEnum'
+
+    Returns:
+        tuple: (absolut filsti, pointer)
+    """
+    file_part, _, pointer = ref.partition("#")
+    if not file_part:
+        return base_path, pointer
+    return os.path.normpath(os.path.join(os.path.dirname(base_path), file_part)), pointer
+
+
+def pointer_name(pointer: str) -> str:
+    """Returnerer det sidste token i en JSON pointer, dvs. schema navnet for '/components/schemas/Name'."""
+    return pointer.rsplit("/", 1)[-1].replace("~1", "/").replace("~0", "~")
+
+
+class RefResolver:
+    """
+    Normaliserer $refs til kanoniske nøgler og tildeler stabile klasse id'er.
+
+    En kanonisk nøgle er strengen '<absolut fil>#<JSON pointer>', så den samme
+    definition får samme nøgle uanset hvilken fil den refereres fra, og hvordan
+    den relative sti er skrevet.
+
+    Klasse id'et er schema navnet når navnet er unikt. Hvis flere filer definerer
+    samme schema navn, får alle definitionerne et id med så mange af filens
+    stikomponenter som præfiks som der skal til for at gøre dem unikke,
+    f.eks. 'v1_Pet_Pet' og 'v2_Pet_Pet'. Kollisionerne logges og gemmes i
+    self.collisions.
+    """
+    def __init__(self, base_dir: str):
+        """
+        Initialiserer resolveren.
+
+        Args:
+            base_dir (str): Directory som filstier i namespaced id'er er relative til
+        """
+        self.base_dir = os.path.abspath(base_dir)
+        self.collisions: dict[str, list[str]] = {}  # Schema navn -> kanoniske nøgler der kolliderer
+        self._canonical_cache: dict[tuple[str, str], str] = {}
+        self._ids: dict[str, str] = {}  # Kanonisk nøgle -> klasse id
+        self._ids_by_name: dict[str, list[str]] = {}  # Schema navn -> klasse id'er
+
+    @staticmethod
+    def schema_key(document_path: str, schema_name: str) -> str:
+        """Kanonisk nøgle for et schema defineret i components/schemas i document_path."""
+        escaped = schema_name.replace("~", "~0").replace("/", "~1")
+        return f"{document_path}#{SCHEMA_POINTER_PREFIX}{escaped}"
+
+    def canonical(self, document_path: str, ref: str) -> str:
+        """
+        Normaliserer en $ref til en kanonisk nøgle. Resultatet caches pr. directory og ref.
+
+        Args:
+            document_path (str): Absolut sti til dokumentet hvor referencen står
+            ref (str): $ref værdien
+
+        Returns:
+            str: Kanonisk nøgle '<absolut fil>#<pointer>'
+        """
+        cache_key = (document_path if ref.startswith("#") else os.path.dirname(document_path), ref)
+        key = self._canonical_cache.get(cache_key)
+        if key is None:
+            path, pointer = split_ref(document_path, ref)
+            key = f"{path}#{pointer}"
+            self._canonical_cache[cache_key] = key
+        return key
+
+    @staticmethod
+    def name_of(key: str) -> str:
+        """Schema navnet for en kanonisk nøgle."""
+        return pointer_name(key.partition("#")[2])
+
+    def assign_ids(self, keys: list[str]) -> dict[str, str]:
+        """
+        Tildeler klasse id'er til alle schema definitioner.
+
+        Args:
+            keys (list[str]): Kanoniske nøgler for alle schemas i modellen
+
+        Returns:
+            dict[str, str]: Kanonisk nøgle -> klasse id
+
+        Side effects:
+            - Logger en advarsel for hvert schema navn der er defineret i flere filer
+        """
+        by_name: dict[str, list[str]] = {}
+        for key in keys:
+            by_name.setdefault(self.name_of(key), []).append(key)
+
+        self._ids = {}
+        self._ids_by_name = {}
+        self.collisions = {}
+        for name, name_keys in by_name.items():
+            if len(name_keys) == 1:
+                self._ids[name_keys[0]] = name
+            else:
+                self.collisions[name] = name_keys
+                for key, class_id in zip(name_keys, self._namespaced_ids(name, name_keys)):
+                    self._ids[key] = class_id
+                logger.warning(
+                    f"Schema name '{name}' is defined in {len(name_keys)} files: "
+                    + ", ".join(f"{self._relative_file(key)} -> {self._ids[key]}" for key in name_keys)
+                )
+            self._ids_by_name[name] = [self._ids[key] for key in name_keys]
+        return dict(self._ids)
+
+    def _relative_file(self, key: str) -> str:
+        return os.path.relpath(key.partition("#")[0], self.base_dir)
+
+    def _namespaced_ids(self, name: str, keys: list[str]) -> list[str]:
+        paths = [os.path.splitext(self._relative_file(key))[0].split(os.sep) for key in keys]
+        for length in range(1, max(len(parts) for parts in paths) + 1):
+            prefixes = ["_".join(parts[-length:]) for parts in paths]
+            if len(set(prefixes)) == len(prefixes):
+                break
+        else:
+            # Samme fil definerer navnet flere gange (kan kun ske via forskellige pointers)
+            prefixes = [f"{prefix}{index}" for index, prefix in enumerate(prefixes)]
+        return [re.sub(r"\W", "_", f"{prefix}_{name}") for prefix in prefixes]
+
+    def class_id(self, key: str) -> str:
+        """
+        Finder klasse id'et for en kanonisk nøgle.
+
+        Peger nøglen på en fil der ikke er indlæst, bruges schema navnet hvis det
+        entydigt identificerer en klasse. Ellers returneres navnet uændret, og
+        linking-fasen rapporterer den manglende klasse.
+
+        Args:
+            key (str): Kanonisk nøgle
+
+        Returns:
+            str: Klasse id
+        """
+        class_id = self._ids.get(key)
+        if class_id is not None:
+            return class_id
+        name = self.name_of(key)
+        candidates = self._ids_by_name.get(name, [])
+        if len(candidates) > 1:
+            logger.warning(f"Ambiguous reference {key}: '{name}' matches {candidates}")
+        return candidates[0] if len(candidates) == 1 else name
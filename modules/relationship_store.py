@@ -0,0 +1,298 @@
+# This module will handle the symbol table and the columnar storage of relationships.
+from array import array
+from collections import Counter
+from collections.abc import Mapping, Sequence
+from itertools import compress
+
+from models.compact_models import CompactUmlRelationship
+
+# Rækkefølgen af kolonnerne med labels, svarer til felterne i CompactUmlRelationship
+LABEL_COLUMNS = ("type", "name", "description", "multiplicity_source", "multiplicity_target")
+
+
+class SymbolTable:
+    """
+    Internering af strenge til fortløbende heltals id'er.
+
+    Id'et for en streng er dens position, så navnet for et id slås op i en liste.
+    """
+    __slots__ = ("names", "_ids")
+
+    def __init__(self, names=()):
+        """
+        Args:
+            names: Strenge der interneres i den givne rækkefølge
+        """
+        self.names: list = []
+        self._ids: dict = {}
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name) -> int:
+        """Id'et for name. En ny streng får det næste ledige id."""
+        symbol = self._ids.get(name)
+        if symbol is None:
+            symbol = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return symbol
+
+    def id_of(self, name) -> int:
+        """Id'et for en interneret streng. KeyError hvis den ikke er interneret."""
+        return self._ids[name]
+
+    def get(self, name, default=None):
+        return self._ids.get(name, default)
+
+    def __contains__(self, name) -> bool:
+        return name in self._ids
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class RelationshipStore(Sequence):
+    """
+    Relationships gemt som parallelle kolonner i stedet for et objekt pr. relationship.
+
+    Source og target gemmes som klasse id'er fra en SymbolTable over modellens
+    klasser, og type, navn, beskrivelse og multipliciteter som id'er i en fælles
+    SymbolTable for labels (id 0 er None). Alle kolonner er array("i"), så en model
+    med mange relationships ikke giver et Python objekt pr. felt for GC'en at følge.
+
+    Storen er en Sequence af CompactUmlRelationship, så model_io og andre kaldere
+    kan iterere den som en liste. Objekterne oprettes først når de tilgås og gemmes
+    ikke, så kode der gennemløber alle relationships (f.eks. converterne) bør bruge
+    iter_rows, der læser kolonnerne direkte.
+
+    Dedup og index bygges med almindelige Python løkker over kolonnerne og er
+    ikke vektoriseret (NumPy er ikke en afhængighed).
+    """
+    def __init__(self, classes: SymbolTable, labels: SymbolTable | None = None):
+        """
+        Args:
+            classes (SymbolTable): Modellens klassenavne
+            labels (SymbolTable | None): Labels til deling med en anden store. None = ny tabel
+        """
+        self.classes = classes
+        self.labels = labels if labels is not None else SymbolTable([None])
+        self.source = array("i")
+        self.target = array("i")
+        self.type = array("i")
+        self.name = array("i")
+        self.description = array("i")
+        self.multiplicity_source = array("i")
+        self.multiplicity_target = array("i")
+
+    @classmethod
+    def from_relationships(cls, relationships, classes: SymbolTable) -> "RelationshipStore":
+        """
+        Bygger en store fra relationship objekter.
+
+        Fejlhåndtering:
+            - KeyError hvis source eller target ikke er i classes
+        """
+        store = cls(classes)
+        for rel in relationships:
+            store.append(rel.source_name, rel.target_name, rel.type, rel.name, rel.description, rel.multiplicitySource, rel.multiplicityTarget)
+        return store
+
+    def append(self, source_name: str, target_name: str, type: str, name: str | None = None, description: str | None = None,
+               multiplicity_source: str | None = None, multiplicity_target: str | None = None) -> None:
+        """
+        Tilføjer en relationship som en ny række.
+
+        Fejlhåndtering:
+            - KeyError hvis source_name eller target_name ikke er i klassernes SymbolTable
+        """
+        self.source.append(self.classes.id_of(source_name))
+        self.target.append(self.classes.id_of(target_name))
+        intern = self.labels.intern
+        self.type.append(intern(type))
+        self.name.append(intern(name))
+        self.description.append(intern(description))
+        self.multiplicity_source.append(intern(multiplicity_source))
+        self.multiplicity_target.append(intern(multiplicity_target))
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self._relationship(index) for index in range(len(self))[row]]
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("relationship index out of range")
+        return self._relationship(row)
+
+    def __iter__(self):
+        return map(self._relationship, range(len(self)))
+
+    def _relationship(self, row: int) -> CompactUmlRelationship:
+        class_names = self.classes.names
+        labels = self.labels.names
+        return CompactUmlRelationship(
+            source_name=class_names[self.source[row]],
+            target_name=class_names[self.target[row]],
+            name=labels[self.name[row]],
+            type=labels[self.type[row]],
+            description=labels[self.description[row]],
+            multiplicitySource=labels[self.multiplicity_source[row]],
+            multiplicityTarget=labels[self.multiplicity_target[row]]
+        )
+
+    def iter_rows(self):
+        """
+        Relationships som tuples af navne uden at oprette relationship objekter.
+
+        Returns:
+            Iterator af (source, target, type, name, description, multiplicity_source, multiplicity_target)
+        """
+        class_name = self.classes.names.__getitem__
+        label = self.labels.names.__getitem__
+        return zip(map(class_name, self.source), map(class_name, self.target),
+                   *(map(label, getattr(self, column)) for column in LABEL_COLUMNS))
+
+    def rows_of_type(self, rel_type: str) -> array:
+        """Rækkerne med den givne type, i storens rækkefølge."""
+        type_id = self.labels.get(rel_type)
+        if type_id is None:
+            return array("i")
+        return array("i", compress(range(len(self)), map(type_id.__eq__, self.type)))
+
+    def type_counts(self) -> Counter:
+        """Antal relationships pr. type."""
+        labels = self.labels.names
+        return Counter({labels[type_id]: count for type_id, count in Counter(self.type).items()})
+
+    def select(self, rows) -> "RelationshipStore":
+        """En ny store med de givne rækker i den givne rækkefølge. Symboltabellerne deles."""
+        store = RelationshipStore(self.classes, self.labels)
+        for column in ("source", "target", *LABEL_COLUMNS):
+            values = getattr(self, column)
+            getattr(store, column).extend(map(values.__getitem__, rows))
+        return store
+
+    def extend_rows(self, other: "RelationshipStore", start: int, stop: int) -> None:
+        """Tilføjer rækkerne start:stop fra other, der skal dele symboltabellerne med denne store."""
+        for column in ("source", "target", *LABEL_COLUMNS):
+            getattr(self, column).extend(getattr(other, column)[start:stop])
+
+    def deduplicated(self, rel_type: str) -> "RelationshipStore":
+        """
+        Fjerner gentagne relationships af typen rel_type mellem samme source og target.
+
+        Den første forekomst beholdes, og øvrige typer beholdes uændret. Parret
+        (source, target) samles til ét heltal, så der ikke bygges tuples af navne.
+
+        Returns:
+            RelationshipStore: Storen selv hvis der ikke er dubletter, ellers en ny store
+        """
+        type_id = self.labels.get(rel_type)
+        if type_id is None:
+            return self
+        class_count = len(self.classes)
+        seen = set()
+        keep = array("i")
+        for row, (row_type, source, target) in enumerate(zip(self.type, self.source, self.target)):
+            if row_type == type_id:
+                key = source * class_count + target
+                if key in seen:
+                    continue
+                seen.add(key)
+            keep.append(row)
+        return self if len(keep) == len(self) else self.select(keep)
+
+    def index(self, rows, keys, others, pairs: bool = False) -> "RelationshipIndex":
+        """
+        Grupperer rækkerne efter en nøgle kolonne (f.eks. source) som et CSR index.
+
+        Args:
+            rows: Rækkerne der indgår, i den rækkefølge de skal stå i for hver nøgle
+            keys: Nøglen (klasse id) for hver række i rows
+            others: Klassen i den anden ende for hver række i rows
+            pairs (bool): Opslag giver (relationship, klassen i den anden ende) i stedet for relationships
+
+        Returns:
+            RelationshipIndex: Klassenavn -> relationships
+        """
+        return RelationshipIndex(self, rows, keys, others, pairs)
+
+
+class RelationshipIndex(Mapping):
+    """
+    Index fra klassenavn til klassens relationships i en RelationshipStore.
+
+    Rækkerne sorteres stabilt efter nøglen (counting sort), så hver klasses
+    relationships ligger samlet i ét array med offsets pr. klasse id. Opslag
+    opretter relationship objekterne for klassen, eller med pairs par af
+    (relationship, navnet på klassen i den anden ende).
+    """
+    def __init__(self, store: RelationshipStore, rows, keys, others, pairs: bool = False):
+        self.store = store
+        self.pairs = pairs
+        class_count = len(store.classes)
+        counts = [0] * (class_count + 1)
+        for key in keys:
+            counts[key + 1] += 1
+        for position in range(class_count):
+            counts[position + 1] += counts[position]
+        self._offsets = array("i", counts)
+        self._rows = array("i", [0]) * len(rows)
+        self._others = array("i", [0]) * len(rows)
+        cursor = list(counts)
+        for row, key, other in zip(rows, keys, others):
+            self._rows[cursor[key]] = row
+            self._others[cursor[key]] = other
+            cursor[key] += 1
+
+    def _span(self, class_name: str) -> range:
+        key = self.store.classes.get(class_name)
+        if key is None:
+            return range(0)
+        return range(self._offsets[key], self._offsets[key + 1])
+
+    def __getitem__(self, class_name: str) -> list:
+        span = self._span(class_name)
+        if not span:
+            raise KeyError(class_name)
+        relationship = self.store._relationship
+        if not self.pairs:
+            return [relationship(self._rows[position]) for position in span]
+        class_names = self.store.classes.names
+        return [(relationship(self._rows[position]), class_names[self._others[position]]) for position in span]
+
+    def others(self, class_name: str) -> list[str]:
+        """Navnene på klasserne i den anden ende af klassens relationships, uden at oprette objekter."""
+        class_names = self.store.classes.names
+        return [class_names[self._others[position]] for position in self._span(class_name)]
+
+    def __iter__(self):
+        offsets = self._offsets
+        class_names = self.store.classes.names
+        return (class_names[key] for key in range(len(class_names)) if offsets[key] != offsets[key + 1])
+
+    def __len__(self) -> int:
+        offsets = self._offsets
+        return sum(1 for key in range(len(offsets) - 1) if offsets[key] != offsets[key + 1])
+
+
+def relationship_rows(relationships):
+    """
+    Relationships som tuples af navne i samme form som RelationshipStore.iter_rows.
+
+    En RelationshipStore læses direkte fra kolonnerne. Andre sekvenser (f.eks.
+    listen for en subgraf) læses fra objekternes felter.
+
+    Args:
+        relationships: RelationshipStore eller en iterable af relationship objekter
+
+    Returns:
+        Iterator af (source, target, type, name, description, multiplicity_source, multiplicity_target)
+    """
+    if isinstance(relationships, RelationshipStore):
+        return relationships.iter_rows()
+    return (
+        (rel.source_name, rel.target_name, rel.type, rel.name, rel.description, rel.multiplicitySource, rel.multiplicityTarget)
+        for rel in relationships
+    )
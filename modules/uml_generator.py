@@ -1,8 +1,105 @@
 # This module will handle UML generation logic as a class.
-from models.uml_models import UmlClass, UmlClassAttribute, UmlRelationship
+from models.compact_models import CompactUmlClass, CompactUmlClassAttribute, CompactUmlRelationship, to_pydantic
+import logging
 import os
-import yaml
-from modules.uml_to_plantuml import UMLToPlantUMLConverter
+from collections import deque
+from modules.parse_cache import ParseCache
+from modules.instrumentation import Instrumentation
+from modules.yaml_io import load_yaml_file, StreamedSchemas, STREAM_THRESHOLD
+from modules.ref_loader import RefLoader
+from modules.ref_resolver import RefResolver, pointer_name
+from modules.reachability import ReachabilityIndex
+from modules.build_manifest import class_fingerprints
+from modules import model_io
+from modules.partitioning import INDEX_NAME, partition_model, cluster_model, index_model
+from modules.relationship_store import SymbolTable, RelationshipStore, RelationshipIndex
+from dataclasses import replace
+
+logger = logging.getLogger(__name__)
+
+ABSTRACT_KEY_PREFIX = "abstract:"  # Nøgle præfiks for abstrakte oneOf/anyOf klasser, som ikke har en fil
+
+
+def _walk_order_key(relative_path: str) -> tuple:
+    # Directories sorteres efter filerne i samme directory, som i os.walk med sorterede lister
+    *dirs, filename = relative_path.split(os.sep)
+    return (*((1, name) for name in dirs), (0, filename))
+
+
+def _parse_yaml_file(path: str) -> dict | None:
+    """
+    Parser en enkelt YAML fil og returnerer kun indholdet hvis den har components/schemas.
+
+    Funktionen ligger på modulniveau så den kan sendes til en process pool.
+
+    Args:
+        path (str): Sti til YAML filen
+
+    Returns:
+        dict | None: Parsed YAML indhold, eller None hvis filen ikke er et OpenAPI schema
+    """
+    loaded = load_yaml_file(path)
+    if isinstance(loaded, dict) and 'schemas' in (loaded.get('components') or {}):
+        return loaded
+    return None
+
+
+def _streamed_document(path: str) -> dict:
+    """
+    Dokument for en stor fil, hvor components/schemas læses som en strøm når det besøges.
+
+    Resten af filen (f.eks. paths) bygges aldrig, og kun ét schema ad gangen er i memory.
+    Filen springes over i parse cachen og process poolen, da indholdet aldrig samles.
+
+    Args:
+        path (str): Sti til YAML filen
+
+    Returns:
+        dict: {"components": {"schemas": StreamedSchemas}}
+    """
+    return {"components": {"schemas": StreamedSchemas(path)}}
+
+
+def _is_streamed(path: str, stream_threshold: int | None) -> bool:
+    """Om filen er så stor at den skal læses som en strøm. stream_threshold None = aldrig."""
+    return stream_threshold is not None and os.path.getsize(path) >= stream_threshold
+
+
+def _visit_shard(base_dir: str, paths: list[str], cache: ParseCache | None, stream_threshold: int | None = STREAM_THRESHOLD) -> tuple[list[tuple[str, tuple | None]], dict[str, int]]:
+    """
+    Indlæser og besøger en shard af schema filer i en worker process.
+
+    Funktionen ligger på modulniveau så den kan sendes til en process pool.
+
+    Args:
+        base_dir (str): Directory som namespaced id'er er relative til
+        paths (list[str]): Absolutte stier til filerne i shard'en
+        cache (ParseCache | None): Parse cachen. Workerne læser og skriver entries direkte
+        stream_threshold (int | None): Filstørrelse i bytes hvorfra filer læses som en strøm
+
+    Returns:
+        tuple: ((sti, resultat fra _visit_document eller None) pr. fil, tællere)
+    """
+    generator = UMLGenerator(base_dir)
+    generator.resolver = RefResolver(base_dir)
+    counters = {"files_parsed": 0, "files_streamed": 0, "cache_hits": 0, "cache_misses": 0}
+    visited = []
+    for path in paths:
+        if _is_streamed(path, stream_threshold):
+            loaded = _streamed_document(path)
+            counters["files_streamed"] += 1
+        else:
+            hit, loaded = cache.get(path) if cache is not None else (False, None)
+            if cache is not None:
+                counters["cache_hits" if hit else "cache_misses"] += 1
+            if not hit:
+                loaded = _parse_yaml_file(path)
+                counters["files_parsed"] += 1
+                if cache is not None:
+                    cache.put(path, loaded)
+        visited.append((path, generator._visit_document(loaded['components']['schemas'], path) if loaded is not None else None))
+    return visited, counters
+
 
 class UMLGenerator:
     """
@@ -18,16 +115,45 @@ class UMLGenerator:
     - oneOf/anyOf polymorfiske relationships med abstract klasser
     - allOf inheritance relationships
     """
-    def __init__(self, schema_dir):
+    def __init__(self, schema_dir, jobs: int = 1, cache: ParseCache | None = None, instrumentation: Instrumentation | None = None, sharded: bool = False,
+                 stream_threshold: int | None = STREAM_THRESHOLD):
         """
         Initialiserer UML generator med schema directory.
         
         Args:
-            schema_dir (str): Sti til directory der indeholder OpenAPI schema YAML filer
+            schema_dir (str): Sti til directory der indeholder OpenAPI schema YAML filer, eller
+                              et entry dokument (API fil eller schema fil, evt. med #pointer).
+                              Et entry dokument indlæses lazy via _load_yaml_reachable
+            jobs (int): Antal processer til parsing af YAML filer. 1 = serielt, 0 = alle kerner
+            cache (ParseCache | None): Valgfri cache af parsed filer. None = ingen cache
+            instrumentation (Instrumentation | None): Opsamling af tider og tællere. None = ny instans
+            sharded (bool): Besøg også schemas i de jobs processer der parser filerne (map-reduce)
+            stream_threshold (int | None): Filer på mindst så mange bytes læses som en strøm af
+                schemas i stedet for som ét dokument. None = læs altid hele dokumentet
+
+        Fejlhåndtering:
+            - ValueError hvis jobs er negativ
         """
+        if jobs < 0:
+            raise ValueError(f"jobs must be 0 (all cores) or greater, got {jobs}")
         self.schema_dir = schema_dir
-        self.uml_model : dict[str, UmlClass] = {}  # Dictionary af alle UML klasser
-        self.uml_relationships: list[UmlRelationship] = []  # Liste af alle relationships 
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        self.cache = cache
+        self.sharded = sharded
+        self.stream_threshold = stream_threshold
+        self.stats = instrumentation if instrumentation is not None else Instrumentation()
+        self.uml_model : dict[str, CompactUmlClass] = {}  # Dictionary af alle UML klasser
+        self.symbols = SymbolTable()  # Klassenavn <-> heltals id, i modellens rækkefølge
+        self.uml_relationships: RelationshipStore = RelationshipStore(self.symbols)  # Alle relationships, kolonnevis
+        self._adjacency: RelationshipIndex | dict = {}  # Udgående relationships pr. klasse
+        self._dependents: RelationshipIndex | dict = {}  # Indgående relationships pr. klasse, som (relationship, klasse)
+        self._reachability: ReachabilityIndex | None = None  # Bygges ved første subgraf forespørgsel
+        self._documents: dict[str, tuple] = {}  # Absolut sti -> resultat fra _visit_document, til refresh
+        self._linked_relationships: RelationshipStore | None = None  # Linkede relationships før duplikat-fjernelse, til refresh
+        self._document_rows: list[int] = []  # Første række i _linked_relationships for hvert dokument, plus antal rækker
+        self._fingerprints: dict[str, str] | None = None  # Beregnes ved første class_fingerprints()
+        self.class_sources: dict[str, str] = {}  # Klasse id -> schema fil (relativ) klassen kommer fra
+        self.resolver: RefResolver | None = None  # Oprettes når dokumenterne indlæses
 
     def _load_yaml(self) -> dict:
         """
@@ -39,6 +165,8 @@ class UMLGenerator:
         Returns:
             dict: Dictionary med filnavn som nøgle og parsed YAML indhold som værdi
         """
+        import yaml
+
         yamls = {}
         for file in os.listdir(self.schema_dir):
             if file.endswith(".yaml"):
@@ -55,181 +183,310 @@ class UMLGenerator:
         schema filer bliver indlæst.
         
         Returns:
-            dict: Dictionary med filnavn som nøgle og parsed YAML indhold som værdi.
-                  Kun filer med valid OpenAPI schema struktur inkluderes.
+            dict: Dictionary med filsti (relativt til schema_dir) som nøgle og parsed YAML
+                  indhold som værdi. Kun filer med valid OpenAPI schema struktur inkluderes.
         
         Side effects:
-            - Printer filnavne der bliver indlæst
+            - Logger filnavne der bliver indlæst (debug)
             - Filtrerer filer der ikke har components/schemas struktur
+
+        Bemærk:
+            Med jobs > 1 parses filerne parallelt i en process pool. Rækkefølgen
+            i det returnerede dictionary er den samme som ved seriel indlæsning.
+            Er der en cache, parses kun filer der er ændret siden sidste kørsel.
+            Filer større end stream_threshold parses ikke her, men læses som en strøm
+            af schemas i visit-fasen.
         """
+        paths = self._find_yaml_files()
+
+        loaded_by_path = {}
+        to_parse = []
+        for path in paths:
+            if _is_streamed(path, self.stream_threshold):
+                logger.debug("Streaming schemas from large file: %s", path)
+                loaded_by_path[path] = _streamed_document(path)
+            else:
+                to_parse.append(path)
+        self.stats.count("files_streamed", len(loaded_by_path))
+
+        if self.cache is not None:
+            candidates, to_parse = to_parse, []
+            for path in candidates:
+                hit, content = self.cache.get(path)
+                if hit:
+                    loaded_by_path[path] = content
+                else:
+                    to_parse.append(path)
+
+        if self.jobs > 1 and len(to_parse) > 1:
+            # Importeres kun når der faktisk startes processer, da det trækker multiprocessing med
+            from concurrent.futures import ProcessPoolExecutor
+            chunksize = max(1, len(to_parse) // (self.jobs * 4))
+            with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                results = executor.map(_parse_yaml_file, to_parse, chunksize=chunksize)
+                loaded_by_path.update(zip(to_parse, results))
+        else:
+            for path in to_parse:
+                loaded_by_path[path] = _parse_yaml_file(path)
+
+        if self.cache is not None:
+            for path in to_parse:
+                self.cache.put(path, loaded_by_path[path])
+            self.cache.evict()
+
         yamls = {}
-        for root, _, files in os.walk(self.schema_dir):
-            for file in files:
+        for path in paths:
+            logger.debug("Loading YAML file: %s", os.path.basename(path))
+            loaded = loaded_by_path[path]
+            if loaded is not None:
+                yamls[os.path.relpath(path, self.schema_dir)] = loaded
+
+        self.stats.count("files_found", len(paths))
+        self.stats.count("files_parsed", len(to_parse))
+        self.stats.count("schema_files", len(yamls))
+        return yamls
+
+    def _find_yaml_files(self) -> list[str]:
+        """Alle .yaml filer under schema_dir i sorteret os.walk rækkefølge."""
+        paths = []
+        for root, dirs, files in os.walk(self.schema_dir):
+            # os.walk følger filsystemets rækkefølge. Sorteres for en deterministisk model og output
+            dirs.sort()
+            for file in sorted(files):
                 if file.endswith(".yaml"):
-                    with open(os.path.join(root, file), 'r', encoding='utf-8') as f:
-                        print(f"Loading YAML file: {file}")
-                        loaded = yaml.safe_load(f)
-                        if 'components' in loaded and 'schemas' in loaded['components']:
-                            yamls[file] = loaded
+                    paths.append(os.path.join(root, file))
+        return paths
+
+    def _visit_sharded(self) -> dict:
+        """
+        Indlæser og besøger schema filerne i shards fordelt på jobs processer (map),
+        så både parsing og visit-fasen kører på alle kerner.
+
+        Filerne fordeles på jobs * 4 shards med omtrent lige mange bytes. Hver
+        worker returnerer _visit_document resultatet pr. fil, og resultaterne
+        samles i os.walk rækkefølge, så _link_model (reduce) giver præcis samme
+        model som den serielle vej, inklusive abstrakte klasser og generalizations.
+
+        Returns:
+            dict: Absolut sti -> resultat fra _visit_document, i os.walk rækkefølge
+        """
+        paths = [os.path.abspath(path) for path in self._find_yaml_files()]
+        self.resolver = RefResolver(self.schema_dir)
+
+        # Største filer først på den shard der har færrest bytes, så ingen worker bliver efterladt med de store filer
+        shard_count = min(len(paths), self.jobs * 4) or 1
+        shards: list[list[str]] = [[] for _ in range(shard_count)]
+        shard_sizes = [0] * shard_count
+        for path in sorted(paths, key=os.path.getsize, reverse=True):
+            smallest = shard_sizes.index(min(shard_sizes))
+            shards[smallest].append(path)
+            shard_sizes[smallest] += os.path.getsize(path)
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        visited_by_path = {}
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            futures = [executor.submit(_visit_shard, self.resolver.base_dir, shard, self.cache, self.stream_threshold) for shard in shards if shard]
+            for future in futures:
+                shard_visited, counters = future.result()
+                visited_by_path.update(shard_visited)
+                if self.cache is not None:
+                    # Workerne tæller i deres egen kopi af cachen
+                    self.cache.hits += counters["cache_hits"]
+                    self.cache.misses += counters["cache_misses"]
+                self.stats.count("files_parsed", counters["files_parsed"])
+                self.stats.count("files_streamed", counters["files_streamed"])
+        if self.cache is not None:
+            self.cache.evict()
+
+        documents = {path: visited_by_path[path] for path in paths if visited_by_path[path] is not None}
+        self.stats.count("files_found", len(paths))
+        self.stats.count("schema_files", len(documents))
+        self.stats.count("shards", len(futures))
+        return documents
+
+    def _load_yaml_reachable(self) -> dict:
+        """
+        Indlæser kun de schemas der kan nås via $refs fra entry dokumentet i schema_dir.
+
+        Hvert refereret dokument parses først når det nås, og kun én gang.
+
+        Returns:
+            dict: Samme struktur som _load_yaml_recursive, men kun med de schemas der kan nås
+        """
+        loader = RefLoader()
+        yamls = loader.load_reachable(self.schema_dir)
+        self.stats.count("files_parsed", len(loader.documents))
+        self.stats.count("schema_files", len(yamls))
         return yamls
 
-    def _schema_to_uml_class(self, name: str, schema: dict) -> UmlClass:
+    def _is_entry_document(self) -> bool:
+        return os.path.isfile(self.schema_dir.partition("#")[0])
+
+    def _load_documents(self) -> dict:
         """
-        Konverterer et enkelt OpenAPI schema til en UML klasse.
+        Indlæser schema dokumenterne og opretter den RefResolver som visit-fasen bruger.
+
+        Et directory indlæses rekursivt, et entry dokument lazy. Filstier i namespaced
+        klasse id'er er relative til directory'et henholdsvis entry dokumentets directory.
+
+        Returns:
+            dict: Absolut sti til dokumentet som nøgle og parsed YAML indhold som værdi
+        """
+        if self._is_entry_document():
+            yamls = self._load_yaml_reachable()
+            base_dir = os.path.dirname(os.path.abspath(self.schema_dir.partition("#")[0]))
+        else:
+            yamls = self._load_yaml_recursive()
+            base_dir = os.path.abspath(self.schema_dir)
+        self.resolver = RefResolver(base_dir)
+        return {os.path.normpath(os.path.join(base_dir, filename)): yamldict for filename, yamldict in yamls.items()}
+
+    def _visit_schema(self, schema_name: str, schema: dict, document_path: str, abstract_classes: dict[str, CompactUmlClass]) -> tuple[str, CompactUmlClass, list[CompactUmlRelationship]]:
+        """
+        Konverterer et enkelt OpenAPI schema til en UML klasse og finder dets relationships i én gennemgang.
         
         Håndterer følgende OpenAPI elementer:
         - Enum schemas (markeres med type="enum")
         - Almindelige properties med type, format, description, example
         - Required fields (markeres på attributterne)
-        - Komplekse typer som arrays, references, oneOf, anyOf (logges men håndteres i relationships)
+        - Enum references (tilføjes som attributter efter de almindelige attributter)
+        - Direkte $ref relationships (aggregation)
+        - Array relationships (delegeres til _handle_array_items)
+        - oneOf relationships (delegeres til _handle_polymorphic_relationship med multiplicity="1")
+        - anyOf relationships (delegeres til _handle_polymorphic_relationship med multiplicity="*")
+        - allOf inheritance relationships
+        
+        Relationships refererer til klasser via kanoniske nøgler fra RefResolver
+        ('<absolut fil>#<pointer>'). De oversættes til klasse id'er og valideres først i
+        _link_model, så schemas kan besøges i vilkårlig rækkefølge.
         
         Args:
-            name (str): Navnet på schema/klassen
+            schema_name (str): Navnet på schema/klassen
             schema (dict): OpenAPI schema definition
+            document_path (str): Absolut sti til dokumentet schema er defineret i
+            abstract_classes (dict[str, CompactUmlClass]): Abstrakte klasser oprettet for
+                oneOf/anyOf. Nye abstrakte klasser tilføjes her
             
         Returns:
-            UmlClass: UML klasse repræsentation af schema
+            tuple: (schema_key, uml_class, relationships) for schema
             
         Side effects:
-            - Printer beskeder om komplekse typer der springes over i denne fase
+            - Logger beskeder om fundne relationship typer
             - Konverterer example værdier til strings
         """
-        uml_class = UmlClass(name=name)
+        schema_key = RefResolver.schema_key(document_path, schema_name)
+        uml_class = CompactUmlClass(name=schema_name)
         uml_class.description = schema.get("description", "MISSING")
 
         if "enum" in schema:
             uml_class.type = "enum"
 
+        required = schema.get("required", [])
+        relationships = []
+        enum_attributes = []
         for prop_name, prop_details in schema.get("properties", {}).items():
-            
+
             if prop_details.get("type") == "array":
-                itemtype = prop_details.get("items", {}).get("type")
-                if itemtype != None:
-                    attribute = UmlClassAttribute(
-                    name=prop_name+"",
-                    type=prop_details.get("type", "unknown"),
-                    format=prop_details.get("format"),
-                    description=prop_details.get("description"),
-                    example=str(prop_details.get("example")),
-                    ref=prop_details.get("$ref"),
-                    required=prop_name in schema.get("required", [])
-                    )
-                    uml_class.attributes.append(attribute)
+                items = prop_details.get("items", {})
+                if items.get("type") != None:
+                    uml_class.attributes.append(self._make_attribute(prop_name, prop_details, required, document_path))
 
-                print(f"Array type detected for {prop_name}. Skipping for now.")
-                ref_class_name = prop_details.get("items", {}).get("$ref")
-                print(f"Ref class name: {ref_class_name}")
-            
-            elif prop_details.get("$ref"):
-                print(f"Reference type detected for {prop_name}. Skipping for now.")
-                # her springes Enum over
-            elif prop_details.get("oneOf"):
-                print(f"OneOf type detected for {prop_name}.")
+                if "$ref" in prop_details:
+                    relationships.extend(self._handle_reference(schema_key, prop_name, prop_details["$ref"], "*", enum_attributes, document_path))
+                else:
+                    logger.debug("Array type detected for %s. Ref class name: %s", prop_name, items.get('$ref'))
+                    relationships.extend(self._handle_array_items(schema_key, prop_name, items, abstract_classes, document_path))
 
-            elif prop_details.get("anyOf"):
-                print(f"AnyOf type detected for {prop_name}.")
+            elif "$ref" in prop_details:
+                logger.debug("Reference type detected for %s.", prop_name)
+                relationships.extend(self._handle_reference(schema_key, prop_name, prop_details["$ref"], "1", enum_attributes, document_path))
 
-            else:
-                attribute = UmlClassAttribute(
-                    name=prop_name,
-                    type=prop_details.get("type", "unknown"),
-                    format=prop_details.get("format"),
-                    description=prop_details.get("description"),
-                    example=str(prop_details.get("example")),
-                    ref=prop_details.get("$ref"),
-                    required=prop_name in schema.get("required", [])
+            elif prop_details.get("oneOf") is not None:
+                logger.debug("OneOf type detected for %s.", prop_name)
+                relationships.extend(
+                    self._handle_polymorphic_relationship(schema_key, prop_name, prop_details["oneOf"], "oneOf", "1", abstract_classes, document_path)
                 )
-                uml_class.attributes.append(attribute)
 
-        return uml_class
-    
-    def _handle_enum(self, schema_name, prop_name) -> None:
+            elif prop_details.get("anyOf") is not None:
+                logger.debug("AnyOf type detected for %s.", prop_name)
+                relationships.extend(
+                    self._handle_polymorphic_relationship(schema_key, prop_name, prop_details["anyOf"], "anyOf", "*", abstract_classes, document_path)
+                )
+
+            else:
+                uml_class.attributes.append(self._make_attribute(prop_name, prop_details, required, document_path))
+
+        uml_class.attributes.extend(enum_attributes)
+        relationships.extend(self._find_allof_relationships(schema_key, schema, document_path))
+        return schema_key, uml_class, relationships
+
+    def _make_attribute(self, prop_name: str, prop_details: dict, required: list, document_path: str) -> CompactUmlClassAttribute:
         """
-        Håndterer enum properties ved at tilføje dem som attributter til den eksisterende klasse.
-        
-        Når en property refererer til en enum (detekteret via '$ref' der indeholder 'enum'),
-        tilføjes enum'en som en attribut direkte på klassen i stedet for som en separat relationship.
-        
+        Opretter en UML attribut for en almindelig property.
+
         Args:
-            schema_name (str): Navnet på den klasse der skal have enum attributten
-            prop_name (str): Navnet på property'en der refererer til enum'en
-            
-        Side effects:
-            - Modificerer eksisterende UML klasse ved at tilføje enum attribut
-            - Printer besked om enum håndtering
+            prop_name (str): Navnet på property'en
+            prop_details (dict): Property definition fra schema
+            required (list): Schemaets liste af required properties
+            document_path (str): Absolut sti til dokumentet, bruges til at normalisere $ref
+
+        Returns:
+            CompactUmlClassAttribute: Attributten. ref er en kanonisk nøgle indtil _link_model
         """
-        print(f"Enum handled detected for {schema_name}.")
-        uc = self.uml_model[schema_name]
-        uc.attributes.append(
-            UmlClassAttribute(
-                name=prop_name,
-                type="enum",
-                required=False
-            )
+        ref = prop_details.get("$ref")
+        return CompactUmlClassAttribute(
+            name=prop_name,
+            type=prop_details.get("type", "unknown"),
+            format=prop_details.get("format"),
+            description=prop_details.get("description"),
+            example=str(prop_details.get("example")),
+            ref=self.resolver.canonical(document_path, ref) if ref else None,
+            required=prop_name in required
         )
 
-    
-    def _find_relationships(self, schema_name, schema) -> list[UmlRelationship]:
+    def _handle_reference(self, schema_key: str, prop_name: str, ref: str, multiplicity_target: str, enum_attributes: list, document_path: str) -> list[CompactUmlRelationship]:
         """
-        Finder og opretter alle relationships for et given schema.
-        
-        Håndterer følgende typer af relationships:
-        1. Direkte $ref relationships (aggregation)
-        2. Enum references (håndteres som attributter via _handle_enum)
-        3. Array relationships (delegeres til _handle_array_items)
-        4. oneOf relationships (delegeres til _handle_polymorphic_relationship med multiplicity="1")
-        5. anyOf relationships (delegeres til _handle_polymorphic_relationship med multiplicity="*")
-        
+        Håndterer en property med direkte $ref.
+
+        Når referencen peger på en enum (detekteret via '$ref' der indeholder 'enum'),
+        tilføjes enum'en som en attribut på klassen i stedet for som en relationship.
+        Ellers oprettes en aggregation til den refererede klasse.
+
         Args:
-            schema_name (str): Navnet på schema der skal analyseres
-            schema (dict): Schema definition der skal analyseres for relationships
-            
+            schema_key (str): Kanonisk nøgle for klassen der har property'en
+            prop_name (str): Navnet på property'en
+            ref (str): $ref værdien
+            multiplicity_target (str): "*" for arrays, ellers "1"
+            enum_attributes (list): Liste som enum attributter tilføjes til
+            document_path (str): Absolut sti til dokumentet referencen står i
+
         Returns:
-            list[UmlRelationship]: Liste af alle relationships fundet i schema
-            
-        Side effects:
-            - Kalder _handle_enum for enum references
-            - Printer beskeder om fundne relationship typer
+            list[CompactUmlRelationship]: Tom liste for enums, ellers én aggregation
         """
-        relationships = []
-        for prop_name, prop_details in schema.get("properties", {}).items():
-            if "$ref" in prop_details:
-                if "enum" in prop_details.get("$ref", ""):
-                    print(f"Enum type detected for {prop_name}.")
-                    self._handle_enum(schema_name, prop_name)
-                else:
-                    target_class_name = prop_details["$ref"].split("/")[-1]
-                    if prop_details.get("type") == "array":
-                        multiplicityTarget = "*"
-                    else:
-                        multiplicityTarget = "1"
-
-                    relationship = UmlRelationship(
-                        source=self.uml_model[schema_name],
-                        target=self.uml_model[target_class_name],
-                        type="aggregation",
-                        name=prop_name,
-                        multiplicitySource="1",
-                        multiplicityTarget=multiplicityTarget
-                    )
-                    relationships.append(relationship)
-            elif prop_details.get("type") == "array":
-                relationships.extend(self._handle_array_items(schema_name, prop_name, prop_details.get("items", {})))
-            elif prop_details.get("oneOf") is not None:
-                print(f"OneOf type detected for {prop_name}.")
-                relationships.extend(
-                    self._handle_polymorphic_relationship(schema_name, prop_name, prop_details["oneOf"], "oneOf", "1")
-                )
-            elif prop_details.get("anyOf") is not None:
-                print(f"AnyOf type detected for {prop_name}.")
-                relationships.extend(
-                    self._handle_polymorphic_relationship(schema_name, prop_name, prop_details["anyOf"], "anyOf", "*")
+        if "enum" in ref:
+            logger.debug("Enum type detected for %s.", prop_name)
+            enum_attributes.append(
+                CompactUmlClassAttribute(
+                    name=prop_name,
+                    type="enum",
+                    required=False
                 )
+            )
+            return []
 
-            
-        return relationships
+        return [
+            CompactUmlRelationship(
+                source_name=schema_key,
+                target_name=self.resolver.canonical(document_path, ref),
+                type="aggregation",
+                name=prop_name,
+                multiplicitySource="1",
+                multiplicityTarget=multiplicity_target
+            )
+        ]
 
-    def _create_oneof_abstract_class(self, prop_name: str, one_of_refs: list) -> str:
+    def _create_oneof_abstract_class(self, prop_name: str, one_of_refs: list, abstract_classes: dict[str, CompactUmlClass]) -> str:
         """
         Opretter en abstrakt klasse for oneOf/anyOf relationships.
         
@@ -240,14 +497,16 @@ class UMLGenerator:
         Args:
             prop_name (str): Navnet på property'en der har oneOf/anyOf (fallback navn)
             one_of_refs (list): Liste af $ref objekter der peger på konkrete klasser
+            abstract_classes (dict[str, CompactUmlClass]): Allerede oprettede abstrakte klasser
             
         Returns:
-            str: Navnet på den oprettede (eller eksisterende) abstrakte klasse
+            str: Nøglen for den oprettede (eller eksisterende) abstrakte klasse
             
         Side effects:
-            - Opretter ny UmlClass med type="abstract" hvis den ikke eksisterer
-            - Tilføjer klassen til self.uml_model
-            - Printer besked om oprettelse af abstrakt klasse og navngivningsstrategi
+            - Opretter ny CompactUmlClass med type="abstract" hvis den ikke eksisterer
+            - Tilføjer klassen til abstract_classes. _link_model tilføjer den til modellen
+              hvis der ikke findes et schema med samme navn
+            - Logger besked om oprettelse af abstrakt klasse og navngivningsstrategi
             
         Eksempel:
             Klasser: ["SpecD", "SpecE"] -> abstract_class_name="Spec"
@@ -257,7 +516,7 @@ class UMLGenerator:
         class_names = []
         for ref in one_of_refs:
             if "$ref" in ref:
-                class_name = ref["$ref"].split("/")[-1]
+                class_name = pointer_name(ref["$ref"].partition("#")[2])
                 class_names.append(class_name)
         
         # Try to find common prefix among class names
@@ -265,25 +524,25 @@ class UMLGenerator:
         
         if common_prefix:
             abstract_class_name = common_prefix
-            print(f"Using common prefix '{common_prefix}' from classes {class_names} for abstract class")
+            logger.debug("Using common prefix '%s' from classes %s for abstract class", common_prefix, class_names)
         else:
             # Fallback to property name
             abstract_class_name = f"{prop_name.replace('_', '').title()}"
-            print(f"No common prefix found in classes {class_names}, using property name '{prop_name}' -> '{abstract_class_name}'")
+            logger.debug("No common prefix found in classes %s, using property name '%s' -> '%s'", class_names, prop_name, abstract_class_name)
         
         # Check if the abstract class already exists
-        if abstract_class_name not in self.uml_model:
-            abstract_class = UmlClass(
+        if abstract_class_name not in abstract_classes:
+            abstract_class = CompactUmlClass(
                 name=abstract_class_name,
                 type="abstract",
                 description=f"Abstract class for oneOf/anyOf property '{prop_name}' generalizing {class_names}"
             )
-            self.uml_model[abstract_class_name] = abstract_class
-            print(f"Created abstract class: {abstract_class_name}")
+            abstract_classes[abstract_class_name] = abstract_class
+            logger.debug("Created abstract class: %s", abstract_class_name)
         
-        return abstract_class_name
+        return f"{ABSTRACT_KEY_PREFIX}{abstract_class_name}"
 
-    def _find_allof_relationships(self, schema_name: str, schema: dict) -> list[UmlRelationship]:
+    def _find_allof_relationships(self, schema_key: str, schema: dict, document_path: str) -> list[CompactUmlRelationship]:
         """
         Finder og opretter inheritance relationships baseret på allOf konstruktioner.
         
@@ -292,14 +551,15 @@ class UMLGenerator:
         (child) arver fra de refererede klasser (parents).
         
         Args:
-            schema_name (str): Navnet på schema der potentielt har allOf
+            schema_key (str): Kanonisk nøgle for schema der potentielt har allOf
             schema (dict): Schema definition der skal tjekkes for allOf
+            document_path (str): Absolut sti til dokumentet schema er defineret i
             
         Returns:
-            list[UmlRelationship]: Liste af inheritance relationships, tom hvis ingen allOf
+            list[CompactUmlRelationship]: Liste af inheritance relationships, tom hvis ingen allOf
             
         Side effects:
-            - Printer beskeder om fundne allOf konstruktioner og oprettede inheritance relationships
+            - Logger beskeder om fundne allOf konstruktioner og oprettede inheritance relationships
             
         Eksempel:
             Schema "Aext" med allOf: [{ $ref: "./A.yaml#/components/schemas/A" }]
@@ -307,24 +567,24 @@ class UMLGenerator:
         """
         relationships = []
         if "allOf" in schema:
-            print(f"AllOf detected for {schema_name}.")
+            logger.debug("AllOf detected for %s.", schema_key)
             for all_of_item in schema["allOf"]:
                 if "$ref" in all_of_item:
-                    target_class_name = all_of_item["$ref"].split("/")[-1]
+                    target_key = self.resolver.canonical(document_path, all_of_item["$ref"])
                     # Create inheritance relationship (child inherits from parent)
-                    inheritance_relationship = UmlRelationship(
-                        source=self.uml_model[schema_name],  # Child class
-                        target=self.uml_model[target_class_name],  # Parent class
+                    inheritance_relationship = CompactUmlRelationship(
+                        source_name=schema_key,  # Child class
+                        target_name=target_key,  # Parent class
                         type="generalization",
                         name=None,
                         multiplicitySource=None,
                         multiplicityTarget=None
                     )
                     relationships.append(inheritance_relationship)
-                    print(f"Created inheritance: {schema_name} inherits from {target_class_name}")
+                    logger.debug("Created inheritance: %s inherits from %s", schema_key, target_key)
         return relationships
 
-    def _handle_polymorphic_relationship(self, schema_name: str, prop_name: str, poly_refs: list, relationship_type: str, multiplicity_target: str) -> list[UmlRelationship]:
+    def _handle_polymorphic_relationship(self, schema_key: str, prop_name: str, poly_refs: list, relationship_type: str, multiplicity_target: str, abstract_classes: dict[str, CompactUmlClass], document_path: str) -> list[CompactUmlRelationship]:
         """
         Håndterer oneOf/anyOf polymorfiske relationships ved at oprette abstract klasse og inheritance.
         
@@ -334,14 +594,16 @@ class UMLGenerator:
         3. Opretter inheritance relationships fra alle konkrete klasser til abstrakt klasse
         
         Args:
-            schema_name (str): Navnet på parent klassen der har oneOf/anyOf property
+            schema_key (str): Kanonisk nøgle for parent klassen der har oneOf/anyOf property
             prop_name (str): Navnet på property'en (bruges til abstrakt klasse navn)
             poly_refs (list): Liste af $ref objekter der peger på konkrete klasser
             relationship_type (str): "oneOf" eller "anyOf" (til dokumentation)
             multiplicity_target (str): "1" for oneOf, "*" for anyOf
+            abstract_classes (dict[str, CompactUmlClass]): Abstrakte klasser oprettet indtil videre
+            document_path (str): Absolut sti til dokumentet referencerne står i
             
         Returns:
-            list[UmlRelationship]: Liste indeholdende:
+            list[CompactUmlRelationship]: Liste indeholdende:
                 - 1 aggregation relationship (parent -> abstract)
                 - N inheritance relationships (concrete -> abstract)
                 
@@ -358,12 +620,12 @@ class UMLGenerator:
         relationships = []
         
         # Create abstract class for the polymorphic relationship
-        abstract_class_name = self._create_oneof_abstract_class(prop_name, poly_refs)
+        abstract_class_key = self._create_oneof_abstract_class(prop_name, poly_refs, abstract_classes)
         
         # Create aggregation relationship to the abstract class
-        relationship = UmlRelationship(
-            source=self.uml_model[schema_name],
-            target=self.uml_model[abstract_class_name],
+        relationship = CompactUmlRelationship(
+            source_name=schema_key,
+            target_name=abstract_class_key,
             type="aggregation",
             name=prop_name,
             multiplicitySource="1",
@@ -374,10 +636,9 @@ class UMLGenerator:
         # Create inheritance relationships from concrete classes to abstract class
         for poly_ref in poly_refs:
             if "$ref" in poly_ref:
-                target_class_name = poly_ref["$ref"].split("/")[-1]
-                inheritance_relationship = UmlRelationship(
-                    source=self.uml_model[target_class_name],
-                    target=self.uml_model[abstract_class_name],
+                inheritance_relationship = CompactUmlRelationship(
+                    source_name=self.resolver.canonical(document_path, poly_ref["$ref"]),
+                    target_name=abstract_class_key,
                     type="generalization",
                     name=None,
                     multiplicitySource=None,
@@ -387,7 +648,7 @@ class UMLGenerator:
         
         return relationships
 
-    def _handle_array_items(self, schema_name: str, prop_name: str, items: dict) -> list[UmlRelationship]:
+    def _handle_array_items(self, schema_key: str, prop_name: str, items: dict, abstract_classes: dict[str, CompactUmlClass], document_path: str) -> list[CompactUmlRelationship]:
         """
         Håndterer forskellige typer af array items og opretter passende relationships.
         
@@ -398,18 +659,20 @@ class UMLGenerator:
         4. Direkte $ref -> Opretter simpel aggregation med multiplicity="*"
         
         Args:
-            schema_name (str): Navnet på klassen der har array property'en
+            schema_key (str): Kanonisk nøgle for klassen der har array property'en
             prop_name (str): Navnet på array property'en
             items (dict): Items definition fra array schema
+            abstract_classes (dict[str, CompactUmlClass]): Abstrakte klasser oprettet indtil videre
+            document_path (str): Absolut sti til dokumentet referencerne står i
             
         Returns:
-            list[UmlRelationship]: Liste af relationships afhængig af items type:
+            list[CompactUmlRelationship]: Liste af relationships afhængig af items type:
                 - Polymorfiske: Aggregation + inheritance relationships
                 - Direkte ref: Enkelt aggregation relationship
                 - allOf: Tom liste (ikke implementeret)
                 
         Side effects:
-            - Printer beskeder om fundne array item typer
+            - Logger beskeder om fundne array item typer
             - For anyOf/oneOf: Opretter abstrakt klasse via _handle_polymorphic_relationship
             
         Bemærk:
@@ -417,26 +680,26 @@ class UMLGenerator:
         """
         relationships = []
         if items.get("anyOf") is not None:
-            print(f"Array type with AnyOf detected for {prop_name}.")
+            logger.debug("Array type with AnyOf detected for %s.", prop_name)
             relationships.extend(
-                self._handle_polymorphic_relationship(schema_name, prop_name, items["anyOf"], "anyOf", "*")
+                self._handle_polymorphic_relationship(schema_key, prop_name, items["anyOf"], "anyOf", "*", abstract_classes, document_path)
             )
         elif items.get("oneOf") is not None:
-            print(f"Array type with OneOf detected for {prop_name}.")
+            logger.debug("Array type with OneOf detected for %s.", prop_name)
             relationships.extend(
-                self._handle_polymorphic_relationship(schema_name, prop_name, items["oneOf"], "oneOf", "*")
+                self._handle_polymorphic_relationship(schema_key, prop_name, items["oneOf"], "oneOf", "*", abstract_classes, document_path)
             )
         elif items.get("AllOf") is not None:
-            print(f"Array type with AllOf detected for {prop_name}.")
+            logger.debug("Array type with AllOf detected for %s.", prop_name)
             # TODO: Implement allOf handling for arrays if needed
         elif items.get("$ref") is not None:
             ref = items.get("$ref")
             if ref:
-                target_class_name = ref.split("/")[-1]
-                print(f"Array with direct reference to {target_class_name}")
-                relationship = UmlRelationship(
-                    source=self.uml_model[schema_name],
-                    target=self.uml_model[target_class_name],
+                target_key = self.resolver.canonical(document_path, ref)
+                logger.debug("Array with direct reference to %s", target_key)
+                relationship = CompactUmlRelationship(
+                    source_name=schema_key,
+                    target_name=target_key,
                     type="aggregation",
                     name=prop_name,
                     multiplicitySource="1",
@@ -482,97 +745,606 @@ class UMLGenerator:
         # Kun returner prefix hvis det er meningsfuldt (mindst 2 karakterer)
         return common_prefix if len(common_prefix) >= 2 else ""
 
-    def generate_uml(self) -> tuple[dict[str, UmlClass], list[UmlRelationship]]:
+    def _visit_document(self, schemas: dict, document_path: str) -> tuple[list[tuple[str, CompactUmlClass]], list[CompactUmlRelationship], dict[str, CompactUmlClass]]:
+        """
+        Besøger alle schemas i et enkelt YAML dokument.
+
+        Args:
+            schemas (dict | StreamedSchemas): Indholdet af components/schemas. For store
+                filer en StreamedSchemas, der giver ét schema ad gangen
+            document_path (str): Absolut sti til dokumentet
+
+        Returns:
+            tuple: ((kanonisk nøgle, klasse) par, relationships, abstrakte klasser) for dokumentet
+        """
+        classes = []
+        relationships = []
+        abstract_classes: dict[str, CompactUmlClass] = {}
+        for schema_name, schema in schemas.items():
+            schema_key, uml_class, schema_relationships = self._visit_schema(schema_name, schema, document_path, abstract_classes)
+            classes.append((schema_key, uml_class))
+            relationships.extend(schema_relationships)
+        return classes, relationships, abstract_classes
+
+    def _link_model(self, visited: list[tuple[list[tuple[str, CompactUmlClass]], list[CompactUmlRelationship], dict[str, CompactUmlClass]]]) -> None:
+        """
+        Samler resultaterne fra _visit_document til den endelige model.
+
+        1. Tildeler klasse id'er til alle schemas via RefResolver. Et schema navn der
+           er defineret i flere filer får et namespaced id i stedet for at overskrive
+        2. Tilføjer abstrakte klasser, medmindre et schema har samme navn
+        3. Oversætter kanoniske nøgler i relationships og attributter til klasse id'er
+        4. Validerer at alle relationships peger på eksisterende klasser og gemmer dem
+           i en RelationshipStore med heltals id'er fra symboltabellen
+        5. Fjerner duplikerede generalization relationships
+           (kan ske når flere oneOf/anyOf properties bruger de samme klasser)
+
+        Args:
+            visited (list): Resultater fra _visit_document i dokumentrækkefølge
+
+        Side effects:
+            - Populerer self.uml_model, self.symbols, self.uml_relationships og adjacency index
+            - Gemmer hvert dokuments rækker i de linkede relationships, så refresh kan linke enkelte dokumenter
+
+        Fejlhåndtering:
+            - KeyError hvis en relationship peger på en klasse der ikke findes
+        """
+        class_ids = self.resolver.assign_ids([key for classes, _, _ in visited for key, _ in classes])
+        self.stats.count("name_collisions", len(self.resolver.collisions))
+        class_id = self._class_id_resolver()
+
+        # Visit resultaterne ændres ikke, så de kan linkes igen når enkelte dokumenter besøges
+        # på ny (se refresh). Klasser med et namespaced id eller attributter med $ref (kanoniske
+        # nøgler fra visit-fasen) kopieres derfor i stedet for at blive rettet
+        uml_model: dict[str, CompactUmlClass] = {}
+        class_sources: dict[str, str] = {}
+        for classes, _, abstract_classes in visited:
+            if not classes:
+                continue
+            # Alle klasser i et dokument har samme fil, så den relative sti beregnes én gang
+            source = os.path.relpath(classes[0][0].partition("#")[0], self.resolver.base_dir)
+            for key, uml_class in classes:
+                class_name = class_ids[key]
+                uml_model[class_name] = self._linked_class(uml_class, class_name, class_id)
+                class_sources[class_name] = source
+            for abstract_class_name in abstract_classes:
+                class_sources.setdefault(abstract_class_name, source)
+        for _, _, abstract_classes in visited:
+            for abstract_class_name, abstract_class in abstract_classes.items():
+                if abstract_class_name not in uml_model:
+                    uml_model[abstract_class_name] = abstract_class
+
+        symbols = SymbolTable(uml_model)
+        store = RelationshipStore(symbols)
+        document_rows = [0]
+        for _, relationships, _ in visited:
+            self._append_linked(store, relationships, class_id)
+            document_rows.append(len(store))
+
+        self.uml_model = uml_model
+        self.symbols = symbols
+        self.class_sources = class_sources
+        self._linked_relationships = store
+        self._document_rows = document_rows
+        self._fingerprints = None
+        self._store_relationships(store)
+
+    def _relink(self, previous: dict[str, tuple | None]) -> bool:
+        """
+        Linker kun de dokumenter der er besøgt igen, når resten af modellen er uændret.
+
+        Det er muligt når dokumenterne definerer de samme schemas og abstrakte klasser
+        som før, så klasse id'er, symboltabellen og class_sources ikke ændres. De ændrede
+        klasser erstattes i en kopi af modellen, og dokumentets relationships erstattes
+        mellem de øvrige dokumenters uændrede rækker. Resultatet er det samme som ved
+        _link_model. Reachability indexet beholdes hvis dokumenternes aggregation og
+        generalization relationships er uændrede, og kun fingerprints for de berørte
+        klasser beregnes igen.
+
+        Args:
+            previous (dict): Absolut sti -> dokumentets tidligere visit resultat, None for nye filer
+
+        Returns:
+            bool: False hvis ændringen kræver en fuld _link_model, og intet er ændret
+
+        Fejlhåndtering:
+            - KeyError hvis en relationship peger på en klasse der ikke findes
+        """
+        if self._linked_relationships is None or len(self._document_rows) != len(self._documents) + 1:
+            return False
+        for path, visit in previous.items():
+            if visit is None or path not in self._documents:
+                return False
+            classes, _, abstract_classes = self._documents[path]
+            if [key for key, _ in visit[0]] != [key for key, _ in classes] or visit[2] != abstract_classes:
+                return False
+
+        class_id = self._class_id_resolver()
+        old_store = self._linked_relationships
+        old_rows = self._document_rows
+        symbols = self.symbols
+
+        def edges(store: RelationshipStore, start: int, stop: int) -> list[tuple[str, int, int]]:
+            # Typen slås op som navn, da dokumentet kan have tilføjet en type der ikke fandtes før
+            labels = store.labels.names
+            return [
+                (labels[store.type[row]], store.source[row], store.target[row])
+                for row in range(start, stop) if labels[store.type[row]] in ("aggregation", "generalization")
+            ]
+
+        uml_model = dict(self.uml_model)
+        store = RelationshipStore(symbols, old_store.labels)
+        changed_rows: dict[int, int] = {}  # Dokumentets position -> antal rækker efter relink
+        dirty: set[str] = set()  # Klasser hvis fingerprint skal beregnes igen
+        edges_changed = False
+        copied = 0
+        positions = [position for position, path in enumerate(self._documents) if path in previous]
+        paths = list(self._documents)
+        for position in positions:
+            classes, relationships, _ = self._documents[paths[position]]
+            start, stop = old_rows[position], old_rows[position + 1]
+            store.extend_rows(old_store, copied, start)
+            copied = stop
+            first = len(store)
+            for key, uml_class in classes:
+                class_name = class_id(key)
+                uml_model[class_name] = self._linked_class(uml_class, class_name, class_id)
+                dirty.add(class_name)
+            self._append_linked(store, relationships, class_id)
+            changed_rows[position] = len(store) - first
+            dirty.update(symbols.names[source] for source in old_store.source[start:stop])
+            dirty.update(symbols.names[source] for source in store.source[first:])
+            edges_changed = edges_changed or edges(old_store, start, stop) != edges(store, first, len(store))
+        store.extend_rows(old_store, copied, len(old_store))
+
+        document_rows = [0]
+        for position in range(len(paths)):
+            rows = changed_rows.get(position)
+            document_rows.append(document_rows[-1] + (old_rows[position + 1] - old_rows[position] if rows is None else rows))
+
+        reachability = self._reachability
+        self.uml_model = uml_model
+        self._linked_relationships = store
+        self._document_rows = document_rows
+        self._store_relationships(store)
+        if not edges_changed:
+            self._reachability = reachability
+        if self._fingerprints is not None:
+            self._fingerprints = {**self._fingerprints, **class_fingerprints({name: uml_model[name] for name in dirty}, self._adjacency)}
+        return True
+
+    def _class_id_resolver(self):
+        """
+        Funktion der oversætter kanoniske nøgler fra visit-fasen til klasse id'er.
+
+        Abstrakte nøgler giver den abstrakte klasses navn. Opslagene memoiseres, da
+        de samme nøgler går igen i mange relationships.
+        """
+        resolved_ids: dict[str, str] = {}  # Kanonisk nøgle -> klasse id, også for abstrakte nøgler
+
+        def class_id(key: str) -> str:
+            resolved = resolved_ids.get(key)
+            if resolved is None:
+                if key.startswith(ABSTRACT_KEY_PREFIX):
+                    resolved = key[len(ABSTRACT_KEY_PREFIX):]
+                else:
+                    resolved = self.resolver.class_id(key)
+                resolved_ids[key] = resolved
+            return resolved
+
+        return class_id
+
+    @staticmethod
+    def _linked_class(uml_class: CompactUmlClass, class_name: str, class_id) -> CompactUmlClass:
+        """Klassen med sit klasse id og attributternes $ref oversat til klasse id'er."""
+        if class_name != uml_class.name or any(attr.ref for attr in uml_class.attributes):
+            uml_class = replace(uml_class, name=class_name, attributes=[
+                replace(attr, ref=class_id(attr.ref)) if attr.ref else attr
+                for attr in uml_class.attributes
+            ])
+        return uml_class
+
+    @staticmethod
+    def _append_linked(store: RelationshipStore, relationships: list[CompactUmlRelationship], class_id) -> None:
+        """Tilføjer relationships fra visit-fasen til store med nøglerne oversat til klasse id'er."""
+        for rel in relationships:
+            source_name, target_name = class_id(rel.source_name), class_id(rel.target_name)
+            for class_name in (source_name, target_name):
+                if class_name not in store.classes:
+                    raise KeyError(f"Relationship {source_name} -> {target_name} refers to unknown class '{class_name}'")
+            store.append(source_name, target_name, rel.type, rel.name, rel.description, rel.multiplicitySource, rel.multiplicityTarget)
+
+    def _store_relationships(self, store: RelationshipStore) -> None:
+        """Gemmer de linkede relationships uden duplikerede generalizations og bygger adjacency indexet."""
+        unique_relationships = store.deduplicated("generalization")
+        logger.debug("Skipped %d duplicate generalizations", len(store) - len(unique_relationships))
+        self.uml_relationships = unique_relationships
+        self._build_adjacency()
+
+        self.stats.count("classes", len(self.uml_model))
+        for rel_type, count in unique_relationships.type_counts().items():
+            self.stats.count(f"relationships.{rel_type}", count)
+
+    def generate_uml(self) -> tuple[dict[str, CompactUmlClass], RelationshipStore]:
         """
         Hovedmetode der genererer komplet UML model fra alle YAML schema filer.
         
         Processen sker i tre faser:
-        1. Indlæs alle YAML filer rekursivt
-        2. Opret UML klasser for alle schemas (første gennemgang)
-        3. Opret relationships mellem klasserne (anden gennemgang)
+        1. Indlæs alle YAML filer rekursivt (eller kun dem der kan nås fra et entry dokument)
+        2. Besøg hvert schema én gang og opret både UML klasse og relationships
+        3. Link relationships til klasserne og fjern duplikater
         
-        To-faset approach sikrer at alle klasser eksisterer før relationships oprettes,
-        hvilket undgår problemer med forward references.
+        Med sharded=True og jobs > 1 køres fase 1 og 2 for et directory i worker processer
+        (se _visit_sharded), og fase 3 samler resultaterne.
+
+        Relationships refererer til klasser via kanoniske $ref nøgler, så schemas kan besøges
+        før de klasser de peger på er oprettet. Først linking-fasen oversætter nøglerne til
+        klasse id'er og kræver at alle klasser findes.
         
         Returns:
             tuple: (uml_model, uml_relationships) hvor:
-                - uml_model: Dict[str, UmlClass] - Alle UML klasser indexeret efter navn
-                - uml_relationships: List[UmlRelationship] - Alle relationships mellem klasser
+                - uml_model: Dict[str, CompactUmlClass] - Alle UML klasser indexeret efter navn
+                - uml_relationships: RelationshipStore - Alle relationships mellem klasser, kolonnevis.
+                  En skrivebeskyttet Sequence af CompactUmlRelationship (ingen append eller
+                  tildeling); brug list() for en liste der kan ændres
                 
         Side effects:
             - Populerer self.uml_model med alle UML klasser
             - Populerer self.uml_relationships med alle relationships
-            - Printer beskeder om indlæsning via _load_yaml_recursive
+            - Logger beskeder om indlæsning via _load_yaml_recursive
             
         Fejlhåndtering:
             - Forventer at alle $ref references peger på eksisterende klasser
             - Ignorerer filer uden valid OpenAPI struktur
         """
-        yamls = self._load_yaml_recursive()
-        
-        for yaml_name, yamldict in yamls.items():
-            schemas = yamldict['components']['schemas']
-        # Iterate through each schema in the YAML file and convert it to UML class
-            for schema_name, schema in schemas.items():
-                uml_class = self._schema_to_uml_class(schema_name, schema)
-                self.uml_model[schema_name] = uml_class
-        # Iterate through each schema in the YAML file and find relationships
-        # handles enum and arrays
-        all_relationships = []
-        for yaml_name, yamldict in yamls.items():
-            schemas = yamldict['components']['schemas']
-            for schema_name, schema in schemas.items():
-                relationships = self._find_relationships(schema_name, schema)
-                all_relationships.extend(relationships)
-                allof_relationships = self._find_allof_relationships(schema_name, schema)
-                all_relationships.extend(allof_relationships)
-        
-        # Remove duplicate generalization relationships
-        # (can happen when multiple oneOf/anyOf properties use the same classes)
-        unique_relationships = []
-        generalization_seen = set()  # (source, target) tuples for generalization relationships
-        
-        for rel in all_relationships:
-            if rel.type == "generalization":
-                rel_key = (rel.source.name, rel.target.name)
-                if rel_key not in generalization_seen:
-                    generalization_seen.add(rel_key)
-                    unique_relationships.append(rel)
+        if self.sharded and self.jobs > 1 and not self._is_entry_document():
+            with self.stats.phase("map"):
+                self._documents = self._visit_sharded()
+        else:
+            with self.stats.phase("load"):
+                yamls = self._load_documents()
+            with self.stats.phase("visit"):
+                self._documents = {path: self._visit_document(yamldict['components']['schemas'], path) for path, yamldict in yamls.items()}
+        visited = list(self._documents.values())
+        self.stats.count("schemas", sum(len(classes) for classes, _, _ in visited))
+        with self.stats.phase("link"):
+            self._link_model(visited)
+        return self.uml_model, self.uml_relationships
+
+    def refresh(self, paths) -> None:
+        """
+        Opdaterer modellen efter at filerne i paths er ændret, tilføjet eller slettet.
+
+        Kun de ændrede filer parses og besøges igen. De øvrige dokumenters visit
+        resultater genbruges. Definerer de ændrede filer de samme schemas som før,
+        linkes kun deres klasser og relationships igen (se _relink). Ellers linkes hele
+        modellen på ny, så namespaced id'er og duplikat-håndtering er de samme som ved
+        en fuld generate_uml().
+
+        For et entry dokument kan en ændring gøre andre filer reachable, så her
+        genereres hele modellen igen (med RefLoader, der kun parser det der kan nås).
+
+        Args:
+            paths: Stier til de ændrede, nye eller slettede filer
+
+        Fejlhåndtering:
+            - Parse fejl kastes før modellen ændres, så den forrige model bevares
+            - KeyError fra linking hvis en ændring efterlader en $ref til en ukendt klasse
+        """
+        if self._is_entry_document():
+            self.generate_uml()
+            return
+
+        with self.stats.phase("load"):
+            loaded_by_path = {}
+            for path in paths:
+                path = os.path.abspath(path)
+                if not os.path.isfile(path):
+                    loaded_by_path[path] = None
+                elif _is_streamed(path, self.stream_threshold):
+                    loaded_by_path[path] = _streamed_document(path)
                 else:
-                    print(f"Skipping duplicate generalization: {rel.source.name} --|> {rel.target.name}")
-            else:
-                unique_relationships.append(rel)
-        
-        self.uml_relationships = unique_relationships
+                    loaded_by_path[path] = _parse_yaml_file(path)
+                    if self.cache is not None and loaded_by_path[path] is not None:
+                        self.cache.put(path, loaded_by_path[path])
+            self.stats.count("files_parsed", len(loaded_by_path))
+
+        with self.stats.phase("visit"):
+            previous = {path: self._documents.get(path) for path in loaded_by_path}
+            for path, loaded in loaded_by_path.items():
+                logger.debug("Refreshing YAML file: %s", path)
+                if loaded is None:
+                    self._documents.pop(path, None)
+                else:
+                    self._documents[path] = self._visit_document(loaded['components']['schemas'], path)
+            if any(previous[path] is None and path in self._documents for path in loaded_by_path):
+                # Samme rækkefølge som os.walk i _load_yaml_recursive: filer før subdirectories, sorteret.
+                # Ændrede filer beholder deres plads, så der kun sorteres når der er kommet nye filer til
+                base_dir = self.resolver.base_dir
+                self._documents = dict(sorted(
+                    self._documents.items(),
+                    key=lambda item: _walk_order_key(os.path.relpath(item[0], base_dir))
+                ))
+
+        with self.stats.phase("link"):
+            try:
+                if not self._relink(previous):
+                    self._link_model(list(self._documents.values()))
+            except KeyError:
+                # De besøgte dokumenter passer ikke længere til den linkede model, så næste refresh linker alt
+                self._linked_relationships = None
+                raise
+
+    def save_model(self, path: str) -> None:
+        """
+        Gemmer den genererede model, så diagrammer senere kan laves uden at læse YAML.
+
+        Args:
+            path (str): Sti til model filen (.json, eller .json.gz for gzip)
+        """
+        with self.stats.phase("save_model"):
+            model_io.save_model(path, self.uml_model, self.uml_relationships, self.class_sources)
+
+    def load_model(self, path: str) -> tuple[dict[str, CompactUmlClass], RelationshipStore]:
+        """
+        Indlæser en model gemt med save_model i stedet for at køre generate_uml().
+
+        Subgrafer, dependents, rod-klasser og partitionering virker som efter
+        generate_uml(), men refresh() er ikke mulig, da modellen ikke er knyttet
+        til schema filerne.
+
+        Args:
+            path (str): Sti til model filen
+
+        Returns:
+            tuple: (uml_model, uml_relationships) hvor uml_relationships er en RelationshipStore som efter generate_uml()
+        """
+        with self.stats.phase("load"):
+            self.uml_model, uml_relationships, self.class_sources = model_io.load_model(path)
+            self.symbols = SymbolTable(self.uml_model)
+            self.uml_relationships = RelationshipStore.from_relationships(uml_relationships, self.symbols)
+            self._documents = {}
+            self._linked_relationships = None
+            self._fingerprints = None
+            self._build_adjacency()
+        self.stats.count("classes", len(self.uml_model))
         return self.uml_model, self.uml_relationships
 
-    def get_model_from_class_name(self, class_name: str) -> tuple[dict[str, UmlClass], list[UmlRelationship]]:
+    def class_fingerprints(self) -> dict[str, str]:
+        """
+        Fingerprints for alle klasser i modellen, til inkrementel regenerering af diagrammer.
+
+        Beregnes første gang og gemmes. Efter en refresh beregnes kun de berørte klassers igen.
+
+        Returns:
+            dict[str, str]: Klassenavn -> fingerprint af klassen og dens udgående relationships
+        """
+        if self._fingerprints is None:
+            self._fingerprints = class_fingerprints(self.uml_model, self._adjacency)
+        return dict(self._fingerprints)
+
+    def to_pydantic(self) -> tuple[dict, list]:
+        """
+        Eksporterer den genererede model som validerede pydantic modeller.
+
+        Modellen bygges internt med kompakte dataclasses og en kolonnevis
+        RelationshipStore hvor relationships refererer til klasser via heltals id'er. Denne metode er til kaldere der har brug for validering
+        eller de oprindelige UmlClass/UmlRelationship typer.
+
+        Returns:
+            tuple: (dict[str, UmlClass], list[UmlRelationship])
+        """
+        return to_pydantic(self.uml_model, self.uml_relationships)
+
+    def _build_adjacency(self) -> None:
+        """
+        Bygger index fra klassenavn til klassens udgående og indgående relationships.
+
+        For hver klasse ligger aggregation relationships før generalization
+        relationships, i samme rækkefølge som i self.uml_relationships.
+
+        Det indgående index peger fra en klasse til de klasser der afhænger af den.
+        Det er source for aggregation og allOf generalization. En konkret klasse i
+        en oneOf/anyOf er source for generalization til den abstrakte klasse, men
+        den abstrakte klasse afhænger af den, så her vendes retningen.
+
+        Side effects:
+            - Populerer self._adjacency og self._dependents og nulstiller reachability indexet
+        """
+        store = self.uml_relationships
+        generalizations = store.rows_of_type("generalization")
+        rows = store.rows_of_type("aggregation") + generalizations
+        sources = [store.source[row] for row in rows]
+        targets = [store.target[row] for row in rows]
+        self._adjacency = store.index(rows, sources, targets)
+
+        # Generalizations til en abstrakt klasse vendes i det indgående index
+        abstract_ids = {self.symbols.id_of(name) for name, uml_class in self.uml_model.items() if uml_class.type == "abstract"}
+        reversed_rows = {row for row in generalizations if store.target[row] in abstract_ids}
+        keys = [store.source[row] if row in reversed_rows else store.target[row] for row in rows]
+        others = [store.target[row] if row in reversed_rows else store.source[row] for row in rows]
+        self._dependents = store.index(rows, keys, others, pairs=True)
+        self._reachability = None
+
+    def _get_reachability(self) -> ReachabilityIndex:
+        """
+        Henter reachability indexet for modellen og bygger det første gang.
+
+        Returns:
+            ReachabilityIndex: Index over aggregation og generalization relationships
+        """
+        if self._reachability is None:
+            with self.stats.phase("closure"):
+                successors = {class_name: self._adjacency.others(class_name) for class_name in self._adjacency}
+                self._reachability = ReachabilityIndex(list(self.uml_model), successors)
+            self.stats.count("components", len(self._reachability.components))
+        return self._reachability
+
+    def get_root_classes(self) -> list[str]:
+        """
+        Finder rod-klasserne i modellen, dvs. de klasser der typisk er en ressource i API'et.
+
+        En rod-klasse er en almindelig klasse (ikke enum eller abstract) som ikke er target
+        for nogen relationship, og som ikke er en konkret klasse i en oneOf/anyOf.
+
+        Returns:
+            list[str]: Navnene på rod-klasserne i modellens rækkefølge
+        """
+        store = self.uml_relationships
+        abstract_ids = {self.symbols.id_of(name) for name, uml_class in self.uml_model.items() if uml_class.type == "abstract"}
+        referenced = set(store.target)
+        referenced.update(store.source[row] for row in store.rows_of_type("generalization") if store.target[row] in abstract_ids)
+        return [
+            class_name for class_name, uml_class in self.uml_model.items()
+            if uml_class.type == "class" and self.symbols.id_of(class_name) not in referenced
+        ]
+
+    def get_model_from_class_name(self, class_name: str, depth: int | None = None) -> tuple[dict[str, CompactUmlClass], list[CompactUmlRelationship]]:
         """
         Henter uml-modellen ud fra en klasse og dennes relationer. Udelader ikke relaterede klasser
+
+        Følger aggregation og generalization relationships hvor klassen er source.
+        Uden depth slås de klasser der kan nås op i et delt reachability index
+        (strongly connected components med memoiserede mængder), så gentagne kald for
+        mange klasser ikke gennemløber de samme dele af modellen igen. Startklassen
+        kommer først, derefter de øvrige klasser i modellens rækkefølge.
+        Med depth søges bredde-først med et visited set, så cykliske modeller
+        (A -> B -> A) terminerer.
+
+        Args:
+            class_name (str): Navnet på startklassen
+            depth (int | None): Maksimalt antal relationships der følges fra startklassen.
+                                None = ingen grænse
+
+        Returns:
+            tuple: (uml_model, uml_relationships) for den del af modellen der kan nås fra klassen
+
+        Fejlhåndtering:
+            - KeyError hvis klassen ikke findes. generate_uml() skal være kaldt først
         """
-        print(f"--------- Getting model from class name: {class_name}")
-        
-        
-        uml_class = self.uml_model.get(class_name)  
-        
-        # aggregation relationships where this class is source 
-        uml_relationships_for_class = [rel for rel in self.uml_relationships if rel.source.name == class_name and rel.type == "aggregation"]
-        uml_relationships_for_class += [rel for rel in self.uml_relationships if rel.source.name == class_name and rel.type == "generalization"]
+        if class_name not in self.uml_model:
+            raise KeyError(f"Class '{class_name}' not found in UML model")
+        logger.debug("Getting model from class name: %s", class_name)
 
-        uml_model = {}
-        uml_relationships = []
-        # Først klassens egne
-        uml_model[uml_class.name] = uml_class # pyright: ignore[reportOptionalMemberAccess]
-        uml_relationships.extend(uml_relationships_for_class)
+        if depth is None:
+            reachability = self._get_reachability()
+            with self.stats.phase("subgraph"):
+                class_names = reachability.ordered_reachable(class_name)
+                uml_model = {name: self.uml_model[name] for name in class_names}
+                uml_relationships = [rel for name in class_names for rel in self._adjacency.get(name, ())]
+            logger.debug("Relationships found from %s: %d", class_name, len(uml_relationships))
+            return uml_model, uml_relationships
 
-        print(f"-----------Relationships found: {len(uml_relationships)}")
-        # recursively add target classes of aggregation relationships
-        for rel in uml_relationships_for_class:
-            uml_model_r, uml_relationships_r = self.get_model_from_class_name(rel.target.name)
-            uml_model.update(uml_model_r)
-            uml_relationships.extend(uml_relationships_r)
-        print(f"--------- DONE Getting model from class name: {class_name}")
-        # or generalization relationships where this class is target
-        
-        
-        return uml_model, uml_relationships
\ No newline at end of file
+        with self.stats.phase("subgraph"):
+            uml_model = {class_name: self.uml_model[class_name]}
+            uml_relationships = []
+            queue = deque([(class_name, 0)])
+            while queue:
+                current, current_depth = queue.popleft()
+                if current_depth >= depth:
+                    continue
+                for rel in self._adjacency.get(current, []):
+                    uml_relationships.append(rel)
+                    target_name = rel.target_name
+                    if target_name not in uml_model:
+                        uml_model[target_name] = self.uml_model[target_name]
+                        queue.append((target_name, current_depth + 1))
+
+        logger.debug("Relationships found from %s: %d", class_name, len(uml_relationships))
+        return uml_model, uml_relationships
+
+    def get_model_from_class_names(self, class_names: list[str]) -> tuple[dict[str, CompactUmlClass], list[CompactUmlRelationship]]:
+        """
+        Henter den del af modellen der kan nås fra mindst én af klasserne.
+
+        Bruges til diagrammer med flere rødder, f.eks. en operations request og
+        response schemas. Mængderne slås op i det delte reachability index, så
+        schemas der deles af mange operationer kun gennemløbes én gang.
+
+        Args:
+            class_names (list[str]): Navnene på startklasserne
+
+        Returns:
+            tuple: (uml_model, uml_relationships) med startklasserne først
+
+        Fejlhåndtering:
+            - KeyError hvis en af klasserne ikke findes
+        """
+        for class_name in class_names:
+            if class_name not in self.uml_model:
+                raise KeyError(f"Class '{class_name}' not found in UML model")
+        reachability = self._get_reachability()
+        with self.stats.phase("subgraph"):
+            names = reachability.ordered_union(class_names)
+            uml_model = {name: self.uml_model[name] for name in names}
+            uml_relationships = [rel for name in names for rel in self._adjacency.get(name, ())]
+        return uml_model, uml_relationships
+
+    def get_partitions(self, strategy: str = "components", max_size: int = 200) -> list[tuple[str, tuple[dict[str, CompactUmlClass], list[CompactUmlRelationship]]]]:
+        """
+        Deler modellen i clusters til diagrammer der er små nok til at blive renderet.
+
+        Se partition_model for strategierne. Relationships der krydser clusters vises
+        med en stub for target klassen, og et oversigtsdiagram ("index") viser
+        clusterne og relationships mellem dem.
+
+        Args:
+            strategy (str): "components", "directories" eller "communities"
+            max_size (int): Maksimalt antal klasser pr. cluster (uden stubs)
+
+        Returns:
+            list: (navn, (uml_model, uml_relationships)) pr. cluster efterfulgt af oversigten
+
+        Fejlhåndtering:
+            - ValueError ved "directories" når modellen ikke kender klassernes schema filer
+              (en model fil gemt af en ældre version)
+        """
+        if strategy == "directories" and self.uml_model and not self.class_sources:
+            raise ValueError("Partitioning by directories needs the schema file of each class; "
+                             "build the model from schema_dir or save it again with --save-model")
+        with self.stats.phase("partition"):
+            clusters = partition_model(self.uml_model, self.uml_relationships, strategy, max_size, self.class_sources)
+            partitions = [(cluster.name, cluster_model(cluster, self.uml_model, self._adjacency)) for cluster in clusters]
+            partitions.append((INDEX_NAME, index_model(clusters, self.uml_relationships)))
+        self.stats.count("clusters", len(clusters))
+        return partitions
+
+    def get_dependents_of(self, class_name: str, depth: int | None = None) -> tuple[dict[str, CompactUmlClass], list[CompactUmlRelationship]]:
+        """
+        Henter den del af modellen der afhænger af en klasse (impact analyse).
+
+        Følger indgående relationships bredde-først via det indgående index, så
+        tiden afhænger af resultatets størrelse og ikke af modellens.
+
+        Args:
+            class_name (str): Navnet på klassen der ændres
+            depth (int | None): Maksimalt antal relationships der følges fra klassen.
+                                None = ingen grænse
+
+        Returns:
+            tuple: (uml_model, uml_relationships) med klassen, alle klasser der direkte
+                   eller indirekte afhænger af den, og de relationships der forbinder dem
+
+        Fejlhåndtering:
+            - KeyError hvis klassen ikke findes. generate_uml() skal være kaldt først
+        """
+        if class_name not in self.uml_model:
+            raise KeyError(f"Class '{class_name}' not found in UML model")
+        logger.debug("Getting dependents of class: %s", class_name)
+
+        with self.stats.phase("dependents"):
+            uml_model = {class_name: self.uml_model[class_name]}
+            uml_relationships = []
+            queue = deque([(class_name, 0)])
+            while queue:
+                current, current_depth = queue.popleft()
+                if depth is not None and current_depth >= depth:
+                    continue
+                for rel, dependent in self._dependents.get(current, []):
+                    uml_relationships.append(rel)
+                    if dependent not in uml_model:
+                        uml_model[dependent] = self.uml_model[dependent]
+                        queue.append((dependent, current_depth + 1))
+
+        logger.debug("Dependents found for %s: %d", class_name, len(uml_model) - 1)
+        return uml_model, uml_relationships
@@ -1,8 +1,11 @@
 # This module will handle UML class to Mermaid Class Diagram conversion logic.
-from models.uml_models import UmlClass, UmlRelationship
+from __future__ import annotations
+
+from models.compact_models import CompactUmlClass, CompactUmlRelationship
+from modules.relationship_store import relationship_rows
 
 class UMLToMermaidConverter:
-    def uml_class_to_mermaid(self, uml_class: UmlClass, uml_model: dict) -> str:
+    def uml_class_to_mermaid(self, uml_class: CompactUmlClass, uml_model: dict) -> str:
         """Convert an UML class to Mermaid Class Diagram format."""
         # Handle different class types
         class_name = uml_class.name
@@ -13,7 +16,7 @@ class UMLToMermaidConverter:
         # Add attributes
         for attr in uml_class.attributes:
             if attr.ref:
-                ref_class_name = attr.ref.split("/")[-1]
+                ref_class_name = attr.ref  # Klasse id, oversat fra $ref i linking-fasen
                 if uml_model.get(ref_class_name) and uml_model[ref_class_name].type == "enum":
                     # For enum references, show as attribute
                     visibility = "+" if attr.required else "-"
@@ -37,19 +40,20 @@ class UMLToMermaidConverter:
         
         return mermaid_str
     
-    def uml_relationship_to_mermaid(self, relationship: UmlRelationship) -> str:
+    def uml_relationship_to_mermaid(self, relationship: CompactUmlRelationship) -> str:
         """Convert an UML relationship to Mermaid Class Diagram format."""
-        source = relationship.source.name
-        target = relationship.target.name
-        
-        if relationship.type == "association":
+        return self._relationship_to_mermaid(relationship.source_name, relationship.target_name, relationship.type,
+                                             relationship.name, relationship.multiplicityTarget)
+
+    def _relationship_to_mermaid(self, source: str, target: str, rel_type: str, name: str | None, multiplicity_target: str | None) -> str:
+        if rel_type == "association":
             return f"    {source} --> {target}\n"
-        elif relationship.type == "inheritance" or relationship.type == "generalization":
+        elif rel_type == "inheritance" or rel_type == "generalization":
             return f"    {target} <|-- {source}\n"
-        elif relationship.type == "aggregation":
+        elif rel_type == "aggregation":
             # Mermaid aggregation with multiplicity and label
-            multiplicity = relationship.multiplicityTarget if relationship.multiplicityTarget else ""
-            label = relationship.name if relationship.name else ""
+            multiplicity = multiplicity_target if multiplicity_target else ""
+            label = name if name else ""
             if multiplicity and label:
                 return f"    {source} o-- \"{multiplicity}\" {target} :  {label}\n"
             elif multiplicity:
@@ -58,9 +62,9 @@ class UMLToMermaidConverter:
                 return f"    {source} o-- {target} : {label}\n"
             else:
                 return f"    {source} o-- {target}\n"
-        elif relationship.type == "composition":
-            multiplicity = relationship.multiplicityTarget if relationship.multiplicityTarget else ""
-            label = relationship.name if relationship.name else ""
+        elif rel_type == "composition":
+            multiplicity = multiplicity_target if multiplicity_target else ""
+            label = name if name else ""
             if multiplicity and label:
                 return f"    {source} *--  \"{multiplicity}\" {target} : {label}\n"
             elif multiplicity:
@@ -73,24 +77,31 @@ class UMLToMermaidConverter:
             # Default to association
             return f"    {source} --> {target}\n"
     
-    def uml_model_to_mermaid(self, uml_model: dict, uml_relationships: list) -> str:
-        """Convert complete UML model to Mermaid Class Diagram format."""
-        mermaid_str = "classDiagram\n"
+    def iter_mermaid(self, uml_model: dict, uml_relationships: list):
+        """Yield the Mermaid Class Diagram for a complete UML model chunk by chunk."""
+        yield "classDiagram\n"
         
         # Add only classes that have attributes or are not abstract/empty
         for class_name, uml_class in uml_model.items():
             if uml_class.type not in ["enum"]:  # Exclude enums as separate classes
                 # Only add class definition if it has attributes
                 if uml_class.attributes:
-                    mermaid_str += self.uml_class_to_mermaid(uml_class, uml_model)
-                    mermaid_str += "\n"
+                    yield self.uml_class_to_mermaid(uml_class, uml_model)
+                    yield "\n"
                 elif uml_class.type == "abstract":
                     # For abstract classes without attributes, only add the annotation
-                    mermaid_str += f"    class {class_name}\n"
-                    mermaid_str += f"    {class_name} : <<abstract>>\n\n"
+                    yield f"    class {class_name}\n    {class_name} : <<abstract>>\n\n"
         
         # Add relationships (this will implicitly reference classes without definitions)
-        for relationship in uml_relationships:
-            mermaid_str += self.uml_relationship_to_mermaid(relationship)
-        
-        return mermaid_str
+        # Rækkerne læses direkte fra en RelationshipStore, uden et objekt pr. relationship
+        for source, target, rel_type, name, _, _, multiplicity_target in relationship_rows(uml_relationships):
+            yield self._relationship_to_mermaid(source, target, rel_type, name, multiplicity_target)
+
+    def write_to(self, file_obj, uml_model: dict, uml_relationships: list) -> None:
+        """Stream the Mermaid Class Diagram for a complete UML model to a writable text file object."""
+        for chunk in self.iter_mermaid(uml_model, uml_relationships):
+            file_obj.write(chunk)
+    
+    def uml_model_to_mermaid(self, uml_model: dict, uml_relationships: list) -> str:
+        """Convert complete UML model to Mermaid Class Diagram format."""
+        return "".join(self.iter_mermaid(uml_model, uml_relationships))
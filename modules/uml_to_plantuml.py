@@ -1,8 +1,11 @@
 # This module will handle UML class to PlantUML conversion logic.
-from models.uml_models import UmlClass, UmlRelationship
+from __future__ import annotations
+
+from models.compact_models import CompactUmlClass, CompactUmlRelationship
+from modules.relationship_store import relationship_rows
 
 class UMLToPlantUMLConverter:
-    def uml_class_to_plantuml(self, uml_class: UmlClass, uml_model: dict) -> str:
+    def uml_class_to_plantuml(self, uml_class: CompactUmlClass, uml_model: dict) -> str:
         """Convert an UML class to PlantUML format.
         """
         # Handle abstract classes
@@ -11,7 +14,7 @@ class UMLToPlantUMLConverter:
         puml_str_relationships = ""
         for attr in uml_class.attributes:
             if attr.ref:
-                ref_class_name = attr.ref.split("/")[-1]
+                ref_class_name = attr.ref  # Klasse id, oversat fra $ref i linking-fasen
                 if uml_model.get(ref_class_name) and uml_model[ref_class_name].type == "enum":
                     puml_str += f"    +{attr.name} : {attr.type}\n"
                 else:
@@ -23,24 +26,36 @@ class UMLToPlantUMLConverter:
         #puml_str += puml_str_relationships
         return puml_str
     
-    def uml_relationship_to_plantuml(self, relationship: UmlRelationship) -> str:
+    def uml_relationship_to_plantuml(self, relationship: CompactUmlRelationship) -> str:
         """Convert an UML relationship to PlantUML format."""
-        if relationship.type == "association":
-            return f'{relationship.source.name} *-- {relationship.target.name}\n'
-        elif relationship.type == "inheritance" or relationship.type == "generalization":
-            return f'{relationship.target.name} <|-- {relationship.source.name}\n'
-        elif relationship.type == "aggregation":
-            return f'{relationship.source.name} o-- "{relationship.multiplicityTarget}" {relationship.target.name} : {relationship.name}\n'
+        return self._relationship_to_plantuml(relationship.source_name, relationship.target_name, relationship.type,
+                                              relationship.name, relationship.multiplicityTarget)
+
+    def _relationship_to_plantuml(self, source: str, target: str, rel_type: str, name: str | None, multiplicity_target: str | None) -> str:
+        if rel_type == "association":
+            return f'{source} *-- {target}\n'
+        elif rel_type == "inheritance" or rel_type == "generalization":
+            return f'{target} <|-- {source}\n'
+        elif rel_type == "aggregation":
+            return f'{source} o-- "{multiplicity_target}" {target} : {name}\n'
         else:
             return ""
 
-    def uml_model_to_plantuml(self, uml_model: dict, uml_relationships: list) -> str:
-        puml_str = "@startuml\n"
+    def iter_plantuml(self, uml_model: dict, uml_relationships: list):
+        """Yield the PlantUML diagram for a complete UML model chunk by chunk."""
+        yield "@startuml\n"
         for class_name, uml_class in uml_model.items():
             if uml_class.type not in ["enum"]:  # Include abstract classes
-                puml_str += self.uml_class_to_plantuml(uml_class, uml_model)
-        for relationship in uml_relationships:
-            puml_str += self.uml_relationship_to_plantuml(relationship)
-        puml_str += "\n@enduml"
-        return puml_str
-    
\ No newline at end of file
+                yield self.uml_class_to_plantuml(uml_class, uml_model)
+        # Rækkerne læses direkte fra en RelationshipStore, uden et objekt pr. relationship
+        for source, target, rel_type, name, _, _, multiplicity_target in relationship_rows(uml_relationships):
+            yield self._relationship_to_plantuml(source, target, rel_type, name, multiplicity_target)
+        yield "\n@enduml"
+
+    def write_to(self, file_obj, uml_model: dict, uml_relationships: list) -> None:
+        """Stream the PlantUML diagram for a complete UML model to a writable text file object."""
+        for chunk in self.iter_plantuml(uml_model, uml_relationships):
+            file_obj.write(chunk)
+
+    def uml_model_to_plantuml(self, uml_model: dict, uml_relationships: list) -> str:
+        return "".join(self.iter_plantuml(uml_model, uml_relationships))
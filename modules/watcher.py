@@ -0,0 +1,96 @@
+# This module will handle watching the schema directory for changed YAML files.
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot(directory: str, extension: str = ".yaml") -> dict[str, tuple[int, int]]:
+    """
+    Registrerer mtime og størrelse for alle filer med extension under directory.
+
+    Symlinks til directories følges ikke, ligesom os.walk i UMLGenerator ikke
+    følger dem, så en symlink cyklus ikke giver et uendeligt scan.
+
+    Args:
+        directory (str): Directory der gennemløbes rekursivt
+        extension (str): Filendelse der medtages
+
+    Returns:
+        dict: Absolut sti -> (mtime_ns, size)
+    """
+    result = {}
+    pending = [os.path.abspath(directory)]
+    while pending:
+        current = pending.pop()
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.name.endswith(extension):
+                    stat = entry.stat()
+                    result[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                # Filen er slettet mellem scandir og stat
+                continue
+    return result
+
+
+class PollingWatcher:
+    """
+    Finder ændrede YAML filer ved at sammenligne mtime og størrelse med sidste scan.
+
+    Polling kræver ingen ekstra afhængigheder og virker på alle platforme. Et scan
+    koster ét stat kald pr. fil, så selv store schema træer kan scannes mange gange
+    i sekundet. Editorer gemmer ofte i flere skridt (temp fil, rename, chmod), så
+    ændringer samles indtil træet har været uændret i debounce sekunder.
+    """
+    def __init__(self, directory: str, interval: float = 0.2, debounce: float = 0.1):
+        """
+        Initialiserer watcheren og tager det første snapshot.
+
+        Args:
+            directory (str): Directory der overvåges
+            interval (float): Sekunder mellem scans når intet er ændret
+            debounce (float): Sekunder træet skal være uændret før ændringerne rapporteres
+        """
+        self.directory = directory
+        self.interval = interval
+        self.debounce = debounce
+        self._state = snapshot(directory)
+
+    def _diff(self, state: dict) -> set[str]:
+        changed = {path for path, signature in state.items() if self._state.get(path) != signature}
+        changed.update(path for path in self._state if path not in state)
+        return changed
+
+    def wait_for_changes(self) -> set[str]:
+        """
+        Blokerer indtil en eller flere filer er ændret, tilføjet eller slettet.
+
+        Returns:
+            set[str]: Absolutte stier til de berørte filer
+        """
+        while True:
+            time.sleep(self.interval)
+            state = snapshot(self.directory)
+            changed = self._diff(state)
+            if not changed:
+                continue
+            # Vent til en byge af gemninger er overstået
+            while True:
+                time.sleep(self.debounce)
+                latest = snapshot(self.directory)
+                if latest == state:
+                    break
+                state = latest
+            changed = self._diff(state)
+            self._state = state
+            if changed:
+                logger.debug("Changed files: %s", sorted(changed))
+                return changed
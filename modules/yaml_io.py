@@ -0,0 +1,166 @@
+# This module will handle reading of YAML documents.
+import yaml
+
+try:
+    # libyaml baseret loader er markant hurtigere end den rene Python loader
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+
+def load_yaml_file(path: str):
+    """
+    Parser en YAML fil med den hurtigste tilgængelige safe loader.
+
+    Args:
+        path (str): Sti til YAML filen
+
+    Returns:
+        Det parsede dokument (typisk dict), eller None for en tom fil
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=YamlLoader)
+
+
+# Filer over denne størrelse læses som en strøm af schemas i stedet for som ét dokument.
+# Standardværdien for UMLGenerator(stream_threshold=...) og --stream-threshold
+STREAM_THRESHOLD = 1024 * 1024
+
+
+def _skip_node(loader, anchors: dict) -> None:
+    # Forbruger events for en node uden at bygge den. Noder med et anker bygges alligevel,
+    # da et schema senere kan referere til dem med et alias (f.eks. 'x-common: &common')
+    event = loader.peek_event()
+    if event.anchor is not None and not isinstance(event, yaml.AliasEvent):
+        _compose_node(loader, anchors)
+        return
+    loader.get_event()
+    if isinstance(event, yaml.MappingStartEvent):
+        while not loader.check_event(yaml.MappingEndEvent):
+            _skip_node(loader, anchors)
+        loader.get_event()
+    elif isinstance(event, yaml.SequenceStartEvent):
+        while not loader.check_event(yaml.SequenceEndEvent):
+            _skip_node(loader, anchors)
+        loader.get_event()
+
+
+def _compose_node(loader, anchors: dict):
+    # Bygger en node fra events, som yaml.composer.Composer gør. Composeren i libyaml
+    # kan kun bygge hele dokumenter, så under-træer bygges her
+    event = loader.get_event()
+    if isinstance(event, yaml.AliasEvent):
+        if event.anchor not in anchors:
+            raise yaml.composer.ComposerError(None, None, f"found undefined alias {event.anchor!r}", event.start_mark)
+        return anchors[event.anchor]
+    if isinstance(event, yaml.ScalarEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+        node = yaml.ScalarNode(tag, event.value, event.start_mark, event.end_mark, style=event.style)
+    elif isinstance(event, yaml.SequenceStartEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.SequenceNode, None, event.implicit)
+        node = yaml.SequenceNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+        if event.anchor is not None:
+            anchors[event.anchor] = node
+        while not loader.check_event(yaml.SequenceEndEvent):
+            node.value.append(_compose_node(loader, anchors))
+        node.end_mark = loader.get_event().end_mark
+        return node
+    else:
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.MappingNode, None, event.implicit)
+        node = yaml.MappingNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+        if event.anchor is not None:
+            anchors[event.anchor] = node
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = _compose_node(loader, anchors)
+            node.value.append((key, _compose_node(loader, anchors)))
+        node.end_mark = loader.get_event().end_mark
+        return node
+    if event.anchor is not None:
+        anchors[event.anchor] = node
+    return node
+
+
+def _next_key(loader, anchors: dict) -> str | None:
+    # Næste nøgle i en mapping, eller None ved mappingens slutning
+    if loader.check_event(yaml.MappingEndEvent):
+        loader.get_event()
+        return None
+    event = loader.peek_event()
+    if isinstance(event, yaml.ScalarEvent):
+        loader.get_event()
+        return event.value
+    _skip_node(loader, anchors)  # Komplekse nøgler bruges ikke i OpenAPI
+    return ""
+
+
+def iter_schemas(path: str):
+    """
+    Læser components/schemas fra en YAML fil ét schema ad gangen via YAML event API'et.
+
+    Alt uden for components/schemas (f.eks. en stor paths sektion) læses som events
+    og springes over uden at blive bygget, bortset fra noder med et anker, som et
+    schema kan referere til med et alias. Hvert schema bygges og konverteres for sig,
+    så peak memory følger det største schema og ikke hele filen.
+
+    Args:
+        path (str): Sti til YAML filen
+
+    Yields:
+        tuple: (schema navn, schema) i filens rækkefølge
+
+    Fejlhåndtering:
+        - yaml.YAMLError ved ugyldig YAML, eller et alias til et anker der ikke er defineret før det
+    """
+    with open(path, "rb") as f:
+        loader = YamlLoader(f)
+        try:
+            loader.get_event()  # StreamStart
+            if loader.check_event(yaml.StreamEndEvent):
+                return
+            loader.get_event()  # DocumentStart
+            if not loader.check_event(yaml.MappingStartEvent):
+                return
+            loader.get_event()
+            anchors = {}
+            for section in iter(lambda: _next_key(loader, anchors), None):
+                if section != "components" or not loader.check_event(yaml.MappingStartEvent):
+                    _skip_node(loader, anchors)
+                    continue
+                loader.get_event()
+                for component in iter(lambda: _next_key(loader, anchors), None):
+                    if component != "schemas" or not loader.check_event(yaml.MappingStartEvent):
+                        _skip_node(loader, anchors)
+                        continue
+                    loader.get_event()
+                    for schema_name in iter(lambda: _next_key(loader, anchors), None):
+                        node = _compose_node(loader, anchors)
+                        schema = loader.construct_object(node, deep=True)
+                        # Konstruerede objekter holdes ellers i live til dokumentets slutning
+                        loader.constructed_objects = {}
+                        loader.recursive_objects = {}
+                        yield schema_name, schema
+        finally:
+            loader.dispose()
+
+
+class StreamedSchemas:
+    """
+    Stand-in for components/schemas i en stor fil, som læses først når den gennemløbes.
+
+    items() starter en ny strøm via iter_schemas hver gang, så indholdet aldrig
+    ligger i memory på én gang.
+    """
+    def __init__(self, path: str):
+        self.path = path
+
+    def items(self):
+        return iter_schemas(self.path)
+
+    def __repr__(self):
+        return f"StreamedSchemas({self.path!r})"
@@ -0,0 +1,167 @@
+# This module will test the diagram service and its HTTP handler.
+from contextlib import contextmanager
+import http.client
+import json
+import threading
+
+import pytest
+
+from app import DiagramService, make_server
+from modules.plantuml_renderer import RenderError
+
+SCHEMAS = """\
+components:
+  schemas:
+    Pet:
+      type: object
+      properties:
+        id: {type: integer}
+    Owner:
+      type: object
+      properties:
+        pet: {$ref: '#/components/schemas/Pet'}
+    Shop:
+      type: object
+      properties:
+        name: {type: string}
+"""
+
+
+class CountingRenderer:
+    """Renderer der tæller kaldene og returnerer kilden som "PNG"."""
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+
+    def render(self, source: str) -> bytes:
+        self.calls.append(source)
+        if self.fail:
+            raise RenderError("renderer is down")
+        return b"PNG" + source.encode("utf-8")
+
+
+@pytest.fixture
+def schema_file(tmp_path):
+    path = tmp_path / "schemas.yaml"
+    path.write_text(SCHEMAS)
+    return path
+
+
+def _service(schema_file, **kwargs):
+    renderer = CountingRenderer(kwargs.pop("fail", False))
+    return DiagramService(str(schema_file.parent), renderer, **kwargs), renderer
+
+
+def test_diagram_is_cached(schema_file):
+    service, renderer = _service(schema_file)
+    content, etag = service.diagram("Owner", "png")
+    assert service.diagram("Owner", "png") == (content, etag)
+    assert len(renderer.calls) == 1
+    assert 'Owner o-- "1" Pet : pet' in renderer.calls[0]
+
+
+def test_lru_evicts_least_recently_used(schema_file):
+    service, renderer = _service(schema_file, cache_size=2)
+    service.diagram("Pet", "png")
+    service.diagram("Owner", "png")
+    service.diagram("Pet", "png")  # Pet er nu den senest brugte
+    service.diagram("Shop", "png")  # Owner fjernes
+    assert len(renderer.calls) == 3
+    service.diagram("Pet", "png")
+    assert len(renderer.calls) == 3
+    service.diagram("Owner", "png")
+    assert len(renderer.calls) == 4
+
+
+def test_reload_bumps_version_and_invalidates_cache(schema_file):
+    service, renderer = _service(schema_file)
+    before, before_etag = service.diagram("Pet", "puml")
+    schema_file.write_text(SCHEMAS.replace("id: {type: integer}", "id: {type: integer}\n        tag: {type: string}"))
+    service.reload({str(schema_file)})
+    assert service.version == 1
+    after, after_etag = service.diagram("Pet", "puml")
+    assert b"tag : string" in after and b"tag" not in before
+    assert after_etag != before_etag
+
+
+def test_failed_reload_keeps_serving_previous_model(schema_file):
+    service, _ = _service(schema_file)
+    content = service.diagram("Pet", "mmd")
+    schema_file.write_text("components: [unclosed\n")
+    service.reload({str(schema_file)})
+    assert service.version == 0
+    assert service.diagram("Pet", "mmd") == content
+
+
+def test_unknown_class_is_a_key_error(schema_file):
+    service, _ = _service(schema_file)
+    with pytest.raises(KeyError):
+        service.diagram("Nope", "puml")
+
+
+@contextmanager
+def _serving(service):
+    httpd = make_server(service, port=0)
+    threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True).start()
+    try:
+        yield httpd
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+@pytest.fixture
+def server(schema_file):
+    service, renderer = _service(schema_file)
+    with _serving(service) as httpd:
+        yield httpd, renderer
+
+
+def _get(httpd, path: str, headers: dict | None = None):
+    connection = http.client.HTTPConnection("127.0.0.1", httpd.server_address[1], timeout=10)
+    try:
+        connection.request("GET", path, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def test_get_diagram_with_etag_and_304(server):
+    httpd, _ = server
+    status, headers, body = _get(httpd, "/diagram/Owner.mmd")
+    assert status == 200
+    assert headers["Content-Type"].startswith("text/plain")
+    assert b"Owner" in body and b"Pet" in body
+    etag = headers["ETag"]
+
+    status, headers, body = _get(httpd, "/diagram/Owner.mmd", {"If-None-Match": f'"other", {etag}'})
+    assert (status, headers["ETag"], body) == (304, etag, b"")
+    assert _get(httpd, "/diagram/Owner.mmd", {"If-None-Match": '"other"'})[0] == 200
+
+
+def test_get_classes(server):
+    httpd, _ = server
+    status, headers, body = _get(httpd, "/classes")
+    assert status == 200 and headers["Content-Type"] == "application/json"
+    assert sorted(json.loads(body)) == ["Owner", "Pet", "Shop"]
+
+
+@pytest.mark.parametrize("path, status", [
+    ("/diagram/Nope.puml", 404),
+    ("/elsewhere", 404),
+    ("/diagram/Pet.svg", 400),
+    ("/diagram/Pet", 400),
+    ("/diagram/.puml", 400),
+])
+def test_error_paths(server, path, status):
+    httpd, renderer = server
+    assert _get(httpd, path)[0] == status
+    assert renderer.calls == []
+
+
+def test_render_failure_is_bad_gateway(schema_file):
+    service, _ = _service(schema_file, fail=True)
+    with _serving(service) as httpd:
+        assert _get(httpd, "/diagram/Pet.png")[0] == 502
+        assert _get(httpd, "/diagram/Pet.puml")[0] == 200
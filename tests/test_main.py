@@ -0,0 +1,88 @@
+# This module will test command line argument parsing and start class handling.
+import os
+import sys
+
+import pytest
+
+import main
+
+
+def _parse(monkeypatch, *arguments):
+    monkeypatch.setattr(sys, "argv", ["main.py", "data", *arguments])
+    return main.parse_args()
+
+
+def test_depth_accepts_zero_and_positive(monkeypatch):
+    assert _parse(monkeypatch, "--depth", "0").depth == 0
+    assert _parse(monkeypatch, "--depth", "3").depth == 3
+    assert _parse(monkeypatch).depth is None
+
+
+@pytest.mark.parametrize("value", ["-1", "two", "1.5"])
+def test_depth_rejects_negative_and_non_integers(monkeypatch, capsys, value):
+    with pytest.raises(SystemExit):
+        _parse(monkeypatch, "--depth", value)
+    assert "--depth" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("value", ["0", "-2"])
+def test_workers_must_be_positive(monkeypatch, capsys, value):
+    with pytest.raises(SystemExit):
+        _parse(monkeypatch, "--workers", value)
+    assert "--workers" in capsys.readouterr().err
+
+
+def _schema_dir(tmp_path):
+    schema_dir = tmp_path / "schemas"
+    schema_dir.mkdir()
+    (schema_dir / "pet.yaml").write_text(
+        "components:\n  schemas:\n    Pet:\n      type: object\n      properties:\n        id: {type: integer}\n"
+        "    Owner:\n      type: object\n      properties:\n        pet: {$ref: '#/components/schemas/Pet'}\n"
+    )
+    return str(schema_dir)
+
+
+def _run(monkeypatch, tmp_path, *arguments):
+    (tmp_path / "out").mkdir()
+    output = str(tmp_path / "out" / "diagram")
+    monkeypatch.setattr(sys, "argv", ["main.py", _schema_dir(tmp_path), "--no-cache", "--format", "mermaid", "-q", "-f", output, *arguments])
+    main.main()
+    return sorted(os.listdir(tmp_path / "out"))
+
+
+def test_unknown_start_classes_are_skipped_in_a_batch(monkeypatch, tmp_path, caplog):
+    manifest = tmp_path / "classes.txt"
+    manifest.write_text("Owner\nMissing\n")
+    files = _run(monkeypatch, tmp_path, "-s", "Pet,Nope", "--manifest", str(manifest))
+    assert [name for name in files if name.endswith(".mmd")] == ["diagram_Owner.mmd", "diagram_Pet.mmd"]
+    assert "Nope, Missing" in caplog.text
+
+
+def test_only_unknown_start_classes_is_an_error(monkeypatch, tmp_path):
+    with pytest.raises(SystemExit) as exit_info:
+        _run(monkeypatch, tmp_path, "-s", "Nope")
+    assert exit_info.value.code == 1
+
+
+def test_max_classes_must_be_positive(monkeypatch, capsys):
+    with pytest.raises(SystemExit):
+        _parse(monkeypatch, "--partition", "components", "--max-classes", "0")
+    assert "--max-classes" in capsys.readouterr().err
+
+
+def test_unknown_dependents_of_class_is_an_error(monkeypatch, tmp_path, caplog):
+    with pytest.raises(SystemExit) as exit_info:
+        _run(monkeypatch, tmp_path, "--dependents-of", "Nope")
+    assert exit_info.value.code == 1
+    assert "Nope" in caplog.text
+
+
+def test_dependents_of_known_class(monkeypatch, tmp_path):
+    assert [name for name in _run(monkeypatch, tmp_path, "--dependents-of", "Pet") if name.endswith(".mmd")] == ["diagram.mmd"]
+
+
+def test_jobs_rejects_negative(monkeypatch, capsys):
+    assert _parse(monkeypatch, "--jobs", "0").jobs == 0
+    with pytest.raises(SystemExit):
+        _parse(monkeypatch, "--jobs", "-3")
+    assert "--jobs" in capsys.readouterr().err
@@ -0,0 +1,38 @@
+# This module will test content-addressed writing of diagram files.
+import os
+import stat
+
+from modules.output_writer import write_if_changed
+
+
+def _mode(path) -> int:
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_new_file_follows_umask(tmp_path):
+    umask = os.umask(0)
+    os.umask(umask)
+    path = tmp_path / "diagram.mmd"
+    _, changed = write_if_changed(str(path), ["classDiagram\n"])
+    assert changed
+    assert path.read_text() == "classDiagram\n"
+    assert _mode(path) == 0o666 & ~umask
+
+
+def test_rewrite_keeps_existing_mode(tmp_path):
+    path = tmp_path / "diagram.puml"
+    path.write_text("old\n")
+    os.chmod(path, 0o640)
+    _, changed = write_if_changed(str(path), ["new\n"])
+    assert changed
+    assert _mode(path) == 0o640
+
+
+def test_unchanged_content_is_not_rewritten(tmp_path):
+    path = tmp_path / "diagram.puml"
+    write_if_changed(str(path), ["same\n"])
+    mtime = os.stat(path).st_mtime_ns
+    _, changed = write_if_changed(str(path), ["sa", "me\n"])
+    assert not changed
+    assert os.stat(path).st_mtime_ns == mtime
+    assert [name for name in os.listdir(tmp_path)] == ["diagram.puml"]
@@ -0,0 +1,92 @@
+# This module will test the on-disk cache of parsed schema files.
+import datetime
+import json
+import os
+
+from modules.parse_cache import ParseCache
+
+DOCUMENT = {"components": {"schemas": {"Pet": {"type": "object", "properties": {"id": {"type": "integer"}}}}}}
+
+
+def _schema_file(tmp_path, text="components: {schemas: {Pet: {type: object}}}\n"):
+    path = tmp_path / "pet.yaml"
+    path.write_text(text)
+    return str(path)
+
+
+def test_hit_after_put(tmp_path):
+    cache = ParseCache(str(tmp_path / "cache"))
+    path = _schema_file(tmp_path)
+    assert cache.get(path) == (False, None)
+    cache.put(path, DOCUMENT)
+    assert cache.get(path) == (True, DOCUMENT)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_touched_file_is_a_hit_and_changed_file_a_miss(tmp_path):
+    cache = ParseCache(str(tmp_path / "cache"))
+    path = _schema_file(tmp_path)
+    cache.put(path, DOCUMENT)
+    os.utime(path, ns=(0, 0))
+    assert cache.get(path)[0]
+    with open(path, "w") as f:
+        f.write("components: {schemas: {Pet: {type: string}}}\n")
+    assert not cache.get(path)[0]
+
+
+def test_entries_are_json_and_pickles_are_never_loaded(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache = ParseCache(str(cache_dir))
+    path = _schema_file(tmp_path)
+    entry_path = cache._entry_path(path)
+    assert entry_path.endswith(".json")
+
+    # En pickle med samme nøgle, som ville afvikle kode hvis den blev indlæst
+    marker = tmp_path / "executed"
+    payload = b"cos\nsystem\n(S'touch " + str(marker).encode() + b"'\ntR."
+    with open(entry_path[:-len(".json")] + ".pickle", "wb") as f:
+        f.write(payload)
+    assert cache.get(path) == (False, None)
+    assert not marker.exists()
+
+    cache.put(path, DOCUMENT)
+    with open(entry_path, encoding="utf-8") as f:
+        assert json.load(f)["content"] == DOCUMENT
+
+
+def test_foreign_or_malformed_entries_are_misses(tmp_path):
+    cache = ParseCache(str(tmp_path / "cache"))
+    path = _schema_file(tmp_path)
+    cache.put(path, DOCUMENT)
+    entry_path = cache._entry_path(path)
+    with open(entry_path, encoding="utf-8") as f:
+        entry = json.load(f)
+
+    for bad in ([1, 2], {**entry, "path": "/elsewhere.yaml"}, {"path": entry["path"]}):
+        with open(entry_path, "w", encoding="utf-8") as f:
+            json.dump(bad, f)
+        assert cache.get(path) == (False, None)
+    with open(entry_path, "w", encoding="utf-8") as f:
+        f.write("{not json")
+    assert cache.get(path) == (False, None)
+
+
+def test_content_json_cannot_represent_is_not_cached(tmp_path):
+    cache = ParseCache(str(tmp_path / "cache"))
+    path = _schema_file(tmp_path)
+    for content in (
+        {"components": {"schemas": {"D": {"example": datetime.date(2020, 1, 1)}}}},
+        {"components": {"schemas": {"E": {"enum": {1: "one"}}}}},
+    ):
+        cache.put(path, content)
+        assert cache.get(path) == (False, None)
+
+
+def test_clear_and_evict(tmp_path):
+    cache = ParseCache(str(tmp_path / "cache"), max_size=0)
+    path = _schema_file(tmp_path)
+    cache.put(path, DOCUMENT)
+    assert cache.evict() == 1
+    cache.put(path, None)
+    cache.clear()
+    assert os.listdir(tmp_path / "cache") == []
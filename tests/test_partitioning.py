@@ -0,0 +1,85 @@
+# This module will test partitioning of models into clusters and partitioning of loaded models.
+import json
+
+import pytest
+
+from models.compact_models import CompactUmlClass, CompactUmlRelationship
+from modules.partitioning import INDEX_NAME, partition_model
+from modules.uml_generator import UMLGenerator
+
+
+def _model(*names):
+    return {name: CompactUmlClass(name=name) for name in names}
+
+
+def test_directories_with_clashing_safe_names_get_unique_clusters():
+    model = _model("A", "B", "C", "D", "E")
+    sources = {"A": "a-b/x.yaml", "B": "a_b/y.yaml", "C": "root/z.yaml", "D": "top.yaml", "E": "index/e.yaml"}
+    clusters = partition_model(model, [], "directories", class_sources=sources)
+    assert [cluster.name for cluster in clusters] == ["a_b", "a_b_2", "root", "root_2", "index_2"]
+    assert [cluster.classes for cluster in clusters] == [["A"], ["B"], ["C"], ["D"], ["E"]]
+
+
+def test_split_suffixes_do_not_clash_with_other_directories():
+    model = _model("A", "B", "C")
+    sources = {"A": "a/x.yaml", "B": "a/y.yaml", "C": "a_1/z.yaml"}
+    clusters = partition_model(model, [], "directories", max_size=1, class_sources=sources)
+    names = [cluster.name for cluster in clusters]
+    assert names == ["a_1", "a_2", "a_1_2"]
+    assert len(set(names)) == len(names) and INDEX_NAME not in names
+
+
+def test_components_cover_every_class_once():
+    model = _model("A", "B", "C", "D")
+    relationships = [CompactUmlRelationship(source_name="A", target_name="B", type="association")]
+    clusters = partition_model(model, relationships, "components")
+    assert [cluster.classes for cluster in clusters] == [["A", "B"], ["C"], ["D"]]
+
+
+def _schema_tree(tmp_path):
+    for directory, name in (("orders", "Order"), ("pets", "Pet")):
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / "schemas.yaml").write_text(
+            f"components:\n  schemas:\n    {name}:\n      type: object\n      properties:\n        id: {{type: integer}}\n"
+        )
+    return str(tmp_path)
+
+
+def test_loaded_model_keeps_directory_partitions(tmp_path):
+    schema_dir = tmp_path / "schemas"
+    schema_dir.mkdir()
+    generator = UMLGenerator(_schema_tree(schema_dir))
+    generator.generate_uml()
+    model_path = str(tmp_path / "model.json.gz")
+    generator.save_model(model_path)
+
+    loaded = UMLGenerator(None)
+    loaded.load_model(model_path)
+    assert loaded.class_sources == generator.class_sources
+    names = [name for name, _ in loaded.get_partitions("directories")]
+    assert names == [name for name, _ in generator.get_partitions("directories")] == ["orders", "pets", INDEX_NAME]
+
+
+def test_model_file_without_sources_rejects_directories(tmp_path):
+    schema_dir = tmp_path / "schemas"
+    schema_dir.mkdir()
+    generator = UMLGenerator(_schema_tree(schema_dir))
+    generator.generate_uml()
+    model_path = tmp_path / "model.json"
+    generator.save_model(str(model_path))
+    data = json.loads(model_path.read_text())
+    del data["class_sources"]
+    model_path.write_text(json.dumps(data))
+
+    loaded = UMLGenerator(None)
+    loaded.load_model(str(model_path))
+    assert loaded.class_sources == {}
+    with pytest.raises(ValueError):
+        loaded.get_partitions("directories")
+    assert [name for name, _ in loaded.get_partitions("components")][-1] == INDEX_NAME
+
+
+@pytest.mark.parametrize("max_size", [0, -1])
+def test_max_size_below_one_is_rejected(max_size):
+    with pytest.raises(ValueError):
+        partition_model(_model("A"), [], "components", max_size=max_size)
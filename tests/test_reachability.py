@@ -0,0 +1,67 @@
+# This module will test the reachability index against a plain breadth-first search.
+from collections import deque
+import random
+
+import pytest
+
+from modules.reachability import ReachabilityIndex
+
+
+def _bfs(successors: dict, start: str) -> set:
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        for target in successors.get(queue.popleft(), ()):
+            if target not in seen:
+                seen.add(target)
+                queue.append(target)
+    return seen
+
+
+def _random_graph(seed: int, nodes: int, edges: int) -> tuple[list, dict]:
+    rng = random.Random(seed)
+    names = [f"C{index}" for index in range(nodes)]
+    successors = {}
+    for _ in range(edges):
+        successors.setdefault(rng.choice(names), []).append(rng.choice(names))
+    return names, successors
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_bfs_on_random_graphs(seed):
+    names, successors = _random_graph(seed, nodes=60, edges=seed * 6)
+    index = ReachabilityIndex(names, successors)
+    # Spørg i tilfældig rækkefølge, så memoiserede mængder genbruges på tværs
+    for name in random.Random(seed).sample(names, len(names)):
+        assert index.reachable(name) == _bfs(successors, name)
+
+
+def test_cycles_share_a_component():
+    successors = {"A": ["B"], "B": ["C"], "C": ["A", "D"], "D": ["D"], "E": ["A"]}
+    index = ReachabilityIndex(["A", "B", "C", "D", "E"], successors)
+    assert index.component_of["A"] == index.component_of["B"] == index.component_of["C"]
+    assert len({index.component_of[name] for name in "ADE"}) == 3
+    assert index.reachable("E") == {"A", "B", "C", "D", "E"}
+    assert index.reachable("D") == {"D"}
+
+
+def test_ordered_union_puts_roots_first_then_model_order():
+    names = ["A", "B", "C", "D", "E"]
+    successors = {"E": ["C", "A"], "B": ["D"]}
+    index = ReachabilityIndex(names, successors)
+    assert index.ordered_reachable("E") == ["E", "A", "C"]
+    assert index.ordered_union(["E", "B", "E"]) == ["E", "B", "A", "C", "D"]
+
+
+def test_long_chain_memoizes_only_queried_components():
+    # Kæden A0 -> A1 -> ... gav tidligere en mængde pr. komponent, dvs. O(n²) tid og memory.
+    # Kæden er meget længere end rekursionsgrænsen, så både Tarjan og opslag skal være iterative
+    names = [f"A{index}" for index in range(20000)]
+    successors = {names[index]: [names[index + 1]] for index in range(len(names) - 1)}
+    index = ReachabilityIndex(names, successors)
+    assert len(index.components) == len(names)
+    assert len(index.reachable("A10000")) == 10000
+    assert len(index.reachable("A0")) == len(names)
+    assert index.reachable("A0") is index.reachable("A0")
+    assert len(index.reachable("A19999")) == 1
+    assert len(index._closures) == 3
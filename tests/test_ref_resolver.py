@@ -0,0 +1,83 @@
+# This module will test canonical $ref keys and class id assignment.
+import os
+import random
+
+import pytest
+
+from modules.ref_resolver import RefResolver
+
+BASE = os.path.abspath(os.sep + os.path.join("specs"))
+
+
+def _simple_canonical(document_path: str, ref: str) -> str:
+    # Referencen uden cache: en lokal ref peger ind i dokumentet selv, ellers relativt til dets directory
+    file_part, _, pointer = ref.partition("#")
+    path = os.path.normpath(os.path.join(os.path.dirname(document_path), file_part)) if file_part else document_path
+    return f"{path}#{pointer}"
+
+
+def test_canonical_matches_uncached_resolution():
+    rng = random.Random(0)
+    directories = [BASE, os.path.join(BASE, "v1"), os.path.join(BASE, "v1", "pets"), os.path.join(BASE, "v2")]
+    files = ["pet.yaml", "../pet.yaml", "./pets/pet.yaml", "../v2/pet.yaml", "../../common/error.yaml", ""]
+    resolver = RefResolver(BASE)
+    for _ in range(500):
+        document = os.path.join(rng.choice(directories), rng.choice(["a.yaml", "b.yaml"]))
+        ref = f"{rng.choice(files)}#/components/schemas/{rng.choice(['Pet', 'Error'])}"
+        assert resolver.canonical(document, ref) == _simple_canonical(document, ref)
+
+
+def test_same_definition_gets_same_key_from_different_files():
+    resolver = RefResolver(BASE)
+    from_root = resolver.canonical(os.path.join(BASE, "api.yaml"), "v1/pet.yaml#/components/schemas/Pet")
+    from_sibling = resolver.canonical(os.path.join(BASE, "v1", "order.yaml"), "./pet.yaml#/components/schemas/Pet")
+    local = resolver.canonical(os.path.join(BASE, "v1", "pet.yaml"), "#/components/schemas/Pet")
+    assert from_root == from_sibling == local == RefResolver.schema_key(os.path.join(BASE, "v1", "pet.yaml"), "Pet")
+
+
+@pytest.mark.parametrize("name", ["Pet", "a/b", "x~y", "~1"])
+def test_schema_key_escapes_the_name(name):
+    assert RefResolver.name_of(RefResolver.schema_key(os.path.join(BASE, "a.yaml"), name)) == name
+
+
+def test_unique_names_keep_their_name():
+    resolver = RefResolver(BASE)
+    keys = [RefResolver.schema_key(os.path.join(BASE, "pet.yaml"), "Pet"), RefResolver.schema_key(os.path.join(BASE, "order.yaml"), "Order")]
+    assert resolver.assign_ids(keys) == {keys[0]: "Pet", keys[1]: "Order"}
+    assert resolver.collisions == {}
+
+
+def test_colliding_names_share_the_shortest_unique_prefix_length():
+    resolver = RefResolver(BASE)
+    keys = [
+        RefResolver.schema_key(os.path.join(BASE, "v1", "Pet.yaml"), "Pet"),
+        RefResolver.schema_key(os.path.join(BASE, "v2", "Pet.yaml"), "Pet"),
+        RefResolver.schema_key(os.path.join(BASE, "v2", "store", "pet-store.yaml"), "Pet"),
+    ]
+    ids = resolver.assign_ids(keys)
+    assert [ids[key] for key in keys] == ["v1_Pet_Pet", "v2_Pet_Pet", "store_pet_store_Pet"]
+    assert resolver.collisions == {"Pet": keys}
+
+
+def test_collision_needs_longer_prefix_when_file_names_match():
+    resolver = RefResolver(BASE)
+    keys = [
+        RefResolver.schema_key(os.path.join(BASE, "a", "x", "schemas.yaml"), "Pet"),
+        RefResolver.schema_key(os.path.join(BASE, "b", "x", "schemas.yaml"), "Pet"),
+    ]
+    ids = resolver.assign_ids(keys)
+    assert [ids[key] for key in keys] == ["a_x_schemas_Pet", "b_x_schemas_Pet"]
+    assert len(set(ids.values())) == 2
+
+
+def test_class_id_for_unloaded_file():
+    resolver = RefResolver(BASE)
+    pet = RefResolver.schema_key(os.path.join(BASE, "pet.yaml"), "Pet")
+    dups = [RefResolver.schema_key(os.path.join(BASE, directory, "dup.yaml"), "Dup") for directory in ("v1", "v2")]
+    resolver.assign_ids([pet, *dups])
+    assert resolver.class_id(pet) == "Pet"
+    assert resolver.class_id(dups[1]) == "v2_dup_Dup"
+    # Ukendt fil: et entydigt navn bruges, et tvetydigt eller ukendt navn returneres uændret
+    assert resolver.class_id(RefResolver.schema_key(os.path.join(BASE, "other.yaml"), "Pet")) == "Pet"
+    assert resolver.class_id(RefResolver.schema_key(os.path.join(BASE, "other.yaml"), "Dup")) == "Dup"
+    assert resolver.class_id(RefResolver.schema_key(os.path.join(BASE, "other.yaml"), "Missing")) == "Missing"
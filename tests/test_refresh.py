@@ -0,0 +1,174 @@
+# This module will test that refreshing changed schema files gives the same model as a full generation.
+import pytest
+
+from modules.uml_generator import UMLGenerator
+
+FILES = {
+    "pets/pet.yaml": """\
+components:
+  schemas:
+    Pet:
+      type: object
+      properties:
+        id: {type: integer}
+        owner: {$ref: '../people/owner.yaml#/components/schemas/Owner'}
+""",
+    "people/owner.yaml": """\
+components:
+  schemas:
+    Owner:
+      type: object
+      properties:
+        name: {type: string}
+    Pet:
+      type: object
+      properties:
+        nickname: {type: string}
+""",
+    "shapes/shape.yaml": """\
+components:
+  schemas:
+    Drawing:
+      type: object
+      properties:
+        shape:
+          oneOf:
+            - $ref: './circle.yaml#/components/schemas/Circle'
+            - $ref: './square.yaml#/components/schemas/Square'
+""",
+    "shapes/circle.yaml": """\
+components:
+  schemas:
+    Circle:
+      type: object
+      properties:
+        radius: {type: number}
+""",
+    "shapes/square.yaml": """\
+components:
+  schemas:
+    Square:
+      type: object
+      properties:
+        side: {type: number}
+""",
+}
+
+
+@pytest.fixture
+def schema_dir(tmp_path):
+    for name, text in FILES.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return tmp_path
+
+
+def _generator(schema_dir):
+    generator = UMLGenerator(str(schema_dir))
+    generator.generate_uml()
+    generator.class_fingerprints()
+    return generator
+
+
+def _assert_same_as_full_generation(generator, schema_dir):
+    expected = _generator(schema_dir)
+    assert generator.uml_model == expected.uml_model
+    assert list(generator.uml_model) == list(expected.uml_model)
+    assert list(generator.uml_relationships) == list(expected.uml_relationships)
+    assert generator.class_sources == expected.class_sources
+    assert generator.class_fingerprints() == expected.class_fingerprints()
+    for class_name in expected.uml_model:
+        assert generator.get_model_from_class_name(class_name) == expected.get_model_from_class_name(class_name)
+        assert generator.get_dependents_of(class_name) == expected.get_dependents_of(class_name)
+
+
+def _edit(schema_dir, name, old, new):
+    path = schema_dir / name
+    path.write_text(path.read_text().replace(old, new))
+    return str(path)
+
+
+def test_changed_attribute_relinks_only_the_document(schema_dir):
+    generator = _generator(schema_dir)
+    reachability = generator._get_reachability()
+    before = generator.class_fingerprints()
+    path = _edit(schema_dir, "shapes/circle.yaml", "radius: {type: number}", "radius: {type: integer}")
+    generator.refresh({path})
+    # Relationships er uændrede, så reachability indexet genbruges
+    assert generator._get_reachability() is reachability
+    after = generator.class_fingerprints()
+    assert {name for name in after if after[name] != before[name]} == {"Circle"}
+    _assert_same_as_full_generation(generator, schema_dir)
+
+
+def test_changed_reference_rebuilds_reachability(schema_dir):
+    generator = _generator(schema_dir)
+    reachability = generator._get_reachability()
+    path = _edit(schema_dir, "shapes/circle.yaml", "radius: {type: number}", "radius: {type: number}\n        drawing: {$ref: './shape.yaml#/components/schemas/Drawing'}")
+    generator.refresh({path})
+    assert generator._get_reachability() is not reachability
+    assert "Drawing" in generator.get_model_from_class_name("Circle")[0]
+    _assert_same_as_full_generation(generator, schema_dir)
+
+
+def test_changed_oneof_document_updates_the_concrete_classes(schema_dir):
+    generator = _generator(schema_dir)
+    reachability = generator._get_reachability()
+    path = _edit(schema_dir, "shapes/shape.yaml", "      properties:\n", "      properties:\n        title: {type: string}\n")
+    generator.refresh({path})
+    assert generator._get_reachability() is reachability
+    _assert_same_as_full_generation(generator, schema_dir)
+
+    # Den abstrakte klasse ændres, når en konkret klasse fjernes fra oneOf
+    _edit(schema_dir, "shapes/shape.yaml", "            - $ref: './square.yaml#/components/schemas/Square'\n", "")
+    generator.refresh({path})
+    _assert_same_as_full_generation(generator, schema_dir)
+
+
+def test_colliding_names_keep_their_ids(schema_dir):
+    generator = _generator(schema_dir)
+    ids = sorted(generator.uml_model)
+    path = _edit(schema_dir, "people/owner.yaml", "nickname: {type: string}", "nickname: {type: string}\n        age: {type: integer}")
+    generator.refresh({path})
+    assert sorted(generator.uml_model) == ids
+    _assert_same_as_full_generation(generator, schema_dir)
+
+
+def test_added_schema_relinks_the_model(schema_dir):
+    generator = _generator(schema_dir)
+    path = _edit(schema_dir, "shapes/square.yaml", "        side: {type: number}\n", "        side: {type: number}\n    Triangle:\n      type: object\n")
+    generator.refresh({path})
+    assert "Triangle" in generator.uml_model
+    _assert_same_as_full_generation(generator, schema_dir)
+
+
+def test_added_and_deleted_files(schema_dir):
+    generator = _generator(schema_dir)
+    added = schema_dir / "a" / "tag.yaml"
+    added.parent.mkdir()
+    added.write_text("components:\n  schemas:\n    Tag:\n      type: object\n")
+    pet = _edit(schema_dir, "pets/pet.yaml", "owner: {$ref: '../people/owner.yaml#/components/schemas/Owner'}", "tag: {$ref: '../a/tag.yaml#/components/schemas/Tag'}")
+    generator.refresh({str(added), pet})
+    _assert_same_as_full_generation(generator, schema_dir)
+
+    (schema_dir / "shapes" / "square.yaml").unlink()
+    shape = _edit(schema_dir, "shapes/shape.yaml", "            - $ref: './square.yaml#/components/schemas/Square'\n", "")
+    generator.refresh({str(schema_dir / "shapes" / "square.yaml"), shape})
+    _assert_same_as_full_generation(generator, schema_dir)
+
+
+def test_unknown_reference_keeps_the_model_and_is_relinked_when_fixed(schema_dir):
+    generator = _generator(schema_dir)
+    model = generator.uml_model
+    circle = _edit(schema_dir, "shapes/circle.yaml", "radius: {type: number}", "radius: {$ref: '#/components/schemas/Missing'}")
+    with pytest.raises(KeyError):
+        generator.refresh({circle})
+    assert generator.uml_model is model
+
+    square = _edit(schema_dir, "shapes/square.yaml", "side: {type: number}", "side: {type: integer}")
+    with pytest.raises(KeyError):
+        generator.refresh({square})
+    _edit(schema_dir, "shapes/circle.yaml", "radius: {$ref: '#/components/schemas/Missing'}", "radius: {type: number}")
+    generator.refresh({circle})
+    _assert_same_as_full_generation(generator, schema_dir)
@@ -0,0 +1,135 @@
+# This module will test the columnar relationship store and its CSR index against plain lists.
+import io
+import random
+
+import pytest
+
+from models.compact_models import CompactUmlClass, CompactUmlRelationship
+from modules.relationship_store import RelationshipStore, SymbolTable, relationship_rows
+from modules.uml_to_mermaid import UMLToMermaidConverter
+from modules.uml_to_plantuml import UMLToPlantUMLConverter
+
+TYPES = ["aggregation", "generalization", "association", "composition"]
+
+
+def _relationships(seed: int, classes: int = 30, count: int = 200) -> tuple[list[str], list[CompactUmlRelationship]]:
+    rng = random.Random(seed)
+    names = [f"C{index}" for index in range(classes)]
+    relationships = [
+        CompactUmlRelationship(
+            source_name=rng.choice(names),
+            target_name=rng.choice(names),
+            type=rng.choice(TYPES),
+            name=rng.choice([None, "items", "owner"]),
+            description=rng.choice([None, "A description"]),
+            multiplicitySource=rng.choice([None, "1"]),
+            multiplicityTarget=rng.choice([None, "1", "*", "0..1"])
+        )
+        for _ in range(count)
+    ]
+    return names, relationships
+
+
+def _store(seed: int) -> tuple[list[CompactUmlRelationship], RelationshipStore]:
+    names, relationships = _relationships(seed)
+    return relationships, RelationshipStore.from_relationships(relationships, SymbolTable(names))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_store_reads_back_as_the_relationships(seed):
+    relationships, store = _store(seed)
+    assert list(store) == relationships
+    assert len(store) == len(relationships)
+    assert store[-1] == relationships[-1]
+    assert store[10:20:3] == relationships[10:20:3]
+    with pytest.raises(IndexError):
+        store[len(relationships)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rows_match_the_objects(seed):
+    relationships, store = _store(seed)
+    assert list(store.iter_rows()) == list(relationship_rows(relationships))
+    assert list(relationship_rows(store)) == list(relationship_rows(list(store)))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rows_of_type_and_counts(seed):
+    relationships, store = _store(seed)
+    for rel_type in TYPES + ["unknown"]:
+        assert list(store.rows_of_type(rel_type)) == [row for row, rel in enumerate(relationships) if rel.type == rel_type]
+    assert store.type_counts() == {rel_type: sum(rel.type == rel_type for rel in relationships) for rel_type in TYPES if any(rel.type == rel_type for rel in relationships)}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_deduplicated_keeps_first_of_each_pair(seed):
+    relationships, store = _store(seed)
+    seen = set()
+    expected = []
+    for rel in relationships:
+        if rel.type == "generalization":
+            if (rel.source_name, rel.target_name) in seen:
+                continue
+            seen.add((rel.source_name, rel.target_name))
+        expected.append(rel)
+    assert list(store.deduplicated("generalization")) == expected
+
+
+def test_deduplicated_without_duplicates_is_the_same_store():
+    names = ["A", "B"]
+    relationships = [
+        CompactUmlRelationship(source_name="A", target_name="B", type="generalization"),
+        CompactUmlRelationship(source_name="B", target_name="A", type="generalization"),
+        CompactUmlRelationship(source_name="A", target_name="B", type="aggregation"),
+        CompactUmlRelationship(source_name="A", target_name="B", type="aggregation"),
+    ]
+    store = RelationshipStore.from_relationships(relationships, SymbolTable(names))
+    assert store.deduplicated("generalization") is store
+    assert store.deduplicated("unknown") is store
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_index_groups_rows_like_a_dict_of_lists(seed):
+    relationships, store = _store(seed)
+    rows = store.rows_of_type("aggregation") + store.rows_of_type("generalization")
+    sources = [store.source[row] for row in rows]
+    targets = [store.target[row] for row in rows]
+
+    expected: dict[str, list[CompactUmlRelationship]] = {}
+    for row in rows:
+        expected.setdefault(relationships[row].source_name, []).append(relationships[row])
+    index = store.index(rows, sources, targets)
+    assert dict(index) == expected
+    assert list(index) == [name for name in store.classes.names if name in expected]
+    assert len(index) == len(expected)
+    for name in store.classes.names:
+        assert index.others(name) == [rel.target_name for rel in expected.get(name, [])]
+    assert "missing" not in index
+    with pytest.raises(KeyError):
+        index["missing"]
+
+    pairs = store.index(rows, targets, sources, pairs=True)
+    expected_pairs: dict[str, list] = {}
+    for row in rows:
+        rel = relationships[row]
+        expected_pairs.setdefault(rel.target_name, []).append((rel, rel.source_name))
+    assert dict(pairs) == expected_pairs
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_converters_give_same_output_for_store_and_list(seed):
+    relationships, store = _store(seed)
+    model = {name: CompactUmlClass(name=name) for name in store.classes.names}
+    for converter in (UMLToPlantUMLConverter(), UMLToMermaidConverter()):
+        from_store, from_list = io.StringIO(), io.StringIO()
+        converter.write_to(from_store, model, store)
+        converter.write_to(from_list, model, relationships)
+        assert from_store.getvalue() == from_list.getvalue()
+    plantuml = UMLToPlantUMLConverter()
+    assert "".join(plantuml.uml_relationship_to_plantuml(rel) for rel in relationships) in plantuml.uml_model_to_plantuml(model, store)
+
+
+def test_unknown_class_is_a_key_error():
+    store = RelationshipStore(SymbolTable(["A"]))
+    with pytest.raises(KeyError):
+        store.append("A", "B", "aggregation")
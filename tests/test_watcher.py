@@ -0,0 +1,28 @@
+# This module will test the polling watcher's directory snapshots.
+import os
+
+import pytest
+
+from modules.watcher import snapshot
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="needs symlinks")
+def test_snapshot_does_not_follow_symlink_cycles(tmp_path):
+    (tmp_path / "schemas").mkdir()
+    (tmp_path / "schemas" / "pet.yaml").write_text("components: {}\n")
+    (tmp_path / "api.yaml").write_text("components: {}\n")
+    os.symlink(tmp_path, tmp_path / "schemas" / "loop", target_is_directory=True)
+    os.symlink(tmp_path / "schemas", tmp_path / "alias", target_is_directory=True)
+
+    result = snapshot(str(tmp_path))
+    assert sorted(result) == [str(tmp_path / "api.yaml"), str(tmp_path / "schemas" / "pet.yaml")]
+
+
+def test_snapshot_sees_changes(tmp_path):
+    path = tmp_path / "pet.yaml"
+    path.write_text("a: 1\n")
+    (tmp_path / "notes.txt").write_text("ignored")
+    before = snapshot(str(tmp_path))
+    assert list(before) == [str(path)]
+    path.write_text("a: 12\n")
+    assert snapshot(str(tmp_path))[str(path)] != before[str(path)]
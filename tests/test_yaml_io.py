@@ -0,0 +1,138 @@
+# This module will test streaming of components/schemas against a full yaml.safe_load.
+import textwrap
+
+import pytest
+import yaml
+
+from modules.yaml_io import iter_schemas, load_yaml_file
+
+
+def _write(tmp_path, text: str) -> str:
+    path = tmp_path / "spec.yaml"
+    path.write_text(textwrap.dedent(text), encoding="utf-8")
+    return str(path)
+
+
+def _expected(path: str) -> list:
+    document = yaml.safe_load(open(path, encoding="utf-8"))
+    return list(((document or {}).get("components") or {}).get("schemas", {}).items())
+
+
+SPECS = {
+    "anchor in skipped top-level section": """
+        x-common: &common
+          type: string
+          format: uuid
+        paths:
+          /pets:
+            get:
+              responses: {}
+        components:
+          schemas:
+            Pet:
+              type: object
+              properties:
+                id: *common
+        """,
+    "anchor nested in skipped sequence and components section": """
+        tags:
+          - name: pets
+            x-shape: &shape {type: integer, minimum: 0}
+        components:
+          parameters:
+            limit:
+              schema: &limit
+                type: integer
+          schemas:
+            Page:
+              properties:
+                size: *shape
+                limit: *limit
+        """,
+    "merge keys": """
+        x-base: &base
+          type: object
+          description: base
+        components:
+          schemas:
+            Base: &schema_base
+              <<: *base
+              properties:
+                a: {type: string}
+            Child:
+              <<: [*schema_base, {description: child}]
+              required: [a]
+        """,
+    "alias to earlier schema": """
+        components:
+          schemas:
+            A: &a
+              type: object
+            B: *a
+        """,
+    "tags": """
+        components:
+          schemas:
+            Tagged:
+              example: !!str 123
+              maximum: !!int "10"
+              enum: !!seq [a, b]
+              default: !!null ''
+              flag: !!bool "true"
+        """,
+    "other components": """
+        components:
+          responses:
+            NotFound: {description: missing}
+          schemas:
+            Only: {type: string}
+        """,
+    "no components": """
+        openapi: 3.0.0
+        paths: {}
+        """,
+}
+
+
+@pytest.mark.parametrize("name", SPECS)
+def test_matches_safe_load(tmp_path, name):
+    path = _write(tmp_path, SPECS[name])
+    assert list(iter_schemas(path)) == _expected(path)
+
+
+def test_complex_keys_are_skipped(tmp_path):
+    # yaml.safe_load kan ikke bygge en mapping med en sekvens som nøgle, men strømmen springer den over
+    path = _write(tmp_path, """
+        ? [complex, key]
+        : ignored
+        components:
+          schemas:
+            Only: {type: string}
+        """)
+    assert list(iter_schemas(path)) == [("Only", {"type": "string"})]
+
+
+def test_empty_file(tmp_path):
+    path = _write(tmp_path, "")
+    assert list(iter_schemas(path)) == []
+    assert load_yaml_file(path) is None
+
+
+def test_undefined_alias_is_an_error(tmp_path):
+    path = _write(tmp_path, """
+        components:
+          schemas:
+            A: *missing
+        """)
+    with pytest.raises(yaml.YAMLError):
+        list(iter_schemas(path))
+
+
+def test_streamed_file_gives_same_model_as_parsed(tmp_path):
+    from modules.uml_generator import UMLGenerator
+
+    _write(tmp_path, SPECS["anchor in skipped top-level section"])
+    streamed = UMLGenerator(str(tmp_path), stream_threshold=0)
+    parsed = UMLGenerator(str(tmp_path), stream_threshold=None)
+    assert streamed.generate_uml()[0] == parsed.generate_uml()[0]
+    assert streamed.stats.counters["files_streamed"] == 1